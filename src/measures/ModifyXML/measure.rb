@@ -3,6 +3,7 @@
 # see the URL below for information on how to write OpenStudio measures
 # http://natlabrockies.github.io/OpenStudio-user-documentation/reference/measure_writing_guide/
 
+require 'json'
 require 'logger'
 require 'oga'
 require 'pathname'
@@ -42,9 +43,16 @@ class ModifyXML < OpenStudio::Measure::ModelMeasure
     arg.setDescription('Path to existing XML file to modify')
     args << arg
 
-    arg = OpenStudio::Measure::OSArgument.makeStringArgument('save_file_path', true)
+    arg = OpenStudio::Measure::OSArgument.makeStringArgument('save_file_path', false)
     arg.setDisplayName('Save file path')
-    arg.setDescription('Path to save new xml file')
+    arg.setDescription('Path to save new xml file. Required unless batch_file_path is provided.')
+    args << arg
+
+    arg = OpenStudio::Measure::OSArgument.makeStringArgument('batch_file_path', false)
+    arg.setDisplayName('Batch file path')
+    arg.setDescription('Path to a JSON file listing many modifications of the XML file to make.
+      Each entry is an object with a save_file_path and any of the multiplier/offset arguments of this measure.
+      The XML file is only parsed once. When provided, save_file_path and the multiplier/offset arguments are ignored.')
     args << arg
 
     arg = OpenStudio::Measure::OSArgument.makeDoubleArgument('heating_setpoint_offset', false)
@@ -155,6 +163,25 @@ class ModifyXML < OpenStudio::Measure::ModelMeasure
       Value > 1 increases usage, < 1 decreases. Examples: 0.1 = 10x reduction, 10 = 10x increase.')
     args << arg
 
+    arg = OpenStudio::Measure::OSArgument.makeIntegerArgument('timestep', false)
+    arg.setDisplayName('Simulation timestep')
+    arg.setDescription('Simulation timestep to set in the XML file. Must divide evenly into 60.
+      Coarser timesteps simulate faster, at some cost in accuracy.')
+    arg.setUnits('min')
+    args << arg
+
+    { 'begin' => 'Begin', 'end' => 'End' }.each do |key, name|
+      arg = OpenStudio::Measure::OSArgument.makeIntegerArgument("sim_#{key}_month", false)
+      arg.setDisplayName("Simulation run period #{name.downcase} month")
+      arg.setDescription("#{name} month (1-12) of the run period to set in the XML file. Simulating part of the year is faster.")
+      args << arg
+
+      arg = OpenStudio::Measure::OSArgument.makeIntegerArgument("sim_#{key}_day", false)
+      arg.setDisplayName("Simulation run period #{name.downcase} day")
+      arg.setDescription("#{name} day of the month of the run period to set in the XML file.")
+      args << arg
+    end
+
     return args
   end
 
@@ -176,15 +203,38 @@ class ModifyXML < OpenStudio::Measure::ModelMeasure
       xml_file = File.expand_path(xml_file)
     end
 
+    if args[:batch_file_path]
+      return run_batch(xml_file, args[:batch_file_path], runner)
+    end
+
+    if not args[:save_file_path]
+      runner.registerError('Either save_file_path or batch_file_path must be provided.')
+      return false
+    end
+
+    hpxml = load_hpxml(xml_file, runner)
+    modify_hpxml(hpxml, runner, args)
+
+    # Save new file
+    XMLHelper.write_file(hpxml.to_doc(), args[:save_file_path])
+    return true
+  end
+
+  # Parse the XML file and apply OS-HPXML defaults to any un-populated fields
+  def load_hpxml(xml_file, runner)
     hpxml = HPXML.new(hpxml_path: xml_file)
     hpxml_bldg = hpxml.buildings[0] # FIXME: This requires that each XML file contain only a single building
 
-    # Apply OS-HPXML defaults to any un-populated fields
     epw_path = Location.get_epw_path(hpxml_bldg, xml_file)
     weather = WeatherFile.new(epw_path: epw_path, runner: runner)
     Defaults.apply(runner, hpxml, hpxml_bldg, weather)
+    return hpxml
+  end
 
-    # Modify XML fields
+  def modify_hpxml(hpxml, runner, args)
+    hpxml_bldg = hpxml.buildings[0]
+    modify_timestep(hpxml.header, runner, args)
+    modify_run_period(hpxml.header, runner, args)
     modify_heating_setpoint(hpxml_bldg, runner, args)
     modify_cooling_setpoint(hpxml_bldg, runner, args)
     modify_air_leakage(hpxml_bldg, runner, args)
@@ -203,10 +253,61 @@ class ModifyXML < OpenStudio::Measure::ModelMeasure
     modify_window_u_factor(hpxml_bldg, runner, args)
     modify_window_shgc(hpxml_bldg, runner, args)
     modify_appliance_usage(hpxml_bldg, runner, args)
+  end
 
-    # Save new file
-    XMLHelper.write_file(hpxml.to_doc(), args[:save_file_path])
-    return true
+  # Write one modified XML file per entry of the batch file, parsing and defaulting the XML file only once
+  def run_batch(xml_file, batch_file_path, runner)
+    jobs = JSON.parse(File.read(batch_file_path))
+    base_hpxml = load_hpxml(xml_file, runner)
+
+    # Modifications are made in place, so each entry gets its own copy of the defaulted HPXML
+    begin
+      base_hpxml_dump = Marshal.dump(base_hpxml)
+    rescue TypeError
+      base_hpxml_dump = nil
+    end
+
+    success = true
+    jobs.each_with_index do |job, i|
+      if not job['save_file_path']
+        runner.registerError("Batch entry #{i} is missing save_file_path.")
+        success = false
+        next
+      end
+      job_args = job.to_h { |k, v| [k.to_sym, v.is_a?(Numeric) ? v.to_f : v] }
+      begin
+        hpxml = base_hpxml_dump.nil? ? load_hpxml(xml_file, runner) : Marshal.load(base_hpxml_dump)
+        modify_hpxml(hpxml, runner, job_args)
+        XMLHelper.write_file(hpxml.to_doc(), job_args[:save_file_path])
+      rescue StandardError => e
+        runner.registerError("Failed to write #{job_args[:save_file_path]}: #{e.message}")
+        success = false
+      end
+    end
+    return success
+  end
+
+  def modify_timestep(hpxml_header, runner, args)
+    if not args[:timestep]
+      runner.registerInfo('No simulation timestep provided. Not modifying the timestep.')
+      return
+    end
+    hpxml_header.timestep = Integer(args[:timestep])
+    hpxml_header.timestep_isdefaulted = false
+  end
+
+  def modify_run_period(hpxml_header, runner, args)
+    run_period_args = [:sim_begin_month, :sim_begin_day, :sim_end_month, :sim_end_day]
+    if run_period_args.none? { |arg| args[arg] }
+      runner.registerInfo('No simulation run period provided. Not modifying the run period.')
+      return
+    end
+    run_period_args.each do |arg|
+      next if not args[arg]
+
+      hpxml_header.send("#{arg}=", Integer(args[arg]))
+      hpxml_header.send("#{arg}_isdefaulted=", false)
+    end
   end
 
   def modify_heating_setpoint(hpxml_bldg, runner, args)
@@ -565,6 +565,62 @@ class ModifyXMLTest < Minitest::Test
     end
   end
 
+  def test_timestep
+    args_hash = {}
+    args_hash['xml_file_path'] = File.join(@oshpxml_root_path, 'workflow', 'sample_files', 'base-simcontrol-timestep-10-mins.xml')
+    args_hash['save_file_path'] = @tmp_hpxml_path
+    args_hash['timestep'] = 60
+
+    _test_measure(args_hash)
+
+    hpxml = HPXML.new(hpxml_path: @tmp_hpxml_path)
+    assert_equal(60, hpxml.header.timestep)
+  end
+
+  def test_run_period
+    args_hash = {}
+    args_hash['xml_file_path'] = File.join(@oshpxml_root_path, 'workflow', 'sample_files', 'base.xml')
+    args_hash['save_file_path'] = @tmp_hpxml_path
+    args_hash['sim_begin_month'] = 4
+    args_hash['sim_begin_day'] = 1
+    args_hash['sim_end_month'] = 4
+    args_hash['sim_end_day'] = 14
+
+    _test_measure(args_hash)
+
+    hpxml = HPXML.new(hpxml_path: @tmp_hpxml_path)
+    assert_equal(4, hpxml.header.sim_begin_month)
+    assert_equal(1, hpxml.header.sim_begin_day)
+    assert_equal(4, hpxml.header.sim_end_month)
+    assert_equal(14, hpxml.header.sim_end_day)
+  end
+
+  def test_batch
+    xml_file_path = File.join(@oshpxml_root_path, 'workflow', 'sample_files', 'base.xml')
+    batch_dir = File.join(File.dirname(__FILE__), 'batch')
+    FileUtils.mkdir_p(batch_dir)
+    jobs = [
+      { 'heating_setpoint_offset' => -2.0, 'misc_load_multiplier' => 1.5 },
+      { 'air_leakage_multiplier' => 0.75, 'appliance_usage_multiplier' => 2.0 },
+    ]
+    jobs.each_with_index do |job, i|
+      job['save_file_path'] = File.join(batch_dir, "batch_#{i}.xml")
+    end
+    batch_file_path = File.join(batch_dir, 'batch.json')
+    File.write(batch_file_path, JSON.generate(jobs))
+
+    _test_measure({ 'xml_file_path' => xml_file_path, 'batch_file_path' => batch_file_path })
+
+    # Each batch entry matches modifying the XML file on its own
+    jobs.each do |job|
+      args_hash = job.merge('xml_file_path' => xml_file_path, 'save_file_path' => @tmp_hpxml_path)
+      _test_measure(args_hash)
+      assert_equal(File.read(@tmp_hpxml_path), File.read(job['save_file_path']))
+    end
+  ensure
+    FileUtils.rm_rf(batch_dir)
+  end
+
   def _test_measure(args_hash)
     # create an instance of the measure
     measure = ModifyXML.new
@@ -596,6 +652,8 @@ class ModifyXMLTest < Minitest::Test
     assert_equal('Success', result.value.valueName)
 
     # return new HPXML building
+    return if args_hash['save_file_path'].nil?
+
     hpxml = HPXML.new(hpxml_path: args_hash['save_file_path'])
     return hpxml.buildings[0]
   end
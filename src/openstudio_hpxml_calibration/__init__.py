@@ -1,9 +1,11 @@
 import contextlib
 import json
+import multiprocessing
 import shutil
-import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from importlib.metadata import version
 from pathlib import Path
 from typing import Annotated
@@ -13,12 +15,14 @@ from loguru import logger
 
 from openstudio_hpxml_calibration.utils import (
     OS_HPXML_PATH,
+    get_openstudio_version,
     get_tmy3_weather,
     plot_absolute_error_series,
     plot_avg_penalty,
     plot_bias_error_series,
     plot_fuel_type_curve_fits,
     plot_min_penalty,
+    run_command,
 )
 
 from .enums import Format, Granularity
@@ -28,6 +32,8 @@ app = App(
     version_flags=["--version", "-V"],
     help="Calibrate an HPXML model to provided utility data using OpenStudio-HPXML",
 )
+cache_app = App(name="cache", help="Inspect and prune the simulation result cache")
+app.command(cache_app)
 
 
 def set_log_level(verbose: int = 0) -> None:
@@ -47,16 +53,7 @@ def openstudio_version(
     verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
 ) -> None:
     """Return the OpenStudio-HPXML, HPXML, OpenStudio, and EnergyPlus Versions"""
-    resp = subprocess.run(
-        [
-            "openstudio",
-            str(OS_HPXML_PATH / "workflow" / "run_simulation.rb"),
-            "--version",
-        ],
-        capture_output=True,
-        check=True,
-    )
-    print(resp.stdout.decode())
+    print(get_openstudio_version())
 
 
 @app.command
@@ -66,6 +63,7 @@ def run_sim(
     output_dir: str | None = None,
     granularity: Granularity | None = None,
     validate: bool = False,
+    timeout: float | None = None,
     verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
 ) -> None:
     """Simulate an HPXML file using the OpenStudio-HPXML workflow
@@ -82,6 +80,8 @@ def run_sim(
         Granularity of simulation results. Annual results returned if not provided.
     validate: flag
         Enable validation of the HPXML file before simulation.
+    timeout: float
+        Kill the simulation, and any processes it started, if it runs longer than this many seconds.
     verbose: flag
         Enable verbose logging. Repeat flag for more verbosity.
     """
@@ -113,16 +113,14 @@ def run_sim(
     run_simulation_command.extend(debug_flags)
 
     logger.debug(f"Running command: {' '.join(run_simulation_command)}")
-    subprocess.run(
-        run_simulation_command,
-        capture_output=True,
-        check=True,
-    )
+    run_command(run_simulation_command, timeout=timeout)
 
 
 @app.command
 def modify_xml(
     workflow_file: Path,
+    simulate: bool = False,
+    timeout: float | None = None,
     verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
 ) -> None:
     """Modify the XML file using the OpenStudio-HPXML workflow
@@ -131,6 +129,10 @@ def modify_xml(
     ----------
     workflow_file: Path
         Path to the workflow file (osw) that defines the modifications to be made
+    simulate: flag
+        Also run the simulation and reporting steps of the workflow file.
+    timeout: float
+        Kill OpenStudio, and any processes it started, if it runs longer than this many seconds.
     verbose: flag
         Enable verbose logging. Repeat flag for more verbosity.
     """
@@ -141,15 +143,12 @@ def modify_xml(
         "run",
         "--workflow",
         str(workflow_file),
-        "--measures_only",
     ]
+    if not simulate:
+        modify_xml_command.append("--measures_only")
 
     logger.debug(f"Running command: {' '.join(modify_xml_command)}")
-    subprocess.run(
-        modify_xml_command,
-        capture_output=True,
-        check=True,
-    )
+    run_command(modify_xml_command, timeout=timeout)
 
 
 @app.command
@@ -170,6 +169,8 @@ def calibrate(
     output_dir: str | None = None,
     num_proc: int | None = None,
     save_all_results: bool = False,
+    resume: bool = False,
+    warm_start: str | None = None,
     verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
 ) -> None:
     """
@@ -189,13 +190,17 @@ def calibrate(
         Number of processors for parallel simulations
     save_all_results: flag
         Whether to save all simulation results.
+    resume: flag
+        Continue an interrupted calibration from the last checkpoint in the output directory.
+    warm_start: str
+        Path to the logbook.json or checkpoint.pkl of a previous calibration of the same home,
+        to start generation 0 from its best genomes.
     verbose: flag
         Enable verbose logging. Repeat flag for more verbosity.
     """
 
     verbosity = sum(verbose)
     set_log_level(verbosity)
-    from openstudio_hpxml_calibration.calibrate import Calibrate
 
     filename = Path(hpxml_filepath).stem
 
@@ -208,8 +213,64 @@ def calibrate(
         )
     else:
         output_filepath = Path(output_dir)
-    # Remove old output_filepath if it exists
-    if output_filepath.exists() and output_filepath.is_dir():
+
+    _calibrate_home(
+        hpxml_filepath,
+        config_filepath,
+        csv_bills_filepath,
+        output_filepath,
+        num_proc=num_proc,
+        save_all_results=save_all_results,
+        resume=resume,
+        warm_start=None if warm_start is None else Path(warm_start),
+    )
+
+
+def _calibrate_home(
+    hpxml_filepath,
+    config_filepath,
+    csv_bills_filepath,
+    output_filepath: Path,
+    num_proc: int | None = None,
+    save_all_results: bool = False,
+    resume: bool = False,
+    shared_pool=None,
+    plot_lock=None,
+    warm_start: Path | None = None,
+) -> bool:
+    """Calibrate one home and write its logbook and plots to output_filepath.
+
+    Returns whether the calibration met the acceptance criteria.
+    """
+    from openstudio_hpxml_calibration.calibrate import Calibrate
+    from openstudio_hpxml_calibration.logbook import (
+        LOGBOOK_FILENAME,
+        LOGBOOK_JSON_FILENAME,
+        read_logbook,
+        write_logbook_json,
+    )
+    from openstudio_hpxml_calibration.telemetry import (
+        TIMINGS_FILENAME,
+        TRACE_FILENAME,
+        write_chrome_trace,
+    )
+
+    filename = Path(hpxml_filepath).stem
+
+    if (
+        warm_start is not None
+        and not resume
+        and warm_start.resolve().is_relative_to(output_filepath.resolve())
+    ):
+        raise ValueError(
+            f"The warm start file {warm_start} is in the output directory, which is replaced "
+            "by the new calibration. Copy it elsewhere or use another output directory."
+        )
+    if warm_start is not None and not warm_start.exists():
+        raise FileNotFoundError(f"Warm start file {warm_start} not found")
+
+    # Remove old output_filepath if it exists, unless it holds the run being resumed
+    if not resume and output_filepath.exists() and output_filepath.is_dir():
         shutil.rmtree(output_filepath)
     output_filepath.mkdir(parents=True, exist_ok=True)
 
@@ -223,64 +284,324 @@ def calibrate(
     (
         _best_individual_dict,
         _pop,
-        logbook,
+        _logbook,
         _best_bias_series,
         _best_abs_series,
         weather_norm_reg_models,
         existing_home_results,
         calibration_success,
     ) = cal.run_search(
-        num_proc=num_proc, output_filepath=output_filepath, save_all_results=save_all_results
+        num_proc=num_proc,
+        output_filepath=output_filepath,
+        save_all_results=save_all_results,
+        resume=resume,
+        shared_pool=shared_pool,
+        warm_start=warm_start,
     )
-    print(f"Calibration took {time.time() - start:.2f} seconds")
+    print(f"Calibration of '{filename}' took {time.time() - start:.2f} seconds")
 
     # Save logbook
-    log_data = []
-    json_keys = [
-        "best_individual",
-        "best_individual_sim_results",
-        "parameter_choice_stats",
-        "simulation_result_stats",
-        "existing_home",
-        "existing_home_sim_results",
-        "all_simulation_results",
-    ]
-    for record in logbook:
-        rec = record.copy()
-        for key in json_keys:
-            if key in rec and isinstance(rec[key], str):
-                with contextlib.suppress(json.JSONDecodeError):
-                    rec[key] = json.loads(rec[key])
-        log_data.append(rec)
     parsed_existing_home = {}
-    for key in json_keys:
-        if key in existing_home_results and isinstance(existing_home_results[key], str):
+    for key, value in existing_home_results.items():
+        if isinstance(value, str):
             with contextlib.suppress(json.JSONDecodeError):
-                parsed_existing_home[key] = json.loads(existing_home_results[key])
+                parsed_existing_home[key] = json.loads(value)
+
+    logbook_path = output_filepath / LOGBOOK_FILENAME
+    write_logbook_json(
+        logbook_path,
+        output_filepath / LOGBOOK_JSON_FILENAME,
+        {
+            "weather_normalization_results": weather_norm_reg_models,
+            "existing_home_results": parsed_existing_home,
+            "calibration_success": calibration_success,
+        },
+    )
+    write_chrome_trace(output_filepath / TIMINGS_FILENAME, output_filepath / TRACE_FILENAME)
 
-    output_data = {
-        "weather_normalization_results": weather_norm_reg_models,
-        "existing_home_results": parsed_existing_home,
-        "calibration_success": calibration_success,
-        "calibration_results": log_data,
-    }
+    # Min and avg penalties
+    min_penalty = [entry["min"] for entry in read_logbook(logbook_path)]
+    avg_penalty = [entry["avg"] for entry in read_logbook(logbook_path)]
 
-    logbook_path = output_filepath / "logbook.json"
-    with open(logbook_path, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2)
+    # pyplot isn't thread safe, so homes calibrated at the same time take turns plotting
+    with plot_lock or contextlib.nullcontext():
+        # plot calibration results
+        plot_min_penalty(min_penalty, output_filepath, filename)
+        plot_avg_penalty(avg_penalty, output_filepath, filename)
+        plot_bias_error_series(read_logbook(logbook_path), output_filepath, filename)
+        plot_absolute_error_series(read_logbook(logbook_path), output_filepath, filename)
 
-    # Min and avg penalties
-    min_penalty = [entry["min"] for entry in logbook]
-    avg_penalty = [entry["avg"] for entry in logbook]
+        # Plot fuel type curve fits
+        plot_fuel_type_curve_fits(cal.inv_model, output_filepath, filename)
 
-    # plot calibration results
-    plot_min_penalty(min_penalty, output_filepath, filename)
-    plot_avg_penalty(avg_penalty, output_filepath, filename)
-    plot_bias_error_series(logbook, output_filepath, filename)
-    plot_absolute_error_series(logbook, output_filepath, filename)
+    return calibration_success
 
-    # Plot fuel type curve fits
-    plot_fuel_type_curve_fits(cal.inv_model, output_filepath, filename)
+
+@app.command
+def calibrate_batch(
+    homes: str,
+    output_dir: str,
+    config_filepath: str | None = None,
+    num_proc: int | None = None,
+    max_concurrent_homes: int | None = None,
+    save_all_results: bool = False,
+    resume: bool = False,
+    verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
+) -> None:
+    """
+    Calibrate many HPXML files at once, sharing one pool of simulation workers.
+
+    Parameters
+    ----------
+    homes: str
+        Directory of HPXML files, or YAML manifest file listing them
+    output_dir: str
+        Output directory, with a subdirectory of results for each home
+    config_filepath: str
+        Path to calibration config file for homes without their own
+    num_proc: int
+        Number of processors for parallel simulations, shared by all homes
+    max_concurrent_homes: int
+        Maximum number of homes to calibrate at the same time, defaults to num_proc
+    save_all_results: flag
+        Whether to save all simulation results.
+    resume: flag
+        Continue interrupted calibrations from the last checkpoint in each home's output directory.
+    verbose: flag
+        Enable verbose logging. Repeat flag for more verbosity.
+    """
+
+    verbosity = sum(verbose)
+    set_log_level(verbosity)
+    from openstudio_hpxml_calibration.batch import SharedPool, load_batch_homes
+    from openstudio_hpxml_calibration.calibrate import global_seed, init_worker
+    from openstudio_hpxml_calibration.utils import _load_config
+
+    batch_homes = load_batch_homes(Path(homes), config_filepath)
+    if not batch_homes:
+        sys.exit(f"No HPXML files found in {homes}")
+    if num_proc is None:
+        num_proc = multiprocessing.cpu_count() - 1
+    if max_concurrent_homes is None:
+        max_concurrent_homes = num_proc
+    output_filepath = Path(output_dir)
+    # Keep the OpenStudio workers warm for the whole run if any home uses them
+    uses_workers = any(
+        _load_config(home.config_filepath)["simulation"]["execution_mode"] == "worker"
+        for home in batch_homes
+    )
+
+    start = time.time()
+    plot_lock = threading.Lock()
+    failed = []
+    with (
+        SharedPool(
+            num_proc,
+            maxtasksperchild=None if uses_workers else 15,
+            initializer=init_worker,
+            initargs=(global_seed,),
+        ) as shared_pool,
+        ThreadPoolExecutor(max_workers=max_concurrent_homes) as executor,
+    ):
+        futures = {
+            executor.submit(
+                _calibrate_home,
+                home.hpxml_filepath,
+                home.config_filepath,
+                home.csv_bills_filepath,
+                output_filepath / home.name,
+                save_all_results=save_all_results,
+                resume=resume,
+                shared_pool=shared_pool,
+                plot_lock=plot_lock,
+            ): home
+            for home in batch_homes
+        }
+        for future in as_completed(futures):
+            home = futures[future]
+            try:
+                calibration_success = future.result()
+            except Exception as e:
+                logger.error(f"Calibration of '{home.name}' failed: {e}")
+                failed.append(home.name)
+                continue
+            print(
+                f"Finished '{home.name}': "
+                f"{'calibrated' if calibration_success else 'not calibrated'}"
+            )
+
+    print(f"Calibrating {len(batch_homes)} homes took {time.time() - start:.2f} seconds")
+    if failed:
+        sys.exit(f"Calibration failed for {len(failed)} homes: {', '.join(sorted(failed))}")
+
+
+@app.command
+def simulation_agent(
+    address: str,
+    num_proc: int | None = None,
+    verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
+) -> None:
+    """
+    Run simulations for calibrations that use the socket executor, until interrupted.
+
+    The agent authenticates with the key in the OSHC_EXECUTOR_AUTHKEY environment variable,
+    which must match the calibration's.
+
+    Parameters
+    ----------
+    address: str
+        host:port of the machine running the calibration
+    num_proc: int
+        Number of processors for parallel simulations on this machine
+    verbose: flag
+        Enable verbose logging. Repeat flag for more verbosity.
+    """
+
+    verbosity = sum(verbose)
+    set_log_level(verbosity)
+    from openstudio_hpxml_calibration.executors import get_authkey, parse_address, run_agent
+
+    if num_proc is None:
+        num_proc = multiprocessing.cpu_count() - 1
+    print(f"Running simulations for calibrations at {address} with {num_proc} processes")
+    run_agent(parse_address(address), get_authkey(), num_proc)
+
+
+@app.command
+def extract_hpxml(
+    output_dir: Path,
+    generation: int,
+    individual: str | None = None,
+    output_filepath: Path | None = None,
+    verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
+) -> None:
+    """
+    Extract an HPXML file from the generation archive of a calibration.
+
+    Parameters
+    ----------
+    output_dir: Path
+        Output directory of the calibration
+    generation: int
+        Generation number
+    individual: str
+        Individual to extract, e.g. ind_0. If omitted, lists the individuals of the generation.
+    output_filepath: Path
+        Path to write the HPXML file to. Defaults to gen_<generation>_<individual>.xml in the
+        current directory.
+    verbose: flag
+        Enable verbose logging. Repeat flag for more verbosity.
+    """
+
+    verbosity = sum(verbose)
+    set_log_level(verbosity)
+    from openstudio_hpxml_calibration.generation_archive import (
+        GENERATION_ARCHIVE_FILENAME,
+        GenerationArchive,
+    )
+
+    with GenerationArchive(Path(output_dir) / GENERATION_ARCHIVE_FILENAME) as archive:
+        if individual is None:
+            for entry in archive.individuals(generation):
+                print(f"{entry['individual']}\tfitness {entry['fitness']:.3f}")
+            return
+        if output_filepath is None:
+            output_filepath = Path(f"gen_{generation}_{individual}.xml")
+        archive.extract_hpxml(generation, individual, output_filepath)
+    print(f"Wrote {output_filepath}")
+
+
+@app.command
+def export_trace(
+    output_dir: Path,
+    output_filepath: Path | None = None,
+    verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
+) -> None:
+    """
+    Export the evaluation timings of a calibration, e.g. one that was interrupted, as a Chrome
+    trace-event file.
+
+    Parameters
+    ----------
+    output_dir: Path
+        Output directory of the calibration
+    output_filepath: Path
+        Path to write the trace to. Defaults to trace.json in the output directory.
+    verbose: flag
+        Enable verbose logging. Repeat flag for more verbosity.
+    """
+
+    verbosity = sum(verbose)
+    set_log_level(verbosity)
+    from openstudio_hpxml_calibration.telemetry import (
+        TIMINGS_FILENAME,
+        TRACE_FILENAME,
+        write_chrome_trace,
+    )
+
+    if output_filepath is None:
+        output_filepath = Path(output_dir) / TRACE_FILENAME
+    write_chrome_trace(Path(output_dir) / TIMINGS_FILENAME, output_filepath)
+    print(f"Wrote {output_filepath}")
+
+
+@cache_app.command
+def stats(
+    verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
+) -> None:
+    """Show the number of entries and size of the simulation result cache"""
+    verbosity = sum(verbose)
+    set_log_level(verbosity)
+    from openstudio_hpxml_calibration.cache import SimulationCache
+
+    cache_stats = SimulationCache().stats()
+    print(f"Cache directory: {cache_stats['cache_dir']}")
+    print(f"Entries: {cache_stats['entries']}")
+    print(f"Size: {cache_stats['size_mb']} MB")
+    if cache_stats["entries"]:
+        print(f"Least recently used: {cache_stats['oldest_days']} days ago")
+        print(f"Most recently used: {cache_stats['newest_days']} days ago")
+
+
+@cache_app.command
+def prune(
+    max_size_mb: float | None = None,
+    max_age_days: float | None = None,
+    config_filepath: str | None = None,
+    clear: Annotated[bool, Parameter(name="--all")] = False,
+    verbose: Annotated[list[bool], Parameter(alias="-v")] = (),
+) -> None:
+    """Evict entries from the simulation result cache
+
+    Parameters
+    ----------
+    max_size_mb: float
+        Remove least-recently-used entries until the cache is no larger than this.
+    max_age_days: float
+        Remove entries that haven't been used in this many days.
+    config_filepath: str
+        Config file whose cache_max_size_mb is used if neither limit is given. Defaults
+        to the default config.
+    clear: flag
+        Remove every entry.
+    verbose: flag
+        Enable verbose logging. Repeat flag for more verbosity.
+
+    If neither limit is given, the cache is pruned to the cache_max_size_mb of the config.
+    """
+    verbosity = sum(verbose)
+    set_log_level(verbosity)
+    from openstudio_hpxml_calibration.cache import SimulationCache
+    from openstudio_hpxml_calibration.utils import _load_config
+
+    cache = SimulationCache()
+    if clear:
+        removed = cache.clear()
+    else:
+        if max_size_mb is None and max_age_days is None and config_filepath is not None:
+            max_size_mb = _load_config(config_filepath)["simulation"]["cache_max_size_mb"]
+        removed = cache.prune(max_size_mb=max_size_mb, max_age_days=max_age_days)
+    print(f"Removed {removed} cache entries")
 
 
 if __name__ == "__main__":
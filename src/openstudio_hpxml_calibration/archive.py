@@ -0,0 +1,102 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from openstudio_hpxml_calibration.enums import EvaluationStatus
+from openstudio_hpxml_calibration.telemetry import EvaluationTiming
+
+
+def genome_key(individual) -> tuple:
+    """Get a hashable key for the parameter values of an individual.
+
+    :param individual: Sequence of parameter values (e.g. a DEAP individual).
+    :type individual: Sequence[float]
+    :return: Tuple of the parameter values.
+    :rtype: tuple
+    """
+    return tuple(individual)
+
+
+@dataclass
+class EvaluationResult:
+    """The outcome of evaluating a single genome."""
+
+    fitness: tuple[float]
+    comparison: dict = field(default_factory=dict)
+    temp_output_dir: Path | None = None
+    sim_results: dict | None = None
+    xml_hash: str | None = None
+    from_cache: bool = False
+    status: EvaluationStatus = EvaluationStatus.SUCCESS
+    duration: float | None = None
+    straggler: bool = False
+    peak_rss: int | None = None
+    timing: EvaluationTiming | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.sim_results is not None
+
+
+class EvaluationArchive:
+    """Run-wide archive of evaluated genomes.
+
+    Results are indexed by the genome tuple and by the hash of the modified HPXML file
+    the genome produced, so that repeated genomes (and distinct genomes that produce an
+    identical HPXML file) are only simulated once per calibration run.
+    """
+
+    def __init__(self):
+        self._by_genome: dict[tuple, EvaluationResult] = {}
+        self._by_xml_hash: dict[str, EvaluationResult] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_genome)
+
+    def __contains__(self, individual) -> bool:
+        return genome_key(individual) in self._by_genome
+
+    def get(self, individual) -> EvaluationResult | None:
+        """Get the archived result for a genome, if there is one.
+
+        :param individual: Sequence of parameter values.
+        :type individual: Sequence[float]
+        :return: The archived result, or None if the genome hasn't been evaluated.
+        :rtype: EvaluationResult | None
+        """
+        return self._by_genome.get(genome_key(individual))
+
+    def get_by_xml_hash(self, xml_hash: str) -> EvaluationResult | None:
+        """Get the archived result for a modified HPXML file hash, if there is one.
+
+        :param xml_hash: SHA-256 hash of a modified HPXML file.
+        :type xml_hash: str
+        :return: The archived result, or None if no genome produced that file.
+        :rtype: EvaluationResult | None
+        """
+        return self._by_xml_hash.get(xml_hash)
+
+    def add(self, individual, result: EvaluationResult) -> None:
+        """Store the result of evaluating a genome.
+
+        Failed evaluations are not archived so they can be retried.
+
+        :param individual: Sequence of parameter values.
+        :type individual: Sequence[float]
+        :param result: Result of evaluating the genome.
+        :type result: EvaluationResult
+        """
+        if not result.succeeded:
+            return
+        self._by_genome[genome_key(individual)] = result
+        if result.xml_hash is not None:
+            self._by_xml_hash.setdefault(result.xml_hash, result)
+
+    def items(self):
+        """Archived genome tuples and their results."""
+        return self._by_genome.items()
+
+    @property
+    def results_by_xml_hash(self) -> Mapping[str, EvaluationResult]:
+        """Results indexed by the SHA-256 hash of the modified HPXML file."""
+        return self._by_xml_hash
@@ -0,0 +1,276 @@
+import itertools
+import threading
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import yaml
+from pathos.pools import _ProcessPool
+
+from openstudio_hpxml_calibration.evaluation import EvaluationContext, set_evaluation_context
+from openstudio_hpxml_calibration.executors import TaskResult
+
+
+@dataclass(frozen=True)
+class BatchHome:
+    """One home to calibrate with ``calibrate-batch``.
+
+    :param hpxml_filepath: Path to the HPXML file.
+    :param config_filepath: Path to the calibration config file for this home.
+    :param csv_bills_filepath: Path to a utility bill CSV file, if the bills aren't in the
+        HPXML file.
+    """
+
+    hpxml_filepath: Path
+    config_filepath: Path | None = None
+    csv_bills_filepath: Path | None = None
+
+    @property
+    def name(self) -> str:
+        return self.hpxml_filepath.stem
+
+
+def load_batch_homes(path: Path, default_config_filepath: Path | None = None) -> list[BatchHome]:
+    """Get the homes to calibrate from a directory of HPXML files or a manifest file.
+
+    In a directory, each ``<name>.xml`` file is calibrated with the ``<name>.yaml`` config
+    and ``<name>.csv`` utility bills next to it, if there are any. A manifest is a YAML
+    file with a ``homes`` list, where each entry has an ``hpxml_filepath`` and optionally a
+    ``config_filepath`` and ``csv_bills_filepath``. Relative paths in a manifest are
+    relative to the manifest file.
+
+    :param path: Directory of HPXML files or YAML manifest file.
+    :type path: Path
+    :param default_config_filepath: Config file for homes that don't have their own.
+    :type default_config_filepath: Path | None, optional
+    :raises ValueError: If the manifest is invalid, or two homes have the same name.
+    :return: Homes to calibrate.
+    :rtype: list[BatchHome]
+    """
+    path = Path(path)
+    homes = []
+    if path.is_dir():
+        for hpxml_filepath in sorted(path.glob("*.xml")):
+            config_filepath = hpxml_filepath.with_suffix(".yaml")
+            csv_bills_filepath = hpxml_filepath.with_suffix(".csv")
+            homes.append(
+                BatchHome(
+                    hpxml_filepath=hpxml_filepath,
+                    config_filepath=(
+                        config_filepath if config_filepath.exists() else default_config_filepath
+                    ),
+                    csv_bills_filepath=(
+                        csv_bills_filepath if csv_bills_filepath.exists() else None
+                    ),
+                )
+            )
+    else:
+        manifest = yaml.safe_load(path.read_text()) or {}
+        entries = manifest.get("homes") if isinstance(manifest, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError(f"Manifest {path} must have a 'homes' list")
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict) or "hpxml_filepath" not in entry:
+                raise ValueError(f"Entry {i} of manifest {path} is missing hpxml_filepath")
+            filepaths = {
+                key: path.parent / entry[key] if entry.get(key) else None
+                for key in ("hpxml_filepath", "config_filepath", "csv_bills_filepath")
+            }
+            if filepaths["config_filepath"] is None:
+                filepaths["config_filepath"] = default_config_filepath
+            homes.append(BatchHome(**filepaths))
+
+    names = [home.name for home in homes]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Homes in a batch need unique file names, found duplicates: {duplicates}")
+    return homes
+
+
+def _run_in_context(context: EvaluationContext | None, func: Callable, args: tuple):
+    set_evaluation_context(context)
+    return func(*args)
+
+
+class SharedPool:
+    """Worker processes shared by several calibration searches running at once.
+
+    Each search gets its own ``PoolClient``, which it uses like the pool ``run_search``
+    creates for itself. Tasks are queued per client and handed to the workers one at a
+    time, taking turns between the clients with queued tasks, so a search submitting a
+    whole generation can't hold up the others. No more tasks are handed over than there are
+    workers, so every search waits at most one task per worker for a free slot.
+
+    :param processes: Number of worker processes.
+    :type processes: int
+    :param maxtasksperchild: Tasks each worker process runs before it's replaced, defaults to
+        keeping the workers for the life of the pool.
+    :type maxtasksperchild: int | None, optional
+    :param initializer: Called in each worker process when it starts.
+    :type initializer: Callable | None, optional
+    :param initargs: Arguments for ``initializer``.
+    :type initargs: tuple, optional
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        maxtasksperchild: int | None = None,
+        initializer: Callable | None = None,
+        initargs: tuple = (),
+    ):
+        self.processes = processes
+        self._pool = _ProcessPool(
+            processes=processes,
+            maxtasksperchild=maxtasksperchild,
+            initializer=initializer,
+            initargs=initargs,
+        )
+        self._condition = threading.Condition()
+        self._queues: dict[int, deque] = {}
+        # Clients in the order they take turns
+        self._turns = deque()
+        self._client_ids = itertools.count()
+        self._in_flight = 0
+        self._closed = False
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="shared-pool-dispatcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    def client(self, context: EvaluationContext | None = None) -> "PoolClient":
+        """Get a client for one calibration search.
+
+        :param context: Evaluation context to install in the worker process for each of the
+            client's tasks.
+        :type context: EvaluationContext | None, optional
+        :return: The client.
+        :rtype: PoolClient
+        """
+        with self._condition:
+            client_id = next(self._client_ids)
+            self._queues[client_id] = deque()
+            self._turns.append(client_id)
+        return PoolClient(self, client_id, context)
+
+    def _submit(self, client_id: int, func: Callable, args: tuple) -> TaskResult:
+        result = TaskResult()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The shared pool has been closed")
+            self._queues[client_id].append((func, args, result))
+            self._condition.notify_all()
+        return result
+
+    def _remove_client(self, client_id: int) -> None:
+        with self._condition:
+            for _, _, result in self._queues.pop(client_id, ()):
+                result._set(error=RuntimeError("The pool client was closed"))
+            if client_id in self._turns:
+                self._turns.remove(client_id)
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and (
+                    self._in_flight >= self.processes or not any(self._queues.values())
+                ):
+                    self._condition.wait()
+                if self._closed:
+                    return
+                while not self._queues[self._turns[0]]:
+                    self._turns.rotate(-1)
+                func, args, result = self._queues[self._turns[0]].popleft()
+                self._turns.rotate(-1)
+                self._in_flight += 1
+            self._pool.apply_async(
+                func,
+                args,
+                callback=partial(self._finish, result),
+                error_callback=partial(self._finish_with_error, result),
+            )
+
+    def _finish(self, result: TaskResult, value) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+        result._set(value)
+
+    def _finish_with_error(self, result: TaskResult, error: BaseException) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+        result._set(error=error)
+
+    def close(self) -> None:
+        """Stop accepting tasks, and wait for the workers to exit once tasks already
+        handed to them are done."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self) -> None:
+        """Stop the workers immediately."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+
+class PoolClient:
+    """One calibration search's view of a ``SharedPool``.
+
+    It has the ``map`` and ``apipe`` methods ``run_search`` uses on its own pool. Each
+    task runs in a worker process with the search's evaluation context installed.
+    """
+
+    def __init__(self, pool: SharedPool, client_id: int, context: EvaluationContext | None):
+        self._pool = pool
+        self._client_id = client_id
+        self._context = context
+
+    def apipe(self, func: Callable, *args) -> TaskResult:
+        """Submit one call of ``func``.
+
+        :param func: Function to call in a worker process.
+        :type func: Callable
+        :return: The pending result of the call.
+        :rtype: TaskResult
+        """
+        return self._pool._submit(self._client_id, _run_in_context, (self._context, func, args))
+
+    def map(self, func: Callable, *iterables) -> list:
+        """Call ``func`` on each set of arguments and wait for all of the results.
+
+        :param func: Function to call in worker processes.
+        :type func: Callable
+        :return: Return value of each call, in order.
+        :rtype: list
+        """
+        results = [self.apipe(func, *args) for args in zip(*iterables)]
+        return [result.get() for result in results]
+
+    def close(self) -> None:
+        self._pool._remove_client(self._client_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,193 @@
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from openstudio_hpxml_calibration.utils import _load_default_config, get_cache_dir
+
+
+class SimulationCache:
+    """On-disk, content-addressed cache of simulation results shared across calibration runs.
+
+    Each entry holds the parsed annual model results (the output of
+    ``Calibrate.get_model_results``) and the modified HPXML that produced them. Entries are
+    keyed on everything that determines the simulation outcome: the source HPXML contents,
+    the genome, the OpenStudio-HPXML/EnergyPlus versions, and the simulation flags.
+    Reading an entry refreshes its modification time so that eviction is least-recently-used.
+    """
+
+    def __init__(self, cache_dir: os.PathLike | None = None):
+        """Create a SimulationCache
+
+        :param cache_dir: Directory to store cached results in, defaults to a
+            ``simulation_results`` directory in the oshc user cache directory.
+        :type cache_dir: os.PathLike | None, optional
+        """
+        if cache_dir is None:
+            cache_dir = get_cache_dir() / "simulation_results"
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(hpxml_hash: str, genome: dict[str, float], version: str, flags: dict) -> str:
+        """Build the cache key for a simulation.
+
+        :param hpxml_hash: SHA-256 hash of the source (unmodified) HPXML file.
+        :type hpxml_hash: str
+        :param genome: Mapping of calibration parameter name to value.
+        :type genome: dict[str, float]
+        :param version: OpenStudio-HPXML, OpenStudio, and EnergyPlus version string.
+        :type version: str
+        :param flags: Simulation flags that affect results (output format, validation, etc.).
+        :type flags: dict
+        :return: Hex digest identifying the simulation.
+        :rtype: str
+        """
+        payload = {
+            "hpxml": hpxml_hash,
+            "genome": {name: float(value) for name, value in genome.items()},
+            "version": version,
+            "flags": flags,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def _entries(self) -> list[Path]:
+        return list(self.cache_dir.glob("*/*.json.gz"))
+
+    def __contains__(self, key: str) -> bool:
+        return self._entry_path(key).exists()
+
+    def get(self, key: str) -> dict | None:
+        """Get a cached entry
+
+        :param key: Cache key from :meth:`make_key`.
+        :type key: str
+        :return: Dict with ``model_results`` and ``hpxml`` (modified HPXML text) keys,
+            or None if the simulation isn't cached.
+        :rtype: dict | None
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with gzip.open(entry_path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(entry_path)
+        except (FileNotFoundError, EOFError, OSError, json.JSONDecodeError):
+            return None
+        return entry
+
+    def put(self, key: str, model_results: dict, hpxml_filepath: os.PathLike) -> None:
+        """Store the results of a simulation
+
+        The entry is written to a temporary file and moved into place, so concurrent
+        readers and writers never see a partial entry.
+
+        :param key: Cache key from :meth:`make_key`.
+        :type key: str
+        :param model_results: Annual model results for each fuel type by end use.
+        :type model_results: dict
+        :param hpxml_filepath: Path to the modified HPXML file that was simulated.
+        :type hpxml_filepath: os.PathLike
+        """
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "model_results": model_results,
+            "hpxml": Path(hpxml_filepath).read_text(encoding="utf-8"),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, gzip.GzipFile(fileobj=f, mode="wb") as gz:
+                gz.write(json.dumps(entry).encode("utf-8"))
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+
+    def stats(self) -> dict:
+        """Summarize the contents of the cache
+
+        :return: Number of entries, total size, and age of the least- and most-recently
+            used entries.
+        :rtype: dict
+        """
+        entries = []
+        for entry_path in self._entries():
+            with contextlib.suppress(FileNotFoundError):
+                entries.append(entry_path.stat())
+        now = time.time()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "entries": len(entries),
+            "size_mb": round(sum(st.st_size for st in entries) / 1e6, 2),
+            "oldest_days": round((now - min(st.st_mtime for st in entries)) / 86400, 1)
+            if entries
+            else None,
+            "newest_days": round((now - max(st.st_mtime for st in entries)) / 86400, 1)
+            if entries
+            else None,
+        }
+
+    def prune(self, max_size_mb: float | None = None, max_age_days: float | None = None) -> int:
+        """Evict cached entries
+
+        Entries not used within ``max_age_days`` are removed first, then the
+        least-recently-used entries are removed until the cache is no larger than
+        ``max_size_mb``. If neither limit is given, ``cache_max_size_mb`` of the default
+        config is used. Use :meth:`clear` to remove every entry.
+
+        :param max_size_mb: Maximum total size of the cache in megabytes.
+        :type max_size_mb: float | None, optional
+        :param max_age_days: Maximum number of days since an entry was last used.
+        :type max_age_days: float | None, optional
+        :return: Number of entries removed.
+        :rtype: int
+        """
+        if max_size_mb is None and max_age_days is None:
+            max_size_mb = _load_default_config()["simulation"]["cache_max_size_mb"]
+        entries = []
+        for entry_path in self._entries():
+            with contextlib.suppress(FileNotFoundError):
+                entries.append((entry_path, entry_path.stat()))
+        # Most recently used first
+        entries.sort(key=lambda entry: entry[1].st_mtime, reverse=True)
+
+        now = time.time()
+        total_bytes = 0
+        removed = 0
+        for entry_path, st in entries:
+            total_bytes += st.st_size
+            too_old = max_age_days is not None and (now - st.st_mtime) > max_age_days * 86400
+            too_big = max_size_mb is not None and total_bytes > max_size_mb * 1e6
+            if too_old or too_big:
+                with contextlib.suppress(FileNotFoundError):
+                    entry_path.unlink()
+                    removed += 1
+                total_bytes -= st.st_size
+        if removed:
+            logger.debug(f"Evicted {removed} entries from simulation cache {self.cache_dir}")
+        return removed
+
+    def clear(self) -> int:
+        """Remove every cached entry
+
+        :return: Number of entries removed.
+        :rtype: int
+        """
+        removed = 0
+        for entry_path in self._entries():
+            with contextlib.suppress(FileNotFoundError):
+                entry_path.unlink()
+                removed += 1
+        if removed:
+            logger.debug(f"Cleared {removed} entries from simulation cache {self.cache_dir}")
+        return removed
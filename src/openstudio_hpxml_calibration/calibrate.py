@@ -1,27 +1,91 @@
-import copy
 import json
 import math
 import multiprocessing
 import random
 import shutil
 import statistics
-import tempfile
 import time
-import uuid
-from datetime import datetime as dt
-from datetime import timedelta
+from dataclasses import replace
 from pathlib import Path
+from types import MappingProxyType
 
 import pandas as pd
-from deap import algorithms, base, creator, tools
+from deap import base, creator, tools
 from loguru import logger
-from pathos.multiprocessing import ProcessingPool as Pool
 
 from openstudio_hpxml_calibration import app
-from openstudio_hpxml_calibration.hpxml import FuelType, HpxmlDoc
+from openstudio_hpxml_calibration.archive import EvaluationArchive, genome_key
+from openstudio_hpxml_calibration.cache import SimulationCache
+from openstudio_hpxml_calibration.checkpoint import (
+    CHECKPOINT_FILENAME,
+    checkpoint_due,
+    load_search_checkpoint,
+    save_search_checkpoint,
+)
+from openstudio_hpxml_calibration.concurrency import ConcurrencyController, map_with_limit
+from openstudio_hpxml_calibration.enums import EvaluationStatus
+from openstudio_hpxml_calibration.evaluation import (
+    MEASURES_PATH,
+    EvaluationContext,
+    create_measure_input_file,
+    evaluate,
+    get_model_results,
+    get_simulation_timeout,
+    make_temp_output_dir,
+    set_evaluation_context,
+)
+from openstudio_hpxml_calibration.evaluation import modify_hpxml_batch as run_modify_batch
+from openstudio_hpxml_calibration.executors import create_executor
+from openstudio_hpxml_calibration.generation_archive import (
+    GENERATION_ARCHIVE_FILENAME,
+    append_generation,
+    discard_generations_after,
+)
+from openstudio_hpxml_calibration.genetic_algorithm import (
+    GenerationalScheduler,
+    SteadyStateScheduler,
+    apply_result,
+    cx_uniform,
+    island_random_generators,
+    island_records,
+    sel_tournament,
+)
+from openstudio_hpxml_calibration.hpxml import FuelBills, FuelType, HpxmlDoc
+from openstudio_hpxml_calibration.logbook import (
+    LOGBOOK_FILENAME,
+    append_logbook_record,
+    discard_records_after,
+)
 from openstudio_hpxml_calibration.modify_hpxml import set_consumption_on_hpxml
+from openstudio_hpxml_calibration.normalization_targets import (
+    DELIVERED_FUELS,
+    NormalizationTargets,
+    compare_annual_consumption,
+    compare_delivered_fuel,
+    compare_to_targets,
+    get_annual_normalized_consumption,
+    get_delivered_fuel_target,
+)
+from openstudio_hpxml_calibration.population import (
+    INITIAL_POPULATION_DESIGNS,
+    ChoiceEncoding,
+    clone_individual,
+    design_population,
+    warm_start_genomes,
+)
+from openstudio_hpxml_calibration.screening import (
+    ScreeningFidelity,
+    fit_period_scaling,
+    get_run_periods,
+)
+from openstudio_hpxml_calibration.surrogate import SurrogateModel, rank_correlation
+from openstudio_hpxml_calibration.telemetry import TIMINGS_FILENAME, GenerationTimings
 from openstudio_hpxml_calibration.units import convert_units
-from openstudio_hpxml_calibration.utils import _load_config
+from openstudio_hpxml_calibration.utils import (
+    _load_config,
+    calculate_sha256,
+    get_openstudio_version,
+)
 from openstudio_hpxml_calibration.weather_normalization.degree_days import (
     calculate_annual_degree_days,
 )
@@ -38,12 +102,15 @@ global_seed = 2025
 random.seed(global_seed)
 
 
-def init_worker(seed):
-    """Initialize the random seed for a worker process.
+def init_worker(seed, context: EvaluationContext | None = None):
+    """Initialize the random seed and evaluation context for a worker process.
 
     :param seed: The base seed to use for randomization.
     :type seed: int
+    :param context: Evaluation context to install for ``evaluation.evaluate``.
+    :type context: EvaluationContext | None, optional
     """
+    set_evaluation_context(context)
     worker_id = (
         multiprocessing.current_process()._identity[0]
         if multiprocessing.current_process()._identity
@@ -141,43 +208,7 @@ class Calibrate:
         :rtype: dict[str, dict[str, float]]
         """
 
-        results = json.loads(json_results_path.read_text())
-        if "Time" in results:
-            raise ValueError(f"your file {json_results_path} is not an annual results file")
-
-        model_output = {
-            "electricity": {},
-            "natural gas": {},
-            "propane": {},
-            "fuel oil": {},
-            "wood cord": {},
-            "wood pellets": {},
-            "coal": {},
-        }
-
-        for end_use, consumption in results["End Use"].items():
-            fuel_type = end_use.split(":")[0].lower().strip()
-            # ignore electricity usage for heating (fans/pumps) when electricity is not the fuel type for any heating system
-            if (
-                fuel_type == "electricity"
-                and "Heating" in end_use
-                and FuelType.ELECTRICITY.value not in self.hpxml.get_fuel_types()["heating"]
-            ):
-                continue
-            if "Heating" in end_use:
-                model_output[fuel_type]["heating"] = round(
-                    number=(model_output[fuel_type].get("heating", 0) + consumption), ndigits=3
-                )
-            elif "Cooling" in end_use:
-                model_output[fuel_type]["cooling"] = round(
-                    number=(model_output[fuel_type].get("cooling", 0) + consumption), ndigits=3
-                )
-            else:
-                model_output[fuel_type]["baseload"] = round(
-                    number=(model_output[fuel_type].get("baseload", 0) + consumption), ndigits=3
-                )
-
-        return model_output
+        return get_model_results(json_results_path, self.hpxml.profile.heats_with_electricity)
 
     def compare_results(
         self, normalized_consumption: dict[str, pd.DataFrame], annual_model_results
@@ -192,67 +223,9 @@ class Calibrate:
         :rtype: dict[str, dict[str, dict[str, float]]]
         """
 
-        # Build annual normalized bill consumption dicts
-        annual_normalized_bill_consumption = {}
-        for fuel_type, consumption in normalized_consumption.items():
-            annual_normalized_bill_consumption[fuel_type] = {}
-            for end_use in ["heating", "cooling", "baseload"]:
-                if (
-                    end_use not in annual_model_results[fuel_type]
-                    or annual_model_results[fuel_type][end_use] == 0.0
-                ):
-                    continue
-                annual_normalized_bill_consumption[fuel_type][end_use] = (
-                    consumption[end_use].sum().round(1)
-                )
-
-        comparison_results = {}
-
-        # combine the annual normalized bill consumption with the model results
-        for model_fuel_type, disagg_results in annual_model_results.items():
-            if model_fuel_type in annual_normalized_bill_consumption:
-                comparison_results[model_fuel_type] = {"Bias Error": {}, "Absolute Error": {}}
-                for load_type in disagg_results:
-                    if load_type not in annual_normalized_bill_consumption[model_fuel_type]:
-                        continue
-
-                    disagg_result = disagg_results[load_type]
-                    if model_fuel_type == "electricity":
-                        # All results from simulation and normalized bills are in MBtu.
-                        # convert electric loads from MBtu to kWh for bpi2400
-                        annual_normalized_bill_consumption[model_fuel_type][load_type] = (
-                            convert_units(
-                                annual_normalized_bill_consumption[model_fuel_type][load_type],
-                                from_="mbtu",
-                                to_="kwh",
-                            )
-                        )
-                        disagg_result = convert_units(disagg_result, from_="mbtu", to_="kwh")
-
-                    # Calculate error levels
-                    if annual_normalized_bill_consumption[model_fuel_type][load_type] == 0:
-                        comparison_results[model_fuel_type]["Bias Error"][load_type] = float("nan")
-                    else:
-                        comparison_results[model_fuel_type]["Bias Error"][load_type] = round(
-                            (
-                                (
-                                    annual_normalized_bill_consumption[model_fuel_type][load_type]
-                                    - disagg_result
-                                )
-                                / annual_normalized_bill_consumption[model_fuel_type][load_type]
-                            )
-                            * 100,
-                            1,
-                        )
-                    comparison_results[model_fuel_type]["Absolute Error"][load_type] = round(
-                        abs(
-                            annual_normalized_bill_consumption[model_fuel_type][load_type]
-                            - disagg_result
-                        ),
-                        1,
-                    )
-
-        return comparison_results
+        return compare_annual_consumption(
+            get_annual_normalized_consumption(normalized_consumption), annual_model_results
+        )
 
     def simplified_annual_usage(
         self, model_results: dict, delivered_consumption, fuel_type: str
@@ -273,97 +246,51 @@ class Calibrate:
         :rtype: tuple[dict, dict]
         """
         total_period_tmy_dd, total_period_actual_dd = calculate_annual_degree_days(self.hpxml)
-
-        comparison_results = {}
         if isinstance(model_results, str):
             model_results = json.loads(model_results)
-
-        measured_consumption = 0.0
-        fuel_unit_type = delivered_consumption.ConsumptionType.Energy.UnitofMeasure
-        if delivered_consumption.ConsumptionType.Energy.FuelType == fuel_type:
-            first_bill_date = delivered_consumption.ConsumptionDetail[0].StartDateTime
-            last_bill_date = delivered_consumption.ConsumptionDetail[-1].EndDateTime
-            first_bill_date = dt.strptime(str(first_bill_date), "%Y-%m-%dT%H:%M:%S")
-            last_bill_date = dt.strptime(str(last_bill_date), "%Y-%m-%dT%H:%M:%S")
-            num_days = (last_bill_date - first_bill_date + timedelta(days=1)).days
-            for period_consumption in delivered_consumption.ConsumptionDetail:
-                measured_consumption += float(period_consumption.Consumption)
-            # logger.debug(
-            #     f"Measured {fuel_type} consumption: {measured_consumption:,.2f} {fuel_unit_type}"
-            # )
-            if fuel_unit_type == "gal" and fuel_type == FuelType.FUEL_OIL.value:
-                fuel_unit_type = f"{fuel_unit_type}_fuel_oil"
-            elif fuel_unit_type == "gal" and fuel_type == FuelType.PROPANE.value:
-                fuel_unit_type = f"{fuel_unit_type}_propane"
-            elif fuel_unit_type == "therms":
-                fuel_unit_type = "therm"
-        measured_consumption = convert_units(measured_consumption, str(fuel_unit_type), "mBtu")
-
-        modeled_baseload = model_results[fuel_type].get("baseload", 0)
-        modeled_heating = model_results[fuel_type].get("heating", 0)
-        modeled_cooling = model_results[fuel_type].get("cooling", 0)
-        total_modeled_usage = modeled_baseload + modeled_heating + modeled_cooling
-
-        baseload_fraction = modeled_baseload / total_modeled_usage
-        heating_fraction = modeled_heating / total_modeled_usage
-        cooling_fraction = modeled_cooling / total_modeled_usage
-
-        baseload = baseload_fraction * (num_days / 365)
-        heating = heating_fraction * (
-            total_period_actual_dd[fuel_type]["HDD65F"] / total_period_tmy_dd[fuel_type]["HDD65F"]
-        )
-        cooling = cooling_fraction * (
-            total_period_actual_dd[fuel_type]["CDD65F"] / total_period_tmy_dd[fuel_type]["CDD65F"]
+        target = get_delivered_fuel_target(
+            FuelBills.from_consumption_info(delivered_consumption),
+            total_period_tmy_dd,
+            total_period_actual_dd,
         )
+        return compare_delivered_fuel(model_results, target, fuel_type)
 
-        annual_delivered_fuel_usage = measured_consumption / (baseload + heating + cooling)
-        # logger.debug(f"annual_delivered_fuel_usage: {annual_delivered_fuel_usage:,.2f} mBtu")
+    def get_normalization_targets(self) -> NormalizationTargets:
+        """Get the utility bill targets that simulation results are compared to.
 
-        normalized_annual_baseload = annual_delivered_fuel_usage * baseload_fraction
-        normalized_annual_heating = annual_delivered_fuel_usage * heating_fraction
-        normalized_annual_cooling = annual_delivered_fuel_usage * cooling_fraction
+        Weather normalization, degree days, and bill totals don't depend on the genome,
+        so this is called once per calibration run.
 
-        baseload_bias_error = (
-            ((normalized_annual_baseload - modeled_baseload) / normalized_annual_baseload) * 100
-            if normalized_annual_baseload
-            else 0
-        )
-        heating_bias_error = (
-            ((normalized_annual_heating - modeled_heating) / normalized_annual_heating) * 100
-            if normalized_annual_heating
-            else 0
-        )
-        cooling_bias_error = (
-            ((normalized_annual_cooling - modeled_cooling) / normalized_annual_cooling) * 100
-            if normalized_annual_cooling
-            else 0
-        )
+        :return: Normalized annual consumption for fuels calibrated with the detailed technique,
+            and bill totals and degree days for delivered fuels.
+        :rtype: NormalizationTargets
+        """
+        normalized_consumption_per_bill = self.get_normalized_consumption_per_bill()
 
-        baseload_absolute_error = abs(normalized_annual_baseload - modeled_baseload)
-        heating_absolute_error = abs(normalized_annual_heating - modeled_heating)
-        cooling_absolute_error = abs(normalized_annual_cooling - modeled_cooling)
-
-        comparison_results[fuel_type] = {
-            "Bias Error": {
-                "baseload": round(baseload_bias_error, 2),
-                "heating": round(heating_bias_error, 2),
-                "cooling": round(cooling_bias_error, 2),
-            },
-            "Absolute Error": {
-                "baseload": round(baseload_absolute_error, 2),
-                "heating": round(heating_absolute_error, 2),
-                "cooling": round(cooling_absolute_error, 2),
-            },
-        }
-        normalized_annual_end_uses = {
-            "baseload": round(normalized_annual_baseload, 2),
-            "heating": round(normalized_annual_heating, 2),
-            "cooling": round(normalized_annual_cooling, 2),
+        bills_by_fuel = self.hpxml.profile.bills
+        delivered = {}
+        if any(fuel in DELIVERED_FUELS for fuel in bills_by_fuel):
+            total_period_tmy_dd, total_period_actual_dd = calculate_annual_degree_days(self.hpxml)
+            for fuel, bills in bills_by_fuel.items():
+                if fuel in DELIVERED_FUELS:
+                    delivered[fuel] = get_delivered_fuel_target(
+                        bills, total_period_tmy_dd, total_period_actual_dd
+                    )
+
+        detailed = {
+            fuel: MappingProxyType(end_use_totals)
+            for fuel, end_use_totals in get_annual_normalized_consumption(
+                normalized_consumption_per_bill
+            ).items()
         }
-        return comparison_results, normalized_annual_end_uses
+        return NormalizationTargets(
+            fuels=tuple(bills_by_fuel),
+            detailed=MappingProxyType(detailed),
+            delivered=MappingProxyType(delivered),
+        )
 
     def _process_calibration_results(
-        self, simulation_results, normalized_consumption_per_bill, for_summary=False
+        self, simulation_results, normalization_targets: NormalizationTargets, for_summary=False
     ):
         """Process calibration results based on simulation data and consumption data.
 
@@ -371,94 +298,62 @@ class Calibrate:
 
         :param simulation_results: Simulation results from the HPXML model.
         :type simulation_results: dict
-        :param normalized_consumption_per_bill: Weather-normalized consumption data.
-        :type normalized_consumption_per_bill: dict
+        :param normalization_targets: Utility bill targets from ``get_normalization_targets``.
+        :type normalization_targets: NormalizationTargets
         :param for_summary: If True, returns summary information for documentation.
         :type for_summary: bool, optional
         :return: Tuple containing comparison error metrics and regression model summary details.
         :rtype: tuple
         """
-        comparison = {}
+        if isinstance(simulation_results, str):
+            simulation_results = json.loads(simulation_results)
+        comparison = compare_to_targets(normalization_targets, simulation_results)
         summary = {}
-        delivered_fuels = (
-            FuelType.FUEL_OIL.value,
-            FuelType.PROPANE.value,
-            FuelType.WOOD.value,
-            FuelType.WOOD_PELLETS.value,
-        )
-        consumptions = self.hpxml.get_consumptions()
+        if not for_summary:
+            return comparison, summary
 
-        for consumption in consumptions:
-            for fuel_info in consumption.ConsumptionDetails.ConsumptionInfo:
-                fuel = fuel_info.ConsumptionType.Energy.FuelType.text
-
-                if fuel in delivered_fuels:
-                    simplified_results, normalized_annual_end_uses = self.simplified_annual_usage(
-                        simulation_results, fuel_info, fuel
-                    )
-                    comparison[fuel] = simplified_results.get(fuel, {})
-                    if for_summary:
+        for fuel in normalization_targets.fuels:
+            if fuel in normalization_targets.delivered:
+                _, normalized_annual_end_uses = compare_delivered_fuel(
+                    simulation_results, normalization_targets.delivered[fuel], fuel
+                )
+                summary[fuel] = {
+                    "calibration_type": "simplified",
+                    "consumption": normalized_annual_end_uses,
+                }
+            elif fuel in normalization_targets.detailed:
+                for reg_model_fuel, reg_model in self.inv_model.regression_models.items():
+                    if fuel == reg_model_fuel.value:
                         summary[fuel] = {
-                            "calibration_type": "simplified",
-                            "consumption": normalized_annual_end_uses,
+                            "calibration_type": "detailed",
+                            "model_type": getattr(reg_model, "MODEL_NAME", None),
+                            "cvrmse": getattr(reg_model, "cvrmse", None),
+                            "consumption": dict(normalization_targets.detailed[fuel]),
                         }
-                else:
-                    try:
-                        # detailed calibration logic
-                        if for_summary:
-                            for (
-                                reg_model_fuel,
-                                reg_model,
-                            ) in self.inv_model.regression_models.items():
-                                if fuel == reg_model_fuel.value:
-                                    end_use_sums = (
-                                        normalized_consumption_per_bill[fuel]
-                                        .get(["baseload", "heating", "cooling"], 0)
-                                        .sum()
-                                        .to_dict()
-                                    )
-                                    summary[fuel] = {
-                                        "calibration_type": "detailed",
-                                        "model_type": getattr(reg_model, "MODEL_NAME", None),
-                                        "cvrmse": getattr(reg_model, "cvrmse", None),
-                                        "consumption": end_use_sums,
-                                    }
-                        else:
-                            comparison.update(
-                                self.compare_results(
-                                    normalized_consumption_per_bill, simulation_results
-                                )
-                            )
-
-                    except Bpi2400ModelFitError:
-                        logger.info(
-                            "Could not normalize consumption to weather with sufficient accuracy. Switching to simplified calibration technique."
-                        )
-                        simplified_results, normalized_annual_end_uses = (
-                            self.simplified_annual_usage(simulation_results, fuel_info, fuel)
-                        )
-                        comparison[fuel] = simplified_results.get(fuel, {})
-                        if for_summary:
-                            summary[fuel] = {
-                                "calibration_type": "simplified",
-                                "consumption": normalized_annual_end_uses,
-                            }
 
         return comparison, summary
 
     def create_measure_input_file(
-        self, arguments: dict, output_file_path: str, measure_path: str | None = None
+        self,
+        arguments: dict,
+        output_file_path: str,
+        measure_path: str | None = None,
+        simulation_output_dir: Path | None = None,
     ):
-        if measure_path is None:
-            measure_path = str(Path(__file__).resolve().parent.parent / "measures")
-        data = {
-            "run_directory": str(Path(arguments["save_file_path"]).parent),
-            "measure_paths": [measure_path],
-            "steps": [{"measure_dir_name": "ModifyXML", "arguments": arguments}],
-        }
-        Path(output_file_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        """Write an OpenStudio workflow (osw) file that runs the ModifyXML measure.
+
+        :param arguments: Arguments for the ModifyXML measure.
+        :type arguments: dict
+        :param output_file_path: Path to write the osw file to.
+        :type output_file_path: str
+        :param measure_path: Directory containing the ModifyXML measure, defaults to the
+            measures directory of this package.
+        :type measure_path: str | None, optional
+        :param simulation_output_dir: If provided, the workflow also translates and simulates the
+            modified HPXML file with OpenStudio-HPXML, writing results to this directory.
+        :type simulation_output_dir: Path | None, optional
+        """
+        create_measure_input_file(arguments, output_file_path, measure_path, simulation_output_dir)
 
     def run_search(
         self,
@@ -469,6 +364,9 @@ class Calibrate:
         num_proc=None,
         output_filepath=None,
         save_all_results=False,
+        resume=False,
+        shared_pool=None,
+        warm_start=None,
     ):
         """Run the genetic algorithm search for calibration.
 
@@ -486,12 +384,23 @@ class Calibrate:
         :type output_filepath: Path, optional
         :param save_all_results: If True, saves all simulation results.
         :type save_all_results: bool, optional
+        :param resume: If True, continue from the checkpoint in output_filepath, if there is one.
+        :type resume: bool, optional
+        :param shared_pool: Worker pool shared with other searches running at the same time. An
+            executor of num_proc processes is created for this search if not provided.
+        :type shared_pool: SharedPool, optional
+        :param warm_start: Logbook (``logbook.json``) or checkpoint (``checkpoint.pkl``) of a
+            previous calibration of this home. Its best genomes, and mutants of them, are
+            included in generation 0. Ignored when resuming from a checkpoint.
+        :type warm_start: Path, optional
         :return: Tuple containing best individual, population, logbook, error series, regression models, and results.
         :rtype: tuple
         """
         print(f"Running search algorithm for '{Path(self.hpxml_filepath).name}'...")
 
         all_temp_dirs = set()
+        # Generation archive member of each HPXML file archived, by its path
+        archived_hpxml = {}
         best_dirs_by_gen = []
         cfg = self.ga_config
         population_size = cfg["genetic_algorithm"]["population_size"]
@@ -538,130 +447,129 @@ class Calibrate:
         ]
         lighting_load_multiplier_choices = cfg["value_choices"]["lighting_load_multiplier_choices"]
 
-        normalized_consumption_per_bill = self.get_normalized_consumption_per_bill()
+        normalization_targets = self.get_normalization_targets()
 
-        def evaluate(individual):
-            try:
-                (
-                    misc_load_multiplier,
-                    heating_setpoint_offset,
-                    cooling_setpoint_offset,
-                    air_leakage_multiplier,
-                    heating_efficiency_multiplier,
-                    cooling_efficiency_multiplier,
-                    roof_r_value_multiplier,
-                    ceiling_r_value_multiplier,
-                    above_ground_walls_r_value_multiplier,
-                    below_ground_walls_r_value_multiplier,
-                    slab_r_value_multiplier,
-                    floor_r_value_multiplier,
-                    water_heater_efficiency_multiplier,
-                    water_fixtures_usage_multiplier,
-                    window_u_factor_multiplier,
-                    window_shgc_multiplier,
-                    appliance_usage_multiplier,
-                    lighting_load_multiplier,
-                ) = individual
-                temp_output_dir = Path(
-                    tempfile.mkdtemp(prefix=f"calib_test_{uuid.uuid4().hex[:6]}_")
-                )
-                mod_hpxml_path = temp_output_dir / "modified.xml"
-                arguments = {
-                    "xml_file_path": str(self.hpxml_filepath),
-                    "save_file_path": str(mod_hpxml_path),
-                    "misc_load_multiplier": misc_load_multiplier,
-                    "heating_setpoint_offset": heating_setpoint_offset,
-                    "cooling_setpoint_offset": cooling_setpoint_offset,
-                    "air_leakage_multiplier": air_leakage_multiplier,
-                    "heating_efficiency_multiplier": heating_efficiency_multiplier,
-                    "cooling_efficiency_multiplier": cooling_efficiency_multiplier,
-                    "roof_r_value_multiplier": roof_r_value_multiplier,
-                    "ceiling_r_value_multiplier": ceiling_r_value_multiplier,
-                    "above_ground_walls_r_value_multiplier": above_ground_walls_r_value_multiplier,
-                    "below_ground_walls_r_value_multiplier": below_ground_walls_r_value_multiplier,
-                    "slab_r_value_multiplier": slab_r_value_multiplier,
-                    "floor_r_value_multiplier": floor_r_value_multiplier,
-                    "water_heater_efficiency_multiplier": water_heater_efficiency_multiplier,
-                    "water_fixtures_usage_multiplier": water_fixtures_usage_multiplier,
-                    "window_u_factor_multiplier": window_u_factor_multiplier,
-                    "window_shgc_multiplier": window_shgc_multiplier,
-                    "appliance_usage_multiplier": appliance_usage_multiplier,
-                    "lighting_load_multiplier": lighting_load_multiplier,
-                }
+        # Run-wide record of every genome evaluated, so repeats are never re-simulated
+        archive = EvaluationArchive()
+        # Results of screening simulations, which aren't comparable with full-fidelity ones
+        screening_archive = EvaluationArchive()
 
-                temp_osw = Path(temp_output_dir / "modify_hpxml.osw")
-                self.create_measure_input_file(arguments, temp_osw)
+        initial_population = cfg["genetic_algorithm"]["initial_population"]
+        if initial_population not in INITIAL_POPULATION_DESIGNS:
+            raise ValueError(
+                f"Unknown genetic_algorithm initial_population '{initial_population}'. "
+                f"Must be one of {', '.join(INITIAL_POPULATION_DESIGNS)}."
+            )
+        warm_start_size = cfg["genetic_algorithm"]["warm_start_size"]
+        warm_start_mutants = cfg["genetic_algorithm"]["warm_start_mutants"]
+        if warm_start_size < 0 or warm_start_mutants < 0:
+            raise ValueError(
+                "Invalid genetic_algorithm warm_start_size or warm_start_mutants. "
+                "Must be 0 or more."
+            )
+        scheduler = cfg["genetic_algorithm"]["scheduler"]
+        if scheduler not in ("generational", "steady_state"):
+            raise ValueError(
+                f"Unknown genetic_algorithm scheduler '{scheduler}'. "
+                "Must be 'generational' or 'steady_state'."
+            )
 
-                app(["modify-xml", str(temp_osw)])
-                app(
-                    [
-                        "run-sim",
-                        str(mod_hpxml_path),
-                        "--output-dir",
-                        str(temp_output_dir),
-                        "--output-format",
-                        "json",
-                    ]
-                )
+        num_islands = cfg["genetic_algorithm"]["islands"]
+        migration_interval = cfg["genetic_algorithm"]["migration_interval"]
+        migration_size = cfg["genetic_algorithm"]["migration_size"]
+        if num_islands < 1 or population_size // num_islands < 2:
+            raise ValueError(
+                f"Invalid number of islands {num_islands}. Must be at least 1, with at least "
+                "2 individuals per island."
+            )
+        if num_islands > 1 and scheduler == "steady_state":
+            logger.warning("Islands are only used by the generational scheduler")
+            num_islands = 1
+
+        execution_mode = cfg["simulation"]["execution_mode"]
+        if execution_mode not in ("separate", "combined", "worker"):
+            raise ValueError(
+                f"Unknown simulation execution_mode '{execution_mode}'. "
+                "Must be 'separate', 'combined', or 'worker'."
+            )
 
-                output_file = temp_output_dir / "run" / "results_annual.json"
-                simulation_results = self.get_model_results(json_results_path=output_file)
-                comparison, _ = self._process_calibration_results(
-                    simulation_results, normalized_consumption_per_bill
-                )
+        executor_backend = cfg["simulation"]["executor"]
+        if executor_backend not in ("local", "socket"):
+            raise ValueError(
+                f"Unknown simulation executor '{executor_backend}'. Must be 'local' or 'socket'."
+            )
+        # The number of simulations running at once may follow the memory and load of this
+        # machine when they run on it
+        adaptive_concurrency = cfg["simulation"]["adaptive_concurrency"]
+        if adaptive_concurrency and shared_pool is None and executor_backend == "socket":
+            logger.warning("Adaptive concurrency is only used with the local executor")
+            adaptive_concurrency = False
+        memory_limit_gb = cfg["simulation"]["memory_limit_gb"]
+
+        # Modified HPXML files can only be written ahead of their simulations when the
+        # simulations run on this machine
+        batch_modify = execution_mode == "separate" and (
+            shared_pool is not None or executor_backend == "local"
+        )
 
-                for model_fuel_type, result in comparison.items():
-                    bias_error_criteria = self.ga_config["acceptance_criteria"][
-                        "bias_error_threshold"
-                    ]
-                    if model_fuel_type == "electricity":
-                        absolute_error_criteria = self.ga_config["acceptance_criteria"][
-                            "abs_error_elec_threshold"
-                        ]
-                    else:
-                        absolute_error_criteria = self.ga_config["acceptance_criteria"][
-                            "abs_error_fuel_threshold"
-                        ]
-                    for load_type in result["Bias Error"]:
-                        if abs(result["Bias Error"][load_type]) > bias_error_criteria:
-                            logger.debug(
-                                f"Bias error for {model_fuel_type} {load_type} is {result['Bias Error'][load_type]} but the limit is +/- {bias_error_criteria}"
-                            )
-                        if abs(result["Absolute Error"][load_type]) > absolute_error_criteria:
-                            logger.debug(
-                                f"Absolute error for {model_fuel_type} {load_type} is {result['Absolute Error'][load_type]} but the limit is +/- {absolute_error_criteria}"
-                            )
-
-                combined_error_penalties = []
-                for fuel_type, metrics in comparison.items():
-                    for end_use, bias_error in metrics["Bias Error"].items():
-                        if math.isnan(bias_error) or math.isnan(metrics["Absolute Error"][end_use]):
-                            continue  # Skip NaN values
-
-                        bias_err = abs(bias_error)
-                        abs_err = abs(metrics["Absolute Error"][end_use])
-
-                        log_bias_err = math.log1p(bias_err)  # log1p to avoid log(0)
-                        log_abs_err = math.log1p(abs_err)
-
-                        bias_error_penalty = max(0, log_bias_err) ** 2
-                        abs_error_penalty = max(0, log_abs_err) ** 2
-                        combined_error_penalty = bias_error_penalty + abs_error_penalty
-
-                        combined_error_penalties.append(combined_error_penalty)
-
-                total_score = sum(combined_error_penalties)
-
-                return (
-                    (total_score,),
-                    comparison,
-                    temp_output_dir,
-                    simulation_results,
+        # Early generations may be simulated with a coarser timestep, or only for
+        # representative periods of the year, to rank them faster
+        screening_timestep = cfg["simulation"]["screening_timestep"] or None
+        screening_weeks = cfg["simulation"]["screening_weeks"]
+        screening_generations = min(cfg["simulation"]["screening_generations"], generations)
+        if screening_timestep is not None:
+            if 60 % screening_timestep:
+                raise ValueError(
+                    f"Invalid simulation screening_timestep {screening_timestep}. "
+                    "Must divide evenly into 60."
                 )
-
-            except Exception as e:
-                logger.error(f"Error evaluating individual {individual}: {e}")
-                return (float("inf"),), {}, None
+            home_timestep = self.hpxml.xpath(
+                "h:SoftwareInfo/h:extension/h:SimulationControl/h:Timestep/text()"
+            )
+            home_timestep = int(home_timestep[0]) if home_timestep else 60
+            if screening_timestep <= home_timestep:
+                logger.warning(
+                    f"The home is simulated with a {home_timestep} minute timestep, so screening "
+                    f"with a {screening_timestep} minute timestep would not be faster"
+                )
+                screening_timestep = None
+        run_periods = (
+            get_run_periods(cfg["simulation"]["screening_months"], screening_weeks)
+            if screening_weeks
+            else ()
+        )
+        screening_fidelity = None
+        if screening_timestep is not None or run_periods:
+            if scheduler == "steady_state":
+                logger.warning("Screening is only used by the generational scheduler")
+            else:
+                screening_fidelity = ScreeningFidelity(
+                    timestep=screening_timestep, run_periods=run_periods
+                )
+        if screening_fidelity is None:
+            screening_generations = 0
+
+        # Results persisted by earlier calibration runs of this home
+        simulation_cache = SimulationCache() if cfg["simulation"]["cache_enabled"] else None
+
+        # Where each individual's modified HPXML file and simulation output are written
+        scratch_dir = cfg["simulation"]["scratch_dir"]
+        if scratch_dir is not None:
+            scratch_dir = Path(scratch_dir)
+            scratch_dir.mkdir(parents=True, exist_ok=True)
+        cache_key_fields = None
+        if simulation_cache is not None:
+            cache_key_fields = (
+                calculate_sha256(self.hpxml_filepath),
+                get_openstudio_version(),
+                {
+                    "output_format": "json",
+                    "skip_validation": True,
+                    "modify_xml_measure": calculate_sha256(
+                        MEASURES_PATH / "ModifyXML" / "measure.rb"
+                    ),
+                },
+            )
 
         def abs_error_within_threshold(
             fuel_type: str, abs_error: float, elec_threshold: float, fuel_threshold: float
@@ -671,9 +579,6 @@ class Calibrate:
             else:
                 return abs(abs_error) <= fuel_threshold
 
-        def diversity(pop):
-            return len({tuple(ind) for ind in pop}) / len(pop)
-
         def calc_stats(values):
             if not values:
                 return {"min": None, "max": None, "median": None, "std": None}
@@ -707,70 +612,70 @@ class Calibrate:
 
             return all_bias_err_limit_met or all_abs_err_limit_met
 
+        # Each search has its own random number stream, so homes calibrated together in one
+        # process don't share one
+        rng = random.Random(global_seed)
+
         toolbox = base.Toolbox()
-        toolbox.register("attr_misc_load_multiplier", random.choice, misc_load_multiplier_choices)
-        toolbox.register(
-            "attr_heating_setpoint_offset", random.choice, heating_setpoint_offset_choices
-        )
+        toolbox.register("attr_misc_load_multiplier", rng.choice, misc_load_multiplier_choices)
         toolbox.register(
-            "attr_cooling_setpoint_offset", random.choice, cooling_setpoint_offset_choices
+            "attr_heating_setpoint_offset", rng.choice, heating_setpoint_offset_choices
         )
         toolbox.register(
-            "attr_air_leakage_multiplier", random.choice, air_leakage_multiplier_choices
+            "attr_cooling_setpoint_offset", rng.choice, cooling_setpoint_offset_choices
         )
+        toolbox.register("attr_air_leakage_multiplier", rng.choice, air_leakage_multiplier_choices)
         toolbox.register(
             "attr_heating_efficiency_multiplier",
-            random.choice,
+            rng.choice,
             heating_efficiency_multiplier_choices,
         )
         toolbox.register(
             "attr_cooling_efficiency_multiplier",
-            random.choice,
+            rng.choice,
             cooling_efficiency_multiplier_choices,
         )
         toolbox.register(
-            "attr_roof_r_value_multiplier", random.choice, roof_r_value_multiplier_choices
+            "attr_roof_r_value_multiplier", rng.choice, roof_r_value_multiplier_choices
         )
         toolbox.register(
-            "attr_ceiling_r_value_multiplier", random.choice, ceiling_r_value_multiplier_choices
+            "attr_ceiling_r_value_multiplier", rng.choice, ceiling_r_value_multiplier_choices
         )
         toolbox.register(
             "attr_above_ground_walls_r_value_multiplier",
-            random.choice,
+            rng.choice,
             above_ground_walls_r_value_multiplier_choices,
         )
         toolbox.register(
             "attr_below_ground_walls_r_value_multiplier",
-            random.choice,
+            rng.choice,
             below_ground_walls_r_value_multiplier_choices,
         )
         toolbox.register(
-            "attr_slab_r_value_multiplier", random.choice, slab_r_value_multiplier_choices
+            "attr_slab_r_value_multiplier", rng.choice, slab_r_value_multiplier_choices
         )
         toolbox.register(
-            "attr_floor_r_value_multiplier", random.choice, floor_r_value_multiplier_choices
+            "attr_floor_r_value_multiplier", rng.choice, floor_r_value_multiplier_choices
         )
         toolbox.register(
             "attr_water_heater_efficiency_multiplier",
-            random.choice,
+            rng.choice,
             water_heater_efficiency_multiplier_choices,
         )
         toolbox.register(
             "attr_water_fixtures_usage_multiplier",
-            random.choice,
+            rng.choice,
             water_fixtures_usage_multiplier_choices,
         )
         toolbox.register(
-            "attr_window_u_factor_multiplier", random.choice, window_u_factor_multiplier_choices
+            "attr_window_u_factor_multiplier", rng.choice, window_u_factor_multiplier_choices
         )
+        toolbox.register("attr_window_shgc_multiplier", rng.choice, window_shgc_multiplier_choices)
         toolbox.register(
-            "attr_window_shgc_multiplier", random.choice, window_shgc_multiplier_choices
+            "attr_appliance_usage_multiplier", rng.choice, appliance_usage_multiplier_choices
         )
         toolbox.register(
-            "attr_appliance_usage_multiplier", random.choice, appliance_usage_multiplier_choices
-        )
-        toolbox.register(
-            "attr_lighting_load_multiplier", random.choice, lighting_load_multiplier_choices
+            "attr_lighting_load_multiplier", rng.choice, lighting_load_multiplier_choices
         )
         toolbox.register(
             "individual",
@@ -826,24 +731,24 @@ class Calibrate:
         def generate_random_individual():
             return creator.Individual(
                 [
-                    random.choice(misc_load_multiplier_choices),
-                    random.choice(heating_setpoint_offset_choices),
-                    random.choice(cooling_setpoint_offset_choices),
-                    random.choice(air_leakage_multiplier_choices),
-                    random.choice(heating_efficiency_multiplier_choices),
-                    random.choice(cooling_efficiency_multiplier_choices),
-                    random.choice(roof_r_value_multiplier_choices),
-                    random.choice(ceiling_r_value_multiplier_choices),
-                    random.choice(above_ground_walls_r_value_multiplier_choices),
-                    random.choice(below_ground_walls_r_value_multiplier_choices),
-                    random.choice(slab_r_value_multiplier_choices),
-                    random.choice(floor_r_value_multiplier_choices),
-                    random.choice(water_heater_efficiency_multiplier_choices),
-                    random.choice(water_fixtures_usage_multiplier_choices),
-                    random.choice(window_u_factor_multiplier_choices),
-                    random.choice(window_shgc_multiplier_choices),
-                    random.choice(appliance_usage_multiplier_choices),
-                    random.choice(lighting_load_multiplier_choices),
+                    rng.choice(misc_load_multiplier_choices),
+                    rng.choice(heating_setpoint_offset_choices),
+                    rng.choice(cooling_setpoint_offset_choices),
+                    rng.choice(air_leakage_multiplier_choices),
+                    rng.choice(heating_efficiency_multiplier_choices),
+                    rng.choice(cooling_efficiency_multiplier_choices),
+                    rng.choice(roof_r_value_multiplier_choices),
+                    rng.choice(ceiling_r_value_multiplier_choices),
+                    rng.choice(above_ground_walls_r_value_multiplier_choices),
+                    rng.choice(below_ground_walls_r_value_multiplier_choices),
+                    rng.choice(slab_r_value_multiplier_choices),
+                    rng.choice(floor_r_value_multiplier_choices),
+                    rng.choice(water_heater_efficiency_multiplier_choices),
+                    rng.choice(water_fixtures_usage_multiplier_choices),
+                    rng.choice(window_u_factor_multiplier_choices),
+                    rng.choice(window_shgc_multiplier_choices),
+                    rng.choice(appliance_usage_multiplier_choices),
+                    rng.choice(lighting_load_multiplier_choices),
                 ]
             )
 
@@ -861,7 +766,7 @@ class Calibrate:
         toolbox.register("individual", generate_random_individual)
         toolbox.register("population", tools.initRepeat, list, toolbox.individual)
         toolbox.register("evaluate", evaluate)
-        toolbox.register("mate", tools.cxUniform, indpb=cxpb)
+        toolbox.register("mate", cx_uniform, indpb=cxpb, rng=rng)
 
         # Define parameter-to-choices mapping for mutation
         param_choices_map = {
@@ -885,6 +790,23 @@ class Calibrate:
             "lighting_load_multiplier": lighting_load_multiplier_choices,
         }
 
+        # Sent to each pool worker once, so evaluation tasks only carry the genome (a shared
+        # pool sends it with each task instead, since its workers serve several homes)
+        context = EvaluationContext(
+            hpxml_filepath=self.hpxml_filepath,
+            parameter_names=tuple(param_choices_map),
+            normalization_targets=normalization_targets,
+            heats_with_electricity=self.hpxml.profile.heats_with_electricity,
+            bias_error_threshold=bias_error_threshold,
+            abs_error_elec_threshold=abs_error_elec_threshold,
+            abs_error_fuel_threshold=abs_error_fuel_threshold,
+            execution_mode=execution_mode,
+            simulation_cache=simulation_cache,
+            cache_key_fields=cache_key_fields,
+            scratch_dir=scratch_dir,
+            memory_limit=None if memory_limit_gb is None else int(memory_limit_gb * 1024**3),
+        )
+
         worst_end_uses_by_gen = []
 
         end_use_param_map = {
@@ -947,7 +869,7 @@ class Calibrate:
                         worst_end_use_key = key
             return worst_end_use_key
 
-        def adaptive_mutation(individual):
+        def adaptive_mutation(individual, rng):
             mutation_indices = set()
 
             if worst_end_uses_by_gen:
@@ -959,68 +881,382 @@ class Calibrate:
                     ]
                     if impacted_indices:
                         mutation_indices.update(
-                            random.sample(impacted_indices, min(len(impacted_indices), 2))
+                            rng.sample(impacted_indices, min(len(impacted_indices), 2))
                         )
 
-            while len(mutation_indices) < random.randint(3, 6):
-                mutation_indices.add(random.randint(0, len(individual) - 1))
+            while len(mutation_indices) < rng.randint(3, 6):
+                mutation_indices.add(rng.randint(0, len(individual) - 1))
 
             for i in mutation_indices:
                 current_val = individual[i]
                 param_name = index_to_name[i]
                 choices = [val for val in param_choices_map[param_name] if val != current_val]
                 if choices:
-                    individual[i] = random.choice(choices)
+                    individual[i] = rng.choice(choices)
             return (individual,)
 
-        toolbox.register("mutate", adaptive_mutation)
-        toolbox.register("select", tools.selTournament, tournsize=2)
+        toolbox.register("mutate", adaptive_mutation, rng=rng)
+        toolbox.register("clone", clone_individual)
+
+        # The existing home's values may not be among the choices
+        seed_individual = create_seed_individual()
+        encoding = ChoiceEncoding(
+            {
+                name: [*choices, seed_value]
+                for (name, choices), seed_value in zip(param_choices_map.items(), seed_individual)
+            }
+        )
+        toolbox.register("select", sel_tournament, tournsize=2, rng=rng)
+
+        def create_warm_start_individuals(seed_individual):
+            """The best distinct genomes of the previous run, and mutants of them, for
+            generation 0. Together they leave room for at least the seed individual."""
+            genomes = [
+                genome
+                for genome in warm_start_genomes(warm_start, param_choices_map, seed_individual)
+                if genome != seed_individual
+            ]
+            individuals = [
+                creator.Individual(genome)
+                for genome in genomes[: min(warm_start_size, population_size - 1)]
+            ]
+            if not individuals:
+                logger.warning(f"No genomes to warm-start from in {warm_start}")
+                return []
+            seen = {genome_key(ind) for ind in [seed_individual, *individuals]}
+            num_mutants = min(warm_start_mutants, population_size - 1 - len(individuals))
+            mutants = []
+            # Give up on distinct mutants if the value choices don't allow enough of them
+            for i in range(num_mutants * 10):
+                if len(mutants) == num_mutants:
+                    break
+                (mutant,) = toolbox.mutate(toolbox.clone(individuals[i % len(individuals)]))
+                if genome_key(mutant) not in seen:
+                    seen.add(genome_key(mutant))
+                    mutants.append(mutant)
+            logger.info(
+                f"Warm-starting from {len(individuals)} genomes of {warm_start} and "
+                f"{len(mutants)} mutants of them"
+            )
+            return individuals + mutants
 
         calibration_success = False
 
-        if num_proc is None:
-            num_proc = multiprocessing.cpu_count() - 1
+        hall_of_fame = tools.HallOfFame(1)
+        stats = tools.Statistics(lambda ind: ind.fitness.values[0])  # noqa: PD011
+        stats.register("min", min)
+        stats.register("avg", lambda x: sum(x) / len(x))
+
+        logbook = tools.Logbook()
+        logbook.header = ["gen", "nevals", "cache_hits", "cache_misses", "min", "avg", "diversity"]
+
+        # Predicts which offspring are worth simulating
+        surrogate_cfg = cfg["surrogate"]
+        surrogate = None
+        if surrogate_cfg["enabled"]:
+            if scheduler == "generational":
+                surrogate = SurrogateModel(
+                    list(param_choices_map.values()), alpha=surrogate_cfg["ridge_alpha"]
+                )
+                logbook.header += ["surrogate_skipped", "surrogate_rank_correlation"]
+            else:
+                logger.warning("The surrogate is only used by the generational scheduler")
+        if screening_generations:
+            logbook.header += ["screening", "promoted"]
+
+        # Each island breeds with its own random number stream
+        island_rngs = island_random_generators(num_islands, rng)
+
+        best_bias_series = {}
+        best_abs_series = {}
+
+        # Seconds taken by each simulation, which the simulation time limit adapts to
+        simulation_durations = []
+        screening_durations = []
+        timeouts = []
+        stragglers = []
+
+        def get_screening_fidelity(gen):
+            return screening_fidelity if gen < screening_generations else None
+
+        def get_timeout(fidelity=None):
+            return get_simulation_timeout(
+                simulation_durations if fidelity is None else screening_durations,
+                cfg["simulation"]["timeout_seconds"],
+                cfg["simulation"]["timeout_median_multiplier"],
+            )
 
-        with Pool(
-            processes=num_proc,
-            maxtasksperchild=15,
-            initializer=init_worker,
-            initargs=(global_seed,),
-        ) as pool:
-            toolbox.register("map", pool.map)
-            pop = toolbox.population(n=population_size - 1)
-            pop.append(create_seed_individual())  # Add existing model as seed individual
-            hall_of_fame = tools.HallOfFame(1)
-            stats = tools.Statistics(lambda ind: ind.fitness.values[0])  # noqa: PD011
-            stats.register("min", min)
-            stats.register("avg", lambda x: sum(x) / len(x))
-
-            logbook = tools.Logbook()
-            logbook.header = ["gen", "nevals", "min", "avg", "diversity"]
-
-            best_bias_series = {}
-            best_abs_series = {}
-
-            # Initial evaluation
-            invalid_ind = [ind for ind in pop if not ind.fitness.valid]
-            fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
-            for ind, (fit, comp, temp_dir, sim_results) in zip(invalid_ind, fitnesses):
-                ind.fitness.values = fit
-                ind.comparison = comp
-                ind.temp_output_dir = temp_dir
-                ind.sim_results = sim_results
-                if temp_dir is not None:
-                    all_temp_dirs.add(temp_dir)
-
-            # Save all individual hpxmls
-            if temp_dir is not None and Path(temp_dir).exists():
-                gen_dir = output_filepath / "gen_0"
-                gen_dir.mkdir(parents=True, exist_ok=True)
-                shutil.copy(
-                    temp_dir / "modified.xml",
-                    gen_dir / f"ind_{uuid.uuid4().hex[:6]}.xml",
+        def get_soft_timeout(fidelity=None):
+            return get_simulation_timeout(
+                simulation_durations if fidelity is None else screening_durations,
+                cfg["simulation"]["soft_timeout_seconds"],
+                cfg["simulation"]["soft_timeout_median_multiplier"],
+            )
+
+        def record_duration(result, fidelity=None, submitted=None):
+            generation_timings.add(result.timing, submitted)
+            if result.straggler:
+                stragglers.append(result)
+            if result.duration is not None:
+                (simulation_durations if fidelity is None else screening_durations).append(
+                    result.duration
+                )
+            elif result.status == EvaluationStatus.TIMEOUT:
+                timeouts.append(result)
+
+        def get_archive(fidelity=None):
+            return archive if fidelity is None else screening_archive
+
+        def evaluate_individuals(individuals, fidelity=None):
+            """Evaluate individuals, simulating each distinct genome at most once per run.
+
+            Individuals are simulated with the given screening fidelity, or at full fidelity
+            if it is None.
+
+            Returns the number of individuals whose results came from the archive
+            (cache hits) and the number that had to be simulated (cache misses).
+            """
+            fidelity_archive = get_archive(fidelity)
+            cache_hits = 0
+            pending = {}
+            for ind in individuals:
+                result = fidelity_archive.get(ind)
+                if result is None:
+                    pending.setdefault(genome_key(ind), []).append(ind)
+                else:
+                    apply_result(ind, result)
+                    cache_hits += 1
+
+            genomes = list(pending)
+            if batch_modify:
+                temp_output_dirs = modify_hpxml_batch(genomes, fidelity)
+                all_temp_dirs.update(temp_output_dirs)
+            else:
+                temp_output_dirs = [None] * len(genomes)
+
+            # A different genome may already have produced an identical HPXML file
+            results = [None] * len(genomes)
+            to_simulate = []
+            for i, temp_output_dir in enumerate(temp_output_dirs):
+                mod_hpxml_path = temp_output_dir / "modified.xml" if temp_output_dir else None
+                if mod_hpxml_path is not None and mod_hpxml_path.exists():
+                    xml_hash = calculate_sha256(mod_hpxml_path)
+                    if xml_hash in fidelity_archive.results_by_xml_hash:
+                        results[i] = replace(
+                            fidelity_archive.results_by_xml_hash[xml_hash],
+                            temp_output_dir=temp_output_dir,
+                            from_cache=True,
+                        )
+                        continue
+                to_simulate.append(i)
+
+            submitted = time.monotonic()
+            simulated = toolbox.map(
+                toolbox.evaluate,
+                [genomes[i] for i in to_simulate],
+                [temp_output_dirs[i] for i in to_simulate],
+                [get_timeout(fidelity)] * len(to_simulate),
+                [fidelity] * len(to_simulate),
+                [get_soft_timeout(fidelity)] * len(to_simulate),
+            )
+            for i, result in zip(to_simulate, simulated):
+                results[i] = result
+                record_duration(result, fidelity, submitted)
+
+            for inds, result in zip(pending.values(), results):
+                fidelity_archive.add(inds[0], result)
+                if result.temp_output_dir is not None:
+                    all_temp_dirs.add(result.temp_output_dir)
+                # Duplicates within the generation reuse the first one's simulation
+                cache_hits += len(inds) - 1 + int(result.from_cache)
+                for ind in inds:
+                    apply_result(ind, result)
+
+            return cache_hits, len(individuals) - cache_hits
+
+        def promote(individuals):
+            """Re-evaluate screened individuals at full fidelity, in place."""
+            for ind in individuals:
+                del ind.fitness.values
+            evaluate_individuals(individuals)
+
+        def modify_hpxml_batch(genomes, fidelity=None):
+            """Write the modified HPXML files for a generation with one ModifyXML call per process.
+
+            Returns the temp output directory each genome's modified.xml is written to, or
+            whose period_<n> subdirectories the modified.xml of each run period is written
+            to. Genomes with results in the simulation cache are skipped.
+            """
+            timestep = None if fidelity is None else fidelity.timestep
+            run_periods = () if fidelity is None else fidelity.run_periods
+            temp_output_dirs = []
+            jobs = []
+            for genome in genomes:
+                temp_output_dir = make_temp_output_dir(scratch_dir)
+                temp_output_dirs.append(temp_output_dir)
+                arguments = context.genome_arguments(genome, timestep)
+                if run_periods:
+                    for i, run_period in enumerate(run_periods):
+                        period_dir = temp_output_dir / f"period_{i}"
+                        period_dir.mkdir()
+                        jobs.append(
+                            {
+                                "save_file_path": str(period_dir / "modified.xml"),
+                                **arguments,
+                                **fidelity.run_period_arguments(run_period),
+                            }
+                        )
+                    continue
+                if (
+                    simulation_cache is not None
+                    and context.cache_key(genome, timestep) in simulation_cache
+                ):
+                    continue
+                jobs.append({"save_file_path": str(temp_output_dir / "modified.xml"), **arguments})
+            if jobs:
+                num_batches = min(num_proc, len(jobs))
+                submitted = time.monotonic()
+                batch_timings = toolbox.map(
+                    run_modify_batch,
+                    [jobs[i::num_batches] for i in range(num_batches)],
+                )
+                for timing in batch_timings:
+                    generation_timings.add(timing, submitted)
+            return temp_output_dirs
+
+        def generation_hpxml_path(ind):
+            """Get the modified HPXML file of an evaluated individual.
+
+            Individuals screened with run periods only have the HPXML files of their run
+            periods, which differ only in the run period, so the first one is used.
+            """
+            for hpxml_filepath in (
+                ind.temp_output_dir / "modified.xml",
+                ind.temp_output_dir / "period_0" / "modified.xml",
+            ):
+                if hpxml_filepath.exists() or str(hpxml_filepath) in archived_hpxml:
+                    return hpxml_filepath
+            return ind.temp_output_dir / "modified.xml"
+
+        def save_generation_hpxml(gen, individuals):
+            """Append the HPXML files of the generation's distinct individuals to the run's
+            generation archive, with their annual results if all results are saved."""
+            distinct = {
+                genome_key(ind): ind
+                for ind in individuals
+                if getattr(ind, "temp_output_dir", None) is not None
+            }
+            append_generation(
+                generation_archive_path,
+                gen,
+                [
+                    {
+                        "hpxml_filepath": generation_hpxml_path(ind),
+                        "parameters": dict(zip(param_choices_map.keys(), ind)),
+                        "fitness": ind.fitness.values[0],  # noqa: PD011
+                        "sim_results": ind.sim_results if save_all_results else None,
+                    }
+                    for ind in distinct.values()
+                ],
+                archived_hpxml,
+            )
+
+        def remove_unused_temp_dirs(pop, in_flight_dirs=()):
+            """Delete the temp dirs of individuals that are no longer needed.
+
+            Only the population, the hall of fame, and simulations still running keep their
+            temp dirs, so scratch space stays bounded by the population size instead of
+            growing with every generation. Individuals that are evaluated again later come
+            from the archive with the temp dir of their first evaluation, which may be gone;
+            their HPXML file is copied from where it was first put in the generation archive.
+            """
+            keep = {
+                ind.temp_output_dir
+                for ind in (*pop, *hall_of_fame)
+                if getattr(ind, "temp_output_dir", None) is not None
+            }
+            keep.update(in_flight_dirs)
+            unused = [temp_dir for temp_dir in all_temp_dirs if temp_dir not in keep]
+            for temp_dir in unused:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                all_temp_dirs.discard(temp_dir)
+
+        def screen_offspring(individuals, fidelity=None):
+            """Choose which new offspring to simulate, using the surrogate's predictions.
+
+            Offspring predicted to be best are simulated, plus a random sample of the rest
+            so the surrogate keeps learning about the whole search space. Offspring that were
+            already simulated aren't screened, since they cost nothing.
+
+            Returns the offspring to skip and the predicted fitness of the screened offspring
+            that will be simulated.
+            """
+            fidelity_archive = get_archive(fidelity)
+            candidates = [ind for ind in individuals if ind not in fidelity_archive]
+            if not candidates or len(fidelity_archive) < surrogate_cfg["min_training_samples"]:
+                return [], {}
+
+            genomes, results = zip(
+                *((genome, result.sim_results) for genome, result in fidelity_archive.items())
+            )
+            surrogate.fit(genomes, results)
+            predicted = surrogate.predict_fitness(candidates, normalization_targets)
+
+            ranked = sorted(range(len(candidates)), key=lambda i: predicted[i])
+            num_keep = math.ceil(len(candidates) * surrogate_cfg["keep_fraction"])
+            rest = ranked[num_keep:]
+            explored = rng.sample(rest, round(len(rest) * surrogate_cfg["exploration_fraction"]))
+            simulated = set(ranked[:num_keep]) | set(explored)
+            skipped = [candidates[i] for i in rest if i not in simulated]
+            return skipped, {id(candidates[i]): predicted[i] for i in simulated}
+
+        def fit_screening_scaling(pop):
+            """Fit the factors that scale run period results to annual results for this home.
+
+            The existing home and a few other individuals are simulated both for the whole
+            year and for the run periods. The whole-year results are archived like any other,
+            so these individuals are never simulated in full again; the unscaled run period
+            results are only used for the fit.
+            """
+            seed = next(ind for ind in pop if is_existing_home(ind, param_choices_map))
+            others = [ind for ind in pop if genome_key(ind) != genome_key(seed)]
+            num_runs = cfg["simulation"]["screening_calibration_runs"]
+            sample = [toolbox.clone(ind) for ind in [seed, *others[: num_runs - 1]]]
+            evaluate_individuals(sample)
+
+            unscaled = replace(screening_fidelity, period_scaling=None)
+            temp_output_dirs = [make_temp_output_dir(scratch_dir) for _ in sample]
+            all_temp_dirs.update(temp_output_dirs)
+            submitted = time.monotonic()
+            period_results = toolbox.map(
+                toolbox.evaluate,
+                [list(ind) for ind in sample],
+                temp_output_dirs,
+                [get_timeout(unscaled)] * len(sample),
+                [unscaled] * len(sample),
+                [get_soft_timeout(unscaled)] * len(sample),
+            )
+            pairs = []
+            for ind, result in zip(sample, period_results):
+                record_duration(result, unscaled, submitted)
+                if result.status == EvaluationStatus.SUCCESS and math.isfinite(
+                    ind.fitness.values[0]  # noqa: PD011
+                ):
+                    pairs.append((ind.sim_results, result.sim_results))
+            if not pairs:
+                logger.warning(
+                    "Unable to fit the scaling of run period results to annual results, "
+                    "scaling them by the fraction of the year simulated instead"
                 )
+                return {}
+            scaling = fit_period_scaling(*zip(*pairs))
+            logger.info(
+                f"Scaling run period results to annual results from {len(pairs)} individuals: "
+                f"{scaling}"
+            )
+            return scaling
 
+        def record_generation(gen, pop, nevals, cache_hits, cache_misses, extra_fields=None):
             # Update Hall of Fame and stats
             hall_of_fame.update(pop)
             best_ind = tools.selBest(pop, 1)[0]
@@ -1037,22 +1273,14 @@ class Calibrate:
                     best_abs_series.setdefault(key, []).append(abs_error)
 
             # Parameter statistics
-            param_stats = {
-                pname: {
-                    "min": min(values := [ind[i] for ind in pop]),
-                    "max": max(values),
-                    "median": statistics.median(values),
-                    "std": statistics.pstdev(values) if len(values) > 1 else 0.0,
-                }
-                for i, pname in index_to_name.items()
-            }
+            param_stats = encoding.parameter_stats(pop)
 
             # Simulation result statistics
             sim_result_stats = {}
             all_results = {
                 ind.temp_output_dir.stem: ind.sim_results
                 for ind in pop
-                if hasattr(ind, "sim_results")
+                if getattr(ind, "sim_results", None) is not None
             }
             if all_results:
                 fuel_enduse_keys = {
@@ -1070,142 +1298,424 @@ class Calibrate:
                     if vals:
                         sim_result_stats[f"{fuel_type}_{end_use}"] = calc_stats(vals)
 
-            # Log generation 0
-            record = stats.compile(pop)
+            # Log the current generation. Only scalar columns are kept in memory; the full
+            # record, with the nested results, is appended to the logbook file.
+            record = {
+                "gen": gen,
+                "nevals": nevals,
+                "cache_hits": cache_hits,
+                "cache_misses": cache_misses,
+                **stats.compile(pop),
+            }
             record.update({f"bias_error_{k}": v[-1] for k, v in best_bias_series.items()})
             record.update({f"abs_error_{k}": v[-1] for k, v in best_abs_series.items()})
-            record["best_individual"] = json.dumps(dict(zip(param_choices_map.keys(), best_ind)))
-            record["best_individual_sim_results"] = json.dumps(best_ind.sim_results)
-            record["diversity"] = diversity(pop)
-            record["parameter_choice_stats"] = json.dumps(param_stats)
-            record["simulation_result_stats"] = json.dumps(sim_result_stats)
-            if save_all_results:
-                record["all_simulation_results"] = json.dumps(all_results)
-            logbook.record(gen=0, nevals=len(invalid_ind), **record)
+            record["diversity"] = encoding.diversity(pop)
+            if extra_fields is not None:
+                record.update(extra_fields)
+            logbook.record(**record)
             print(logbook.stream)
 
-            # Store existing home (seed individual) results
-            existing_home_results = {}
-            for ind in pop:
-                if is_existing_home(ind, param_choices_map):
-                    existing_home_results["existing_home_sim_results"] = json.dumps(ind.sim_results)
-                    break
-
-            # Construct weather-normalized regression model summary
-            _, weather_norm_regression_models = self._process_calibration_results(
-                existing_home_results["existing_home_sim_results"],
-                normalized_consumption_per_bill,
-                for_summary=True,
-            )
-
-            for gen in range(1, generations + 1):
-                # Elitism: Copy the best individuals
-                elite = [copy.deepcopy(ind) for ind in tools.selBest(pop, k=1)]
+            record["timing"] = generation_timings.finish(gen)
 
-                # Generate offspring
-                offspring = algorithms.varAnd(pop, toolbox, cxpb=cxpb, mutpb=mutpb)
+            record["best_individual"] = dict(zip(param_choices_map.keys(), best_ind))
+            record["best_individual_sim_results"] = best_ind.sim_results
+            record["parameter_choice_stats"] = param_stats
+            record["simulation_result_stats"] = sim_result_stats
+            if save_all_results:
+                record["all_simulation_results"] = all_results
+            append_logbook_record(logbook_path, record)
+            return best_ind
+
+        checkpoint_path = output_filepath / CHECKPOINT_FILENAME
+        generation_archive_path = output_filepath / GENERATION_ARCHIVE_FILENAME
+        logbook_path = output_filepath / LOGBOOK_FILENAME
+        timings_path = output_filepath / TIMINGS_FILENAME
+        checkpoint_interval = cfg["genetic_algorithm"]["checkpoint_interval"]
+        # A checkpoint is only resumed if the population it holds was scored against the same home
+        run_fingerprint = {
+            "hpxml": calculate_sha256(self.hpxml_filepath),
+            "normalization_targets": normalization_targets,
+            "population_size": population_size,
+            "scheduler": scheduler,
+            "islands": num_islands,
+            "value_choices": cfg["value_choices"],
+        }
 
-                # Evaluate offspring
-                invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-                fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
-                for ind, (fit, comp, temp_dir, sim_results) in zip(invalid_ind, fitnesses):
-                    ind.fitness.values = fit
-                    ind.comparison = comp
-                    ind.temp_output_dir = temp_dir
-                    ind.sim_results = sim_results
-                    all_temp_dirs.add(temp_dir)
+        def write_checkpoint(gen, pop, success):
+            if not checkpoint_due(gen, checkpoint_interval, generations, success):
+                return
+            save_search_checkpoint(
+                checkpoint_path,
+                run_fingerprint,
+                gen,
+                success,
+                {
+                    "pop": pop,
+                    "hall_of_fame": hall_of_fame,
+                    "logbook": logbook,
+                    "best_bias_series": best_bias_series,
+                    "best_abs_series": best_abs_series,
+                    "worst_end_uses_by_gen": worst_end_uses_by_gen,
+                    "best_dirs_by_gen": best_dirs_by_gen,
+                    "archive": archive,
+                    "screening_archive": screening_archive,
+                    "simulation_durations": simulation_durations,
+                    "screening_durations": screening_durations,
+                    "screening_fidelity": screening_fidelity,
+                    "timeouts": timeouts,
+                    "stragglers": stragglers,
+                    "all_temp_dirs": all_temp_dirs,
+                    "archived_hpxml": archived_hpxml,
+                    "existing_home_results": existing_home_results,
+                    "weather_norm_regression_models": weather_norm_regression_models,
+                    "random_state": rng.getstate(),
+                    "island_random_states": (
+                        [island_rng.getstate() for island_rng in island_rngs]
+                        if num_islands > 1
+                        else None
+                    ),
+                },
+            )
 
-                # Select next generation (excluding elites), then add elites
-                if invalid_ind:
-                    worst_key = get_worst_abs_err_end_use(invalid_ind[0].comparison)
-                    worst_end_uses_by_gen.append(worst_key)
+        def run_steady_state(pool, pop, start_gen=0):
+            """Evolve the population with a ``SteadyStateScheduler``.
+
+            Returns the final population and whether calibration succeeded.
+            """
+
+            def submit(child):
+                child.temp_output_dir = make_temp_output_dir(scratch_dir)
+                all_temp_dirs.add(child.temp_output_dir)
+                return pool.apipe(
+                    toolbox.evaluate,
+                    tuple(child),
+                    child.temp_output_dir,
+                    get_timeout(),
+                    None,
+                    get_soft_timeout(),
+                )
 
-                pop = toolbox.select(offspring, population_size - len(elite))
-                pop.extend(elite)
+            def on_result(child, result, submitted):
+                record_duration(result, submitted=submitted)
+                if concurrency is not None:
+                    concurrency.record(result.peak_rss)
 
-                # Save all individual hpxmls
-                if temp_dir is not None and Path(temp_dir).exists():
-                    gen_dir = output_filepath / f"gen_{gen}"
-                    gen_dir.mkdir(parents=True, exist_ok=True)
-                    shutil.copy(
-                        temp_dir / "modified.xml",
-                        gen_dir / f"ind_{uuid.uuid4().hex[:6]}.xml",
+            def on_generation(gen, pop, offspring, cache_hits, in_use_dirs):
+                worst_end_uses_by_gen.append(get_worst_abs_err_end_use(offspring[0].comparison))
+                save_generation_hpxml(gen, offspring)
+                best_ind = record_generation(
+                    gen, pop, len(offspring), cache_hits, len(offspring) - cache_hits
+                )
+                remove_unused_temp_dirs(pop, in_use_dirs)
+                success = meets_termination_criteria(best_ind.comparison)
+                write_checkpoint(gen, pop, success)
+                return success
+
+            return SteadyStateScheduler(
+                pop,
+                toolbox,
+                archive,
+                population_size,
+                (generations - start_gen) * population_size,
+                cxpb,
+                mutpb,
+                submit=submit,
+                on_result=on_result,
+                on_generation=on_generation,
+                concurrency_limit=concurrency_limit,
+                start_gen=start_gen,
+                rng=rng,
+            ).run()
+
+        def run_generational(pop, start_gen=0):
+            """Evolve the population with a ``GenerationalScheduler``.
+
+            Returns the final population and whether calibration succeeded.
+            """
+            # Evaluation stats of the current generation, for its logbook record
+            evaluation = {}
+
+            def before_generation(gen, pop):
+                if screening_generations and gen == screening_generations:
+                    # Screening is over, so bring the population to full fidelity before it
+                    # competes with full-fidelity offspring
+                    promote(pop)
+                    hall_of_fame.clear()
+
+            def evaluate(gen, offspring):
+                fidelity = get_screening_fidelity(gen)
+                evaluation.clear()
+                if surrogate is not None:
+                    # Offspring the surrogate skips take no part in selection
+                    skipped, predictions = screen_offspring(offspring, fidelity)
+                    skipped_ids = {id(ind) for ind in skipped}
+                    offspring = [ind for ind in offspring if id(ind) not in skipped_ids]
+                evaluation["cache_hits"], evaluation["cache_misses"] = evaluate_individuals(
+                    offspring, fidelity
+                )
+                if surrogate is not None:
+                    screened = [ind for ind in offspring if id(ind) in predictions]
+                    evaluation["extra_fields"] = {
+                        "surrogate_skipped": len(skipped),
+                        "surrogate_rank_correlation": rank_correlation(
+                            [predictions[id(ind)] for ind in screened],
+                            [ind.fitness.values[0] for ind in screened],  # noqa: PD011
+                        ),
+                    }
+                return offspring
+
+            def on_generation(gen, pop, islands, offspring):
+                fidelity = get_screening_fidelity(gen)
+                extra_fields = evaluation.get("extra_fields", {})
+                if offspring:
+                    worst_end_uses_by_gen.append(get_worst_abs_err_end_use(offspring[0].comparison))
+                if num_islands > 1:
+                    extra_fields["islands"] = island_records(
+                        islands, stats, encoding, list(param_choices_map)
                     )
 
-                # Update Hall of Fame and stats
-                hall_of_fame.update(pop)
-                best_ind = tools.selBest(pop, 1)[0]
-                best_dirs_by_gen.append(getattr(best_ind, "temp_output_dir", None))
-
-                # Save hall of fame bias/abs errors
-                best_comp = best_ind.comparison
-                for end_use, metrics in best_comp.items():
-                    for fuel_type, bias_error in metrics["Bias Error"].items():
-                        key = f"{end_use}_{fuel_type}"
-                        best_bias_series.setdefault(key, []).append(bias_error)
-                    for fuel_type, abs_error in metrics["Absolute Error"].items():
-                        key = f"{end_use}_{fuel_type}"
-                        best_abs_series.setdefault(key, []).append(abs_error)
-
-                # Parameter statistics
-                param_stats = {
-                    pname: {
-                        "min": min(values := [ind[i] for ind in pop]),
-                        "max": max(values),
-                        "median": statistics.median(values),
-                        "std": statistics.pstdev(values) if len(values) > 1 else 0.0,
+                # Screened individuals that look calibrated are simulated in full, and only
+                # those results can end the search
+                promoted = []
+                if fidelity is not None:
+                    promoted = [ind for ind in pop if meets_termination_criteria(ind.comparison)]
+                    promote(promoted)
+                if screening_generations:
+                    extra_fields |= {
+                        "screening": fidelity is not None,
+                        "promoted": len(promoted),
                     }
-                    for i, pname in index_to_name.items()
-                }
 
-                # Simulation result statistics
-                sim_result_stats = {}
-                all_results = {
-                    ind.temp_output_dir.stem: ind.sim_results
-                    for ind in pop
-                    if hasattr(ind, "sim_results")
-                }
-                if all_results:
-                    fuel_enduse_keys = {
-                        (fuel_type, end_use)
-                        for r in all_results.values()
-                        for fuel_type, end_uses in r.items()
-                        for end_use in end_uses
-                    }
-                    for fuel_type, end_use in fuel_enduse_keys:
-                        vals = [
-                            r[fuel_type][end_use]
-                            for r in all_results.values()
-                            if fuel_type in r and end_use in r[fuel_type]
-                        ]
-                        if vals:
-                            sim_result_stats[f"{fuel_type}_{end_use}"] = calc_stats(vals)
+                # Save all individual hpxmls
+                save_generation_hpxml(gen, offspring)
 
                 # Log the current generation
-                record = stats.compile(pop)
-                record.update({f"bias_error_{k}": v[-1] for k, v in best_bias_series.items()})
-                record.update({f"abs_error_{k}": v[-1] for k, v in best_abs_series.items()})
-                record["best_individual"] = json.dumps(
-                    dict(zip(param_choices_map.keys(), best_ind))
+                best_ind = record_generation(
+                    gen,
+                    pop,
+                    len(offspring),
+                    evaluation["cache_hits"],
+                    evaluation["cache_misses"],
+                    extra_fields or None,
                 )
-                record["best_individual_sim_results"] = json.dumps(best_ind.sim_results)
-                record["diversity"] = diversity(pop)
-                record["parameter_choice_stats"] = json.dumps(param_stats)
-                record["simulation_result_stats"] = json.dumps(sim_result_stats)
-                if save_all_results:
-                    record["all_simulation_results"] = json.dumps(all_results)
-                logbook.record(gen=gen, nevals=len(invalid_ind), **record)
-                print(logbook.stream)
 
                 # Early termination conditions
-                if meets_termination_criteria(best_comp):
-                    calibration_success = True
-                    break
+                if fidelity is None:
+                    success = meets_termination_criteria(best_ind.comparison)
+                else:
+                    calibrated = [
+                        ind for ind in promoted if meets_termination_criteria(ind.comparison)
+                    ]
+                    success = bool(calibrated)
+                    if success:
+                        # The best individual must be one simulated at full fidelity
+                        hall_of_fame.clear()
+                        hall_of_fame.update(calibrated)
+                remove_unused_temp_dirs(pop)
+                write_checkpoint(gen, pop, success)
+                return success
+
+            return GenerationalScheduler(
+                pop,
+                toolbox,
+                cxpb,
+                mutpb,
+                evaluate=evaluate,
+                on_generation=on_generation,
+                island_rngs=island_rngs,
+                migration_interval=migration_interval,
+                migration_size=migration_size,
+                before_generation=before_generation,
+                start_gen=start_gen,
+            ).run(generations)
+
+        if shared_pool is not None:
+            num_proc = shared_pool.processes
+        elif num_proc is None:
+            num_proc = multiprocessing.cpu_count() - 1
+
+        concurrency = None
+        if adaptive_concurrency:
+            concurrency = ConcurrencyController(
+                cfg["simulation"]["min_concurrent_simulations"],
+                num_proc,
+                int(cfg["simulation"]["memory_reserve_gb"] * 1024**3),
+                cfg["simulation"]["max_load_average"],
+            )
+
+        generation_timings = GenerationTimings(timings_path, num_proc)
+
+        def concurrency_limit(in_flight):
+            return num_proc if concurrency is None else concurrency.limit(in_flight)
+
+        checkpoint = (
+            load_search_checkpoint(checkpoint_path, run_fingerprint, scratch_dir)
+            if resume
+            else None
+        )
+        if resume and checkpoint is None:
+            logger.warning(f"No checkpoint found in {output_filepath}, starting a new search")
+        if warm_start is not None and checkpoint is not None:
+            logger.info(f"Resuming from the checkpoint in {output_filepath}, not warm-starting")
+        if checkpoint is None:
+            # Don't append to the generations of an earlier run
+            generation_archive_path.unlink(missing_ok=True)
+            logbook_path.unlink(missing_ok=True)
+            timings_path.unlink(missing_ok=True)
+
+        with (
+            shared_pool.client(context)
+            if shared_pool is not None
+            else create_executor(
+                executor_backend,
+                num_proc,
+                context,
+                address=cfg["simulation"]["executor_address"],
+                # Keep the OpenStudio workers warm for the whole run in worker mode
+                maxtasksperchild=None if execution_mode == "worker" else 15,
+                initializer=init_worker,
+                initargs=(global_seed, context),
+                agent_connect_timeout=cfg["simulation"]["agent_connect_timeout_seconds"],
+            )
+        ) as pool:
+            if concurrency is None:
+                toolbox.register("map", pool.map)
+            else:
+                toolbox.register("map", map_with_limit, pool, concurrency)
+            if checkpoint is None:
+                start_gen = 0
+                seed_individual = create_seed_individual()
+                pop = [] if warm_start is None else create_warm_start_individuals(seed_individual)
+                if initial_population == "random":
+                    pop += toolbox.population(n=population_size - 1 - len(pop))
+                else:
+                    pop += [
+                        creator.Individual(genome)
+                        for genome in design_population(
+                            list(param_choices_map.values()),
+                            population_size - 1 - len(pop),
+                            initial_population,
+                            exclude=[seed_individual, *pop],
+                            rng=rng,
+                        )
+                    ]
+                pop.append(seed_individual)  # Add existing model as seed individual
+
+                if screening_fidelity is not None and screening_fidelity.run_periods:
+                    screening_fidelity = replace(
+                        screening_fidelity, period_scaling=fit_screening_scaling(pop)
+                    )
+
+                # Initial evaluation
+                fidelity = get_screening_fidelity(0)
+                invalid_ind = [ind for ind in pop if not ind.fitness.valid]
+                cache_hits, cache_misses = evaluate_individuals(invalid_ind, fidelity)
+
+                # Save all individual hpxmls
+                save_generation_hpxml(0, invalid_ind)
+
+                # Log generation 0
+                record_generation(
+                    0,
+                    pop,
+                    len(invalid_ind),
+                    cache_hits,
+                    cache_misses,
+                    {"screening": fidelity is not None, "promoted": 0}
+                    if screening_generations
+                    else None,
+                )
+
+                # Store existing home (seed individual) results
+                existing_home_results = {}
+                for ind in pop:
+                    if is_existing_home(ind, param_choices_map):
+                        seed = ind
+                        if fidelity is not None:
+                            # The existing home's results are reported, so simulate it in full
+                            seed = toolbox.clone(ind)
+                            promote([seed])
+                        existing_home_results["existing_home_sim_results"] = json.dumps(
+                            seed.sim_results
+                        )
+                        break
+
+                # Construct weather-normalized regression model summary
+                _, weather_norm_regression_models = self._process_calibration_results(
+                    existing_home_results["existing_home_sim_results"],
+                    normalization_targets,
+                    for_summary=True,
+                )
+
+                if num_islands > 1:
+                    # Deal the individuals out to the islands; pop holds them island by island
+                    pop = [ind for i in range(num_islands) for ind in pop[i::num_islands]]
+
+                remove_unused_temp_dirs(pop)
+                write_checkpoint(0, pop, calibration_success)
+            else:
+                start_gen = checkpoint["gen"]
+                calibration_success = checkpoint["calibration_success"]
+                pop = checkpoint["pop"]
+                hall_of_fame = checkpoint["hall_of_fame"]
+                logbook = checkpoint["logbook"]
+                best_bias_series.update(checkpoint["best_bias_series"])
+                best_abs_series.update(checkpoint["best_abs_series"])
+                worst_end_uses_by_gen.extend(checkpoint["worst_end_uses_by_gen"])
+                best_dirs_by_gen.extend(checkpoint["best_dirs_by_gen"])
+                archive = checkpoint["archive"]
+                screening_archive = checkpoint["screening_archive"]
+                simulation_durations.extend(checkpoint["simulation_durations"])
+                screening_durations.extend(checkpoint["screening_durations"])
+                screening_fidelity = checkpoint["screening_fidelity"]
+                timeouts.extend(checkpoint["timeouts"])
+                stragglers.extend(checkpoint["stragglers"])
+                all_temp_dirs.update(checkpoint["all_temp_dirs"])
+                archived_hpxml.update(checkpoint["archived_hpxml"])
+                existing_home_results = checkpoint["existing_home_results"]
+                weather_norm_regression_models = checkpoint["weather_norm_regression_models"]
+                rng.setstate(checkpoint["random_state"])
+                if num_islands > 1:
+                    for island_rng, state in zip(island_rngs, checkpoint["island_random_states"]):
+                        island_rng.setstate(state)
+
+                # Discard output of generations that were started but not checkpointed
+                discard_generations_after(generation_archive_path, start_gen)
+                discard_records_after(logbook_path, start_gen)
+                discard_records_after(timings_path, start_gen)
+                print(f"Resuming search from generation {start_gen}")
+
+            if calibration_success:
+                # The checkpoint is of a search that already finished
+                pass
+            elif scheduler == "steady_state":
+                pop, calibration_success = run_steady_state(pool, pop, start_gen)
+            else:
+                pop, calibration_success = run_generational(pop, start_gen)
 
         best_individual = hall_of_fame[0]
         best_individual_dict = dict(zip(param_choices_map.keys(), best_individual))
 
         best_individual_hpxml = best_individual.temp_output_dir / "modified.xml"
+        if not best_individual_hpxml.exists():
+            # Its temp dir was removed if it left the population and was later
+            # re-evaluated from the archive, so modify the HPXML file again
+            best_individual.temp_output_dir = make_temp_output_dir(scratch_dir)
+            all_temp_dirs.add(best_individual.temp_output_dir)
+            best_individual_hpxml = best_individual.temp_output_dir / "modified.xml"
+            temp_osw = best_individual.temp_output_dir / "modify_hpxml.osw"
+            try:
+                create_measure_input_file(
+                    {
+                        "xml_file_path": str(context.hpxml_filepath),
+                        "save_file_path": str(best_individual_hpxml),
+                        **context.genome_arguments(best_individual),
+                    },
+                    temp_osw,
+                )
+                app(["modify-xml", str(temp_osw)])
+            except Exception as e:
+                logger.warning(f"Unable to recreate the best individual's HPXML file: {e}")
         if best_individual_hpxml.exists():
             shutil.copy(best_individual_hpxml, output_filepath / "best_individual.xml")
 
@@ -1215,6 +1725,18 @@ class Calibrate:
             if temp_dir and Path(temp_dir).exists():
                 shutil.rmtree(temp_dir, ignore_errors=True)
 
+        if simulation_cache is not None:
+            simulation_cache.prune(max_size_mb=cfg["simulation"]["cache_max_size_mb"])
+
+        if timeouts:
+            logger.warning(
+                f"{len(timeouts)} simulations were killed for exceeding the simulation time limit"
+            )
+        if stragglers:
+            logger.warning(
+                f"{len(stragglers)} simulations ran longer than the soft simulation time limit"
+            )
+
         if calibration_success:
             print("Search completed successfully.")
         else:
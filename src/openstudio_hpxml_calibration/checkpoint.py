@@ -0,0 +1,158 @@
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import dill
+from loguru import logger
+
+from openstudio_hpxml_calibration.evaluation import make_temp_output_dir
+
+CHECKPOINT_FILENAME = "checkpoint.pkl"
+CHECKPOINT_VERSION = 2
+
+
+def save_checkpoint(checkpoint_path: os.PathLike, state: dict) -> None:
+    """Atomically write the state of a calibration search to a checkpoint file.
+
+    The state is written to a temporary file in the same directory and then moved into
+    place, so an interrupted write never leaves a truncated checkpoint behind.
+
+    :param checkpoint_path: Path of the checkpoint file.
+    :type checkpoint_path: os.PathLike
+    :param state: Search state. It is serialized with dill, like the arguments sent to pool
+        workers, so it may hold anything they can.
+    :type state: dict
+    """
+    checkpoint_path = Path(checkpoint_path)
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=checkpoint_path.parent, prefix=f".{checkpoint_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            dill.dump({"version": CHECKPOINT_VERSION, "state": state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, checkpoint_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def load_checkpoint(checkpoint_path: os.PathLike) -> dict | None:
+    """Read the search state saved by ``save_checkpoint``.
+
+    :param checkpoint_path: Path of the checkpoint file.
+    :type checkpoint_path: os.PathLike
+    :return: The saved search state, or None if there is no usable checkpoint.
+    :rtype: dict | None
+    """
+    checkpoint_path = Path(checkpoint_path)
+    if not checkpoint_path.exists():
+        return None
+    try:
+        with open(checkpoint_path, "rb") as f:
+            # Checkpoints are only read from the output directory they were written to
+            checkpoint = dill.load(f)  # noqa: S301
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        logger.warning(f"Unable to read checkpoint {checkpoint_path}: {e}")
+        return None
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        logger.warning(f"Checkpoint {checkpoint_path} was written by an incompatible version")
+        return None
+    return checkpoint["state"]
+
+
+def checkpoint_due(gen: int, interval: int, generations: int, success: bool) -> bool:
+    """Check whether a search checkpoints after a generation.
+
+    :param gen: The generation just done.
+    :type gen: int
+    :param interval: Generations between checkpoints, or 0 to never checkpoint.
+    :type interval: int
+    :param generations: Number of generations of the search.
+    :type generations: int
+    :param success: Whether the search met the acceptance criteria.
+    :type success: bool
+    :return: Whether to save a checkpoint. The last generation is always saved.
+    :rtype: bool
+    """
+    if not interval:
+        return False
+    return gen % interval == 0 or success or gen >= generations
+
+
+def save_search_checkpoint(
+    checkpoint_path: os.PathLike, fingerprint: dict, gen: int, success: bool, state: dict
+) -> None:
+    """Save the state of a calibration search after a generation.
+
+    Temp dirs may not survive whatever interrupts the run, so the best individual's HPXML
+    file is saved with the state.
+
+    :param checkpoint_path: Path of the checkpoint file.
+    :type checkpoint_path: os.PathLike
+    :param fingerprint: What the search's population was scored against, e.g. the home and
+        the bills. A checkpoint is only resumed by a search with the same fingerprint.
+    :type fingerprint: dict
+    :param gen: The generation just done.
+    :type gen: int
+    :param success: Whether the search met the acceptance criteria.
+    :type success: bool
+    :param state: Search state, with the ``hall_of_fame`` of the search.
+    :type state: dict
+    """
+    best_hpxml = state["hall_of_fame"][0].temp_output_dir / "modified.xml"
+    save_checkpoint(
+        checkpoint_path,
+        {
+            "fingerprint": fingerprint,
+            "gen": gen,
+            "calibration_success": success,
+            "best_individual_hpxml": best_hpxml.read_text() if best_hpxml.exists() else None,
+            **state,
+        },
+    )
+    logger.debug(f"Saved checkpoint of generation {gen} to {checkpoint_path}")
+
+
+def load_search_checkpoint(
+    checkpoint_path: os.PathLike, fingerprint: dict, scratch_dir: Path | None = None
+) -> dict | None:
+    """Read the search state saved by ``save_search_checkpoint``.
+
+    If the best individual's temp dir is gone, its HPXML file is restored to a new one,
+    which is added to the state's ``all_temp_dirs``.
+
+    :param checkpoint_path: Path of the checkpoint file.
+    :type checkpoint_path: os.PathLike
+    :param fingerprint: Fingerprint of the search resuming the checkpoint.
+    :type fingerprint: dict
+    :param scratch_dir: Directory to restore the best individual's HPXML file in, defaults
+        to the system temp directory.
+    :type scratch_dir: Path | None, optional
+    :raises ValueError: If the checkpoint is of a search with a different fingerprint.
+    :return: The saved search state, or None if there is no usable checkpoint.
+    :rtype: dict | None
+    """
+    state = load_checkpoint(checkpoint_path)
+    if state is None:
+        return None
+    if state["fingerprint"] != fingerprint:
+        raise ValueError(
+            f"The checkpoint in {Path(checkpoint_path).parent} is from a calibration of a "
+            "different home or with a different population size, scheduler, islands, or value "
+            "choices."
+        )
+    best_individual = state["hall_of_fame"][0]
+    if (
+        not (best_individual.temp_output_dir / "modified.xml").exists()
+        and state["best_individual_hpxml"] is not None
+    ):
+        best_individual.temp_output_dir = make_temp_output_dir(scratch_dir)
+        state["all_temp_dirs"].add(best_individual.temp_output_dir)
+        (best_individual.temp_output_dir / "modified.xml").write_text(
+            state["best_individual_hpxml"]
+        )
+    return state
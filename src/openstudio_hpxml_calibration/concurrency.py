@@ -0,0 +1,264 @@
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from loguru import logger
+
+PROC_PATH = Path("/proc")
+MEMINFO_PATH = PROC_PATH / "meminfo"
+
+
+def available_memory() -> int | None:
+    """Get the memory available for new processes on this machine.
+
+    :return: MemAvailable from /proc/meminfo in bytes, or None where it isn't available
+        (e.g. not on Linux).
+    :rtype: int | None
+    """
+    try:
+        with open(MEMINFO_PATH, encoding="utf-8") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name == "MemAvailable":
+                    return int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def load_average() -> float | None:
+    """Get the 1-minute load average of this machine.
+
+    :return: The load average, or None where it isn't available (e.g. on Windows).
+    :rtype: float | None
+    """
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+def process_memory(pid: int) -> tuple[int, int] | None:
+    """Get the memory use of a process.
+
+    :param pid: Process ID.
+    :type pid: int
+    :return: Current (VmRSS) and peak (VmHWM) resident set size from /proc/<pid>/status in
+        bytes, or None if the process is gone or it isn't available (e.g. not on Linux).
+    :rtype: tuple[int, int] | None
+    """
+    values = {}
+    try:
+        with open(PROC_PATH / str(pid) / "status", encoding="utf-8") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("VmRSS", "VmHWM"):
+                    values[name] = int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    if len(values) < 2:
+        # e.g. a zombie
+        return None
+    return values["VmRSS"], values["VmHWM"]
+
+
+def descendant_pids(pid: int) -> set[int]:
+    """Get the processes started by a process, and by those processes, and so on.
+
+    :param pid: Process ID.
+    :type pid: int
+    :return: IDs of the descendant processes, empty where /proc isn't available.
+    :rtype: set[int]
+    """
+    children = {}
+    try:
+        entries = [entry for entry in os.listdir(PROC_PATH) if entry.isdigit()]
+    except OSError:
+        return set()
+    for entry in entries:
+        try:
+            with open(PROC_PATH / entry / "stat", encoding="utf-8") as f:
+                # The command name in parentheses may contain spaces
+                parent = int(f.read().rpartition(")")[2].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    descendants = set()
+    pending = [pid]
+    while pending:
+        for child in children.get(pending.pop(), ()):
+            if child not in descendants:
+                descendants.add(child)
+                pending.append(child)
+    return descendants
+
+
+class PeakMemorySampler:
+    """Measures the peak memory use of the processes this process starts while a simulation
+    runs, e.g. OpenStudio and EnergyPlus, in a background thread.
+
+    Every ``interval`` seconds, the resident set size of this process's descendants is
+    summed: the peak (VmHWM) of processes started during the simulation, and the current
+    size (VmRSS) of processes that were already running, like a long-lived simulation
+    worker, whose peak may be from an earlier simulation. ``peak`` is the largest sum, or
+    None where /proc isn't available (e.g. not on Linux).
+
+    :param interval: Seconds between samples.
+    :type interval: float, optional
+    """
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak: int | None = None
+        self._existing: set[int] = set()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sample(self) -> None:
+        """Add a sample of the memory use of this process's descendants."""
+        total = None
+        for pid in descendant_pids(os.getpid()):
+            memory = process_memory(pid)
+            if memory is None:
+                continue
+            rss, hwm = memory
+            total = (total or 0) + (rss if pid in self._existing else hwm)
+        if total is not None:
+            self.peak = max(self.peak or 0, total)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self._existing = descendant_pids(os.getpid())
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+
+
+class ConcurrencyController:
+    """Chooses how many simulations may run at once on this machine.
+
+    The limit starts at ``min_processes`` and is updated at most once every
+    ``update_interval`` seconds. It grows by one while the load average is below
+    ``max_load`` minus one and shrinks by one while it's above ``max_load``. It is also
+    capped so that the simulations already running plus the new ones, each using as much
+    memory as the largest peak RSS seen so far, leave ``memory_reserve`` bytes free. Before
+    any peak RSS is known, the limit shrinks whenever less than ``memory_reserve`` is free.
+    Simulations that are already running are never stopped; new ones wait until the
+    number running is below the limit.
+
+    :param min_processes: Smallest limit.
+    :type min_processes: int
+    :param max_processes: Largest limit, usually the number of worker processes.
+    :type max_processes: int
+    :param memory_reserve: Bytes of memory to leave free for other processes.
+    :type memory_reserve: int
+    :param max_load: Load average above which fewer simulations are run, defaults to the
+        number of CPUs.
+    :type max_load: float | None, optional
+    :param update_interval: Seconds between updates of the limit.
+    :type update_interval: float, optional
+    """
+
+    def __init__(
+        self,
+        min_processes: int,
+        max_processes: int,
+        memory_reserve: int,
+        max_load: float | None = None,
+        update_interval: float = 5.0,
+    ):
+        self.min_processes = max(min(min_processes, max_processes), 1)
+        self.max_processes = max(max_processes, 1)
+        self.memory_reserve = memory_reserve
+        self.max_load = max_load if max_load is not None else os.cpu_count() or 1
+        self.update_interval = update_interval
+        self.peak_rss: int | None = None
+        self._limit = self.min_processes
+        self._last_update: float | None = None
+
+    def record(self, peak_rss: int | None) -> None:
+        """Record the peak RSS of a finished simulation.
+
+        :param peak_rss: Peak RSS in bytes, or None if it isn't known.
+        :type peak_rss: int | None
+        """
+        if peak_rss:
+            self.peak_rss = max(self.peak_rss or 0, peak_rss)
+
+    def limit(self, in_flight: int) -> int:
+        """Get the number of simulations that may run at once, updating it if it's due.
+
+        :param in_flight: Number of simulations running now.
+        :type in_flight: int
+        :return: The limit, between ``min_processes`` and ``max_processes``.
+        :rtype: int
+        """
+        now = time.monotonic()
+        if self._last_update is not None and now - self._last_update < self.update_interval:
+            return self._limit
+        self._last_update = now
+
+        limit = self._limit
+        load = load_average()
+        if load is None or load < self.max_load - 1:
+            limit += 1
+        elif load > self.max_load:
+            limit -= 1
+
+        available = available_memory()
+        if available is not None:
+            free = available - self.memory_reserve
+            if self.peak_rss:
+                limit = min(limit, in_flight + free // self.peak_rss)
+            elif free < 0:
+                limit = min(limit, in_flight - 1)
+
+        limit = min(max(limit, self.min_processes), self.max_processes)
+        if limit != self._limit:
+            logger.debug(
+                f"Running up to {limit} simulations at once (load average {load}, "
+                f"available memory {available}, peak simulation RSS {self.peak_rss})"
+            )
+        self._limit = limit
+        return limit
+
+
+def map_with_limit(executor, controller: ConcurrencyController, func: Callable, *iterables):
+    """Map a function over arguments with an executor, keeping no more tasks in flight than
+    the controller's limit.
+
+    :param executor: Executor with ``apipe``, e.g. a pathos pool.
+    :param controller: Controller of the number of tasks in flight. The ``peak_rss`` of
+        each result, if it has one, is recorded with it.
+    :type controller: ConcurrencyController
+    :param func: Function to call.
+    :type func: Callable
+    :param iterables: Arguments of each call, like ``map``.
+    :return: Result of each call, in order.
+    :rtype: list
+    """
+    tasks = list(zip(*iterables))
+    results = [None] * len(tasks)
+    in_flight = {}
+    next_task = 0
+    while next_task < len(tasks) or in_flight:
+        while next_task < len(tasks) and len(in_flight) < controller.limit(len(in_flight)):
+            in_flight[next_task] = executor.apipe(func, *tasks[next_task])
+            next_task += 1
+        done = [i for i, async_result in in_flight.items() if async_result.ready()]
+        for i in done:
+            results[i] = in_flight.pop(i).get()
+            controller.record(getattr(results[i], "peak_rss", None))
+        if not done:
+            time.sleep(0.1)
+    return results
@@ -12,3 +12,9 @@ class Format(str, Enum):
     JSON = "json"
     MSGPACK = "msgpack"
     CSV_DVIEW = "csv_dview"
+
+
+class EvaluationStatus(str, Enum):
+    SUCCESS = "success"
+    FAILED = "failed"
+    TIMEOUT = "timeout"
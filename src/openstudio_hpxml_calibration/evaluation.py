@@ -0,0 +1,614 @@
+import json
+import math
+import shutil
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from openstudio_hpxml_calibration import app
+from openstudio_hpxml_calibration.archive import EvaluationResult
+from openstudio_hpxml_calibration.cache import SimulationCache
+from openstudio_hpxml_calibration.concurrency import PeakMemorySampler
+from openstudio_hpxml_calibration.enums import EvaluationStatus
+from openstudio_hpxml_calibration.normalization_targets import (
+    NormalizationTargets,
+    compare_to_targets,
+)
+from openstudio_hpxml_calibration.screening import ScreeningFidelity
+from openstudio_hpxml_calibration.simulation_worker import get_worker
+from openstudio_hpxml_calibration.telemetry import EvaluationTiming, genome_hash, worker_label
+from openstudio_hpxml_calibration.utils import (
+    OS_HPXML_PATH,
+    calculate_sha256,
+    set_child_memory_limit,
+)
+
+MEASURES_PATH = Path(__file__).resolve().parent.parent / "measures"
+
+# Simulation times needed before the time limit adapts to them, and the shortest
+# adaptive time limit, so a run of fast or cached simulations can't set it too low
+MIN_TIMEOUT_SAMPLES = 5
+MIN_ADAPTIVE_TIMEOUT = 60.0
+
+
+@dataclass(frozen=True)
+class EvaluationContext:
+    """Everything a pool worker needs to evaluate a genome.
+
+    This is sent to each worker process once, through the pool initializer, so that
+    evaluation tasks only need to carry the genome itself.
+
+    :param hpxml_filepath: Path to the HPXML file being calibrated.
+    :param parameter_names: ModifyXML argument name of each gene, in genome order.
+    :param normalization_targets: Utility bill targets from ``Calibrate.get_normalization_targets``.
+    :param heats_with_electricity: Whether electricity is the fuel for any heating system.
+    :param bias_error_threshold: Bias error limit (%) from the acceptance criteria.
+    :param abs_error_elec_threshold: Electricity absolute error limit (kWh).
+    :param abs_error_fuel_threshold: Fossil fuel absolute error limit (MBtu).
+    :param execution_mode: How OpenStudio is invoked: "separate", "combined", or "worker".
+    :param simulation_cache: Persistent simulation result cache, if enabled.
+    :param cache_key_fields: Source HPXML hash, simulator version and simulation flags
+        that cache keys are made from, along with the genome.
+    :param scratch_dir: Directory to create temp output directories in, defaults to the
+        system temp directory.
+    :param memory_limit: Address space limit (bytes) of each OpenStudio and EnergyPlus
+        process, defaults to no limit.
+    """
+
+    hpxml_filepath: Path
+    parameter_names: tuple[str, ...]
+    normalization_targets: NormalizationTargets
+    heats_with_electricity: bool
+    bias_error_threshold: float
+    abs_error_elec_threshold: float
+    abs_error_fuel_threshold: float
+    execution_mode: str = "separate"
+    simulation_cache: SimulationCache | None = None
+    cache_key_fields: tuple[str, str, Mapping] | None = None
+    scratch_dir: Path | None = None
+    memory_limit: int | None = None
+
+    def genome_arguments(self, genome: Sequence[float], timestep: int | None = None) -> dict:
+        """Get the ModifyXML arguments for the parameter values of a genome.
+
+        :param genome: Parameter values, in the order of ``parameter_names``.
+        :type genome: Sequence[float]
+        :param timestep: Simulation timestep (minutes) to set, defaults to the HPXML file's own.
+        :type timestep: int | None, optional
+        :return: ModifyXML argument values by name.
+        :rtype: dict
+        """
+        arguments = dict(zip(self.parameter_names, genome))
+        if timestep is not None:
+            arguments["timestep"] = timestep
+        return arguments
+
+    def cache_key(self, genome: Sequence[float], timestep: int | None = None) -> str:
+        """Get the simulation cache key for a genome.
+
+        :param genome: Parameter values, in the order of ``parameter_names``.
+        :type genome: Sequence[float]
+        :param timestep: Simulation timestep (minutes) the genome is simulated with, if not
+            the HPXML file's own.
+        :type timestep: int | None, optional
+        :return: Key for ``simulation_cache``.
+        :rtype: str
+        """
+        source_hpxml_hash, simulator_version, simulation_flags = self.cache_key_fields
+        return SimulationCache.make_key(
+            source_hpxml_hash,
+            self.genome_arguments(genome, timestep),
+            simulator_version,
+            dict(simulation_flags),
+        )
+
+    def absolute_error_threshold(self, fuel_type: str) -> float:
+        if fuel_type == "electricity":
+            return self.abs_error_elec_threshold
+        return self.abs_error_fuel_threshold
+
+
+# The context installed in this process by set_evaluation_context
+_installed_context: dict[str, EvaluationContext] = {}
+
+
+def set_evaluation_context(context: EvaluationContext | None) -> None:
+    """Install the evaluation context used by ``evaluate`` in this process, and limit the
+    memory of the simulation processes it starts.
+
+    :param context: Context to install, or None to remove it.
+    :type context: EvaluationContext | None
+    """
+    if context is None:
+        _installed_context.pop("current", None)
+        set_child_memory_limit(None)
+    else:
+        _installed_context["current"] = context
+        set_child_memory_limit(context.memory_limit)
+
+
+def get_evaluation_context() -> EvaluationContext:
+    """Get the evaluation context installed in this process.
+
+    :raises RuntimeError: If no context has been installed.
+    :return: The installed context.
+    :rtype: EvaluationContext
+    """
+    try:
+        return _installed_context["current"]
+    except KeyError:
+        raise RuntimeError("No evaluation context has been installed in this process") from None
+
+
+def make_temp_output_dir(scratch_dir: Path | None = None) -> Path:
+    """Create a temp output directory for evaluating an individual.
+
+    :param scratch_dir: Directory to create it in, defaults to the system temp directory.
+    :type scratch_dir: Path | None, optional
+    :return: The new directory.
+    :rtype: Path
+    """
+    return Path(tempfile.mkdtemp(prefix=f"calib_test_{uuid.uuid4().hex[:6]}_", dir=scratch_dir))
+
+
+def remove_simulation_files(temp_output_dir: Path) -> None:
+    """Delete the simulation files of an evaluated individual, except the modified HPXML file
+    and annual results, of the whole year or of each run period.
+
+    EnergyPlus writes dozens of files per simulation, so keeping only these bounds the
+    scratch space an evaluation uses once it's done.
+
+    :param temp_output_dir: Temp output directory of the individual.
+    :type temp_output_dir: Path
+    """
+    for path in temp_output_dir.iterdir():
+        if path.name == "modified.xml":
+            continue
+        if path.name == "run" and path.is_dir():
+            for run_path in path.iterdir():
+                if run_path.name == "results_annual.json":
+                    continue
+                if run_path.is_dir() and not run_path.is_symlink():
+                    shutil.rmtree(run_path, ignore_errors=True)
+                else:
+                    run_path.unlink(missing_ok=True)
+        elif path.name.startswith("period_") and path.is_dir():
+            remove_simulation_files(path)
+        elif path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+
+def create_measure_input_file(
+    arguments: dict,
+    output_file_path: str,
+    measure_path: str | None = None,
+    simulation_output_dir: Path | None = None,
+):
+    """Write an OpenStudio workflow (osw) file that runs the ModifyXML measure.
+
+    :param arguments: Arguments for the ModifyXML measure.
+    :type arguments: dict
+    :param output_file_path: Path to write the osw file to.
+    :type output_file_path: str
+    :param measure_path: Directory containing the ModifyXML measure, defaults to the
+        measures directory of this package.
+    :type measure_path: str | None, optional
+    :param simulation_output_dir: If provided, the workflow also translates and simulates the
+        modified HPXML file with OpenStudio-HPXML, writing results to this directory.
+    :type simulation_output_dir: Path | None, optional
+    """
+    if measure_path is None:
+        measure_path = str(MEASURES_PATH)
+    data = {
+        "run_directory": str(
+            Path(arguments.get("save_file_path") or arguments["batch_file_path"]).parent
+        ),
+        "measure_paths": [measure_path],
+        "steps": [{"measure_dir_name": "ModifyXML", "arguments": arguments}],
+    }
+    if simulation_output_dir is not None:
+        # Mirror the measures OpenStudio-HPXML's run_simulation.rb runs for annual results
+        simulation_output_dir = str(Path(simulation_output_dir).resolve())
+        data["run_directory"] = simulation_output_dir
+        data["measure_paths"].append(str(OS_HPXML_PATH))
+        data["steps"].extend(
+            [
+                {
+                    "measure_dir_name": "HPXMLtoOpenStudio",
+                    "arguments": {
+                        "hpxml_path": arguments["save_file_path"],
+                        "output_dir": simulation_output_dir,
+                        "output_format": "json",
+                        "skip_validation": True,
+                        "debug": False,
+                    },
+                },
+                {
+                    "measure_dir_name": "ReportSimulationOutput",
+                    "arguments": {"output_format": "json", "timeseries_frequency": "none"},
+                },
+            ]
+        )
+        data["run_options"] = {
+            "fast": True,
+            "skip_expand_objects": True,
+            "skip_energyplus_preprocess": True,
+        }
+    Path(output_file_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def get_model_results(
+    json_results_path: Path, heats_with_electricity: bool
+) -> dict[str, dict[str, float]]:
+    """Retrieve annual energy usage from the HPXML model.
+
+    :param json_results_path: Path to the JSON file containing annual results from the HPXML model.
+    :type json_results_path: Path
+    :param heats_with_electricity: Whether electricity is the fuel for any heating system.
+    :type heats_with_electricity: bool
+    :return: Model results for each fuel type by end use in MBtu.
+    :rtype: dict[str, dict[str, float]]
+    """
+
+    results = json.loads(Path(json_results_path).read_text())
+    if "Time" in results:
+        raise ValueError(f"your file {json_results_path} is not an annual results file")
+
+    model_output = {
+        "electricity": {},
+        "natural gas": {},
+        "propane": {},
+        "fuel oil": {},
+        "wood cord": {},
+        "wood pellets": {},
+        "coal": {},
+    }
+
+    for end_use, consumption in results["End Use"].items():
+        fuel_type = end_use.split(":")[0].lower().strip()
+        # ignore electricity usage for heating (fans/pumps) when electricity is not the fuel type for any heating system
+        if fuel_type == "electricity" and "Heating" in end_use and not heats_with_electricity:
+            continue
+        if "Heating" in end_use:
+            model_output[fuel_type]["heating"] = round(
+                number=(model_output[fuel_type].get("heating", 0) + consumption), ndigits=3
+            )
+        elif "Cooling" in end_use:
+            model_output[fuel_type]["cooling"] = round(
+                number=(model_output[fuel_type].get("cooling", 0) + consumption), ndigits=3
+            )
+        else:
+            model_output[fuel_type]["baseload"] = round(
+                number=(model_output[fuel_type].get("baseload", 0) + consumption), ndigits=3
+            )
+
+    return model_output
+
+
+def get_simulation_timeout(
+    durations: Sequence[float], timeout: float | None, timeout_median_multiplier: float | None
+) -> float | None:
+    """Get the time limit for a simulation from the times of earlier simulations. Used for
+    both the hard limit, after which simulations are killed, and the soft limit, after which
+    they are only reported as stragglers.
+
+    :param durations: Seconds taken by earlier successful simulations in this run.
+    :type durations: Sequence[float]
+    :param timeout: Limit in seconds for every simulation, or None for no limit.
+    :type timeout: float | None
+    :param timeout_median_multiplier: Once enough simulations have finished, limit each
+        simulation to this multiple of their median time, but no more than ``timeout``.
+        None or 0 to only use ``timeout``.
+    :type timeout_median_multiplier: float | None
+    :return: Time limit in seconds, or None for no limit.
+    :rtype: float | None
+    """
+    if not timeout_median_multiplier or len(durations) < MIN_TIMEOUT_SAMPLES:
+        return timeout
+    adaptive_timeout = max(
+        MIN_ADAPTIVE_TIMEOUT, timeout_median_multiplier * statistics.median(durations)
+    )
+    return adaptive_timeout if timeout is None else min(timeout, adaptive_timeout)
+
+
+def score_comparison(comparison: dict) -> float:
+    """Combine the bias and absolute errors of a comparison into a single fitness score.
+
+    :param comparison: Bias and absolute errors by fuel type and end use.
+    :type comparison: dict
+    :return: Sum of squared log errors, lower is better.
+    :rtype: float
+    """
+    combined_error_penalties = []
+    for metrics in comparison.values():
+        for end_use, bias_error in metrics["Bias Error"].items():
+            if math.isnan(bias_error) or math.isnan(metrics["Absolute Error"][end_use]):
+                continue  # Skip NaN values
+
+            bias_err = abs(bias_error)
+            abs_err = abs(metrics["Absolute Error"][end_use])
+
+            log_bias_err = math.log1p(bias_err)  # log1p to avoid log(0)
+            log_abs_err = math.log1p(abs_err)
+
+            bias_error_penalty = max(0, log_bias_err) ** 2
+            abs_error_penalty = max(0, log_abs_err) ** 2
+            combined_error_penalty = bias_error_penalty + abs_error_penalty
+
+            combined_error_penalties.append(combined_error_penalty)
+
+    return sum(combined_error_penalties)
+
+
+def modify_hpxml_batch(jobs: list[dict]) -> EvaluationTiming:
+    """Write several modified HPXML files with one ModifyXML invocation.
+
+    Failures are logged rather than raised; ``evaluate`` modifies any HPXML files that
+    weren't written individually.
+
+    :param jobs: ModifyXML arguments for each file, including ``save_file_path``.
+    :type jobs: list[dict]
+    :return: Timing of the batch, as a ``modify_batch`` stage.
+    :rtype: EvaluationTiming
+    """
+    context = get_evaluation_context()
+    timing = EvaluationTiming(worker=worker_label())
+    with (
+        timing.stage("modify_batch"),
+        tempfile.TemporaryDirectory(prefix=f"calib_batch_{uuid.uuid4().hex[:6]}_") as batch_dir,
+    ):
+        try:
+            batch_file = Path(batch_dir) / "batch.json"
+            batch_file.write_text(json.dumps(jobs), encoding="utf-8")
+            temp_osw = Path(batch_dir) / "modify_hpxml.osw"
+            create_measure_input_file(
+                {"xml_file_path": str(context.hpxml_filepath), "batch_file_path": str(batch_file)},
+                temp_osw,
+            )
+            app(["modify-xml", str(temp_osw)])
+        except Exception as e:
+            logger.warning(f"Batch modification of {len(jobs)} HPXML files failed: {e}")
+    return timing
+
+
+def _modify_and_simulate(
+    context: EvaluationContext,
+    arguments: dict,
+    temp_output_dir: Path,
+    remaining_time,
+    timing: EvaluationTiming,
+) -> dict[str, dict[str, float]]:
+    """Write the modified HPXML file for ModifyXML arguments and simulate it.
+
+    :param context: Evaluation context installed in this process.
+    :type context: EvaluationContext
+    :param arguments: ModifyXML arguments, including ``save_file_path``.
+    :type arguments: dict
+    :param temp_output_dir: Directory to write the osw file and simulation results to.
+    :type temp_output_dir: Path
+    :param remaining_time: Callable returning the seconds left for the evaluation, or None
+        for no limit.
+    :param timing: Timing of the evaluation, to add the stages to.
+    :type timing: EvaluationTiming
+    :return: Model results for each fuel type by end use in MBtu.
+    :rtype: dict[str, dict[str, float]]
+    """
+    mod_hpxml_path = Path(arguments["save_file_path"])
+    temp_osw = temp_output_dir / "modify_hpxml.osw"
+
+    def timeout_args():
+        seconds = remaining_time()
+        return [] if seconds is None else ["--timeout", str(seconds)]
+
+    if context.execution_mode == "worker":
+        # Modify and simulate in this process's long-lived OpenStudio worker
+        with timing.stage("modify_and_simulate"):
+            get_worker().run(
+                arguments, output_dir=temp_output_dir / "run", timeout=remaining_time()
+            )
+    elif context.execution_mode == "combined":
+        # Modify and simulate in a single OpenStudio invocation
+        with timing.stage("modify_and_simulate"):
+            create_measure_input_file(
+                arguments, temp_osw, simulation_output_dir=temp_output_dir / "run"
+            )
+            app(["modify-xml", str(temp_osw), "--simulate", *timeout_args()])
+    else:
+        # The HPXML file may already have been written by modify_hpxml_batch
+        if not mod_hpxml_path.exists():
+            with timing.stage("modify"):
+                create_measure_input_file(arguments, temp_osw)
+                app(["modify-xml", str(temp_osw), *timeout_args()])
+        with timing.stage("simulate"):
+            app(
+                [
+                    "run-sim",
+                    str(mod_hpxml_path),
+                    "--output-dir",
+                    str(temp_output_dir),
+                    "--output-format",
+                    "json",
+                    *timeout_args(),
+                ]
+            )
+
+    output_file = temp_output_dir / "run" / "results_annual.json"
+    with timing.stage("parse_results"):
+        return get_model_results(output_file, context.heats_with_electricity)
+
+
+def evaluate(
+    genome: Sequence[float],
+    temp_output_dir: Path | None = None,
+    timeout: float | None = None,
+    screening: ScreeningFidelity | None = None,
+    soft_timeout: float | None = None,
+) -> EvaluationResult:
+    """Modify and simulate the HPXML file for a genome and score it against the bills.
+
+    Uses the context installed by ``set_evaluation_context``.
+
+    :param genome: Parameter values, in the order of the context's ``parameter_names``.
+    :type genome: Sequence[float]
+    :param temp_output_dir: Directory to write the modified HPXML file and simulation
+        results to. If it already contains ``modified.xml``, that file is simulated as is.
+        A new directory is created in the context's ``scratch_dir`` if not provided. After a
+        successful simulation, only ``modified.xml`` and ``run/results_annual.json`` are kept.
+    :type temp_output_dir: Path | None, optional
+    :param timeout: Seconds to allow for modifying and simulating the HPXML file. OpenStudio
+        and EnergyPlus are killed if they run longer, defaults to no limit.
+    :type timeout: float | None, optional
+    :param screening: Faster, lower-fidelity simulation settings to evaluate with, defaults
+        to simulating the whole year with the HPXML file's own timestep. Each run period is
+        modified and simulated in its own ``period_<n>`` subdirectory, and the results of
+        run periods are not cached.
+    :type screening: ScreeningFidelity | None, optional
+    :param soft_timeout: Seconds after which a warning is logged that the evaluation is
+        still running, and it's marked as a straggler, without stopping it. Defaults to no
+        limit.
+    :type soft_timeout: float | None, optional
+    :return: Fitness and comparison results, or an infinite fitness if evaluation failed or
+        timed out, with the timing of each stage of the evaluation.
+    :rtype: EvaluationResult
+    """
+    context = get_evaluation_context()
+    start_time = time.monotonic()
+    timing = EvaluationTiming(worker=worker_label(), genome_hash=genome_hash(genome))
+    timestep = None if screening is None else screening.timestep
+    run_periods = () if screening is None else screening.run_periods
+
+    def remaining_time():
+        if timeout is None:
+            return None
+        return max(timeout - (time.monotonic() - start_time), 0.001)
+
+    straggler_timer = None
+    if soft_timeout is not None:
+        straggler_timer = threading.Timer(
+            soft_timeout,
+            logger.warning,
+            [
+                f"Evaluation of individual {list(genome)} is still running after {soft_timeout:.0f} s"
+            ],
+        )
+        straggler_timer.daemon = True
+        straggler_timer.start()
+
+    try:
+        if temp_output_dir is None:
+            temp_output_dir = make_temp_output_dir(context.scratch_dir)
+        mod_hpxml_path = temp_output_dir / "modified.xml"
+        arguments = {
+            "xml_file_path": str(context.hpxml_filepath),
+            "save_file_path": str(mod_hpxml_path),
+            **context.genome_arguments(genome, timestep),
+        }
+
+        simulation_cache = None if run_periods else context.simulation_cache
+        cache_key = None
+        cached_entry = None
+        if simulation_cache is not None:
+            with timing.stage("cache"):
+                cache_key = context.cache_key(genome, timestep)
+                cached_entry = simulation_cache.get(cache_key)
+                if cached_entry is not None:
+                    mod_hpxml_path.write_text(cached_entry["hpxml"], encoding="utf-8")
+
+        memory = PeakMemorySampler()
+        if cached_entry is not None:
+            simulation_results = cached_entry["model_results"]
+        elif run_periods:
+            period_results = []
+            with memory:
+                for i, run_period in enumerate(run_periods):
+                    period_dir = temp_output_dir / f"period_{i}"
+                    period_dir.mkdir(parents=True, exist_ok=True)
+                    period_arguments = {
+                        **arguments,
+                        "save_file_path": str(period_dir / "modified.xml"),
+                        **screening.run_period_arguments(run_period),
+                    }
+                    period_results.append(
+                        _modify_and_simulate(
+                            context, period_arguments, period_dir, remaining_time, timing
+                        )
+                    )
+            simulation_results = screening.scale_to_annual(period_results)
+        else:
+            with memory:
+                simulation_results = _modify_and_simulate(
+                    context, arguments, temp_output_dir, remaining_time, timing
+                )
+            if simulation_cache is not None:
+                with timing.stage("cache"):
+                    try:
+                        simulation_cache.put(cache_key, simulation_results, mod_hpxml_path)
+                    except OSError as e:
+                        logger.warning(f"Unable to cache simulation results: {e}")
+
+        with timing.stage("cleanup"):
+            xml_hash = None if run_periods else calculate_sha256(mod_hpxml_path)
+            if cached_entry is None:
+                remove_simulation_files(temp_output_dir)
+
+        with timing.stage("score"):
+            comparison = compare_to_targets(context.normalization_targets, simulation_results)
+
+            for model_fuel_type, result in comparison.items():
+                absolute_error_criteria = context.absolute_error_threshold(model_fuel_type)
+                for load_type in result["Bias Error"]:
+                    if abs(result["Bias Error"][load_type]) > context.bias_error_threshold:
+                        logger.debug(
+                            f"Bias error for {model_fuel_type} {load_type} is {result['Bias Error'][load_type]} but the limit is +/- {context.bias_error_threshold}"
+                        )
+                    if abs(result["Absolute Error"][load_type]) > absolute_error_criteria:
+                        logger.debug(
+                            f"Absolute error for {model_fuel_type} {load_type} is {result['Absolute Error'][load_type]} but the limit is +/- {absolute_error_criteria}"
+                        )
+            fitness = score_comparison(comparison)
+
+        duration = None if cached_entry is not None else time.monotonic() - start_time
+        return EvaluationResult(
+            fitness=(fitness,),
+            comparison=comparison,
+            temp_output_dir=temp_output_dir,
+            sim_results=simulation_results,
+            xml_hash=xml_hash,
+            from_cache=cached_entry is not None,
+            duration=duration,
+            straggler=duration is not None and soft_timeout is not None and duration > soft_timeout,
+            peak_rss=memory.peak,
+            timing=timing,
+        )
+
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Evaluation of individual {list(genome)} timed out after {timeout:.0f} s")
+        return EvaluationResult(
+            fitness=(float("inf"),),
+            temp_output_dir=temp_output_dir,
+            status=EvaluationStatus.TIMEOUT,
+            timing=timing,
+        )
+    except Exception as e:
+        logger.error(f"Error evaluating individual {list(genome)}: {e}")
+        return EvaluationResult(
+            fitness=(float("inf"),),
+            temp_output_dir=temp_output_dir,
+            status=EvaluationStatus.FAILED,
+            timing=timing,
+        )
+    finally:
+        if straggler_timer is not None:
+            straggler_timer.cancel()
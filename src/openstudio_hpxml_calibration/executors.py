@@ -0,0 +1,486 @@
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import replace
+from functools import partial
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Protocol
+
+import dill
+from loguru import logger
+from pathos.multiprocessing import ProcessingPool as Pool
+
+from openstudio_hpxml_calibration.cache import SimulationCache
+from openstudio_hpxml_calibration.evaluation import (
+    EvaluationContext,
+    evaluate,
+    make_temp_output_dir,
+    set_evaluation_context,
+)
+
+AUTHKEY_ENV_VAR = "OSHC_EXECUTOR_AUTHKEY"
+
+# Seconds between attempts of an agent to connect to a calibration
+AGENT_RECONNECT_INTERVAL = 5.0
+
+
+class TaskResult:
+    """Result of a task submitted to a ``SharedPool`` or ``SocketExecutor``, like a pool's
+    ``AsyncResult``."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def get(self, timeout: float | None = None):
+        """Wait for the task and return its result.
+
+        :param timeout: Seconds to wait, defaults to waiting until the task is done.
+        :type timeout: float | None, optional
+        :raises TimeoutError: If the task isn't done within the timeout.
+        :return: Return value of the task, or raises the exception it raised.
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("Task did not finish in time")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def _set(self, value=None, error: BaseException | None = None) -> None:
+        self._value = value
+        self._error = error
+        self._done.set()
+
+
+class Executor(Protocol):
+    """Runs the evaluation tasks of a calibration search.
+
+    ``run_search`` registers ``map`` as the toolbox map, and the steady-state scheduler
+    submits single evaluations with ``apipe``. A pathos pool is the local backend.
+    """
+
+    def map(self, func: Callable, *iterables) -> list: ...
+
+    def apipe(self, func: Callable, *args): ...
+
+    def __enter__(self): ...
+
+    def __exit__(self, exc_type, exc_value, traceback): ...
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Split a ``host:port`` address.
+
+    :param address: Address, e.g. ``127.0.0.1:5757``.
+    :type address: str
+    :raises ValueError: If the address has no valid port.
+    :return: Host and port.
+    :rtype: tuple[str, int]
+    """
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid executor address '{address}'. Must be host:port.")
+    return host, int(port)
+
+
+def get_authkey() -> bytes:
+    """Get the key that calibrations and simulation agents authenticate each other with.
+
+    :raises ValueError: If the key isn't set.
+    :return: The key, from the OSHC_EXECUTOR_AUTHKEY environment variable.
+    :rtype: bytes
+    """
+    authkey = os.environ.get(AUTHKEY_ENV_VAR)
+    if not authkey:
+        raise ValueError(
+            f"Set the {AUTHKEY_ENV_VAR} environment variable to a shared secret to use the "
+            "socket executor"
+        )
+    return authkey.encode()
+
+
+def create_executor(
+    backend: str,
+    processes: int,
+    context: EvaluationContext,
+    address: str | None = None,
+    maxtasksperchild: int | None = None,
+    initializer: Callable | None = None,
+    initargs: tuple = (),
+    agent_connect_timeout: float | None = None,
+) -> Executor:
+    """Create the executor for a calibration search.
+
+    :param backend: "local" for a pool of worker processes on this machine, or "socket" for
+        simulation agents that connect over TCP.
+    :type backend: str
+    :param processes: Number of local worker processes, or evaluations a socket executor
+        submits at once.
+    :type processes: int
+    :param context: Evaluation context of the search.
+    :type context: EvaluationContext
+    :param address: ``host:port`` the socket executor listens on for agents.
+    :type address: str | None, optional
+    :param maxtasksperchild: Tasks each local worker process runs before it's replaced.
+    :type maxtasksperchild: int | None, optional
+    :param initializer: Called in each local worker process when it starts.
+    :type initializer: Callable | None, optional
+    :param initargs: Arguments for ``initializer``.
+    :type initargs: tuple, optional
+    :param agent_connect_timeout: Seconds evaluations may wait for a simulation agent to
+        connect to a socket executor before they fail, defaults to waiting forever.
+    :type agent_connect_timeout: float | None, optional
+    :raises ValueError: If the backend is unknown.
+    :return: The executor.
+    :rtype: Executor
+    """
+    if backend == "local":
+        return Pool(
+            processes=processes,
+            maxtasksperchild=maxtasksperchild,
+            initializer=initializer,
+            initargs=initargs,
+        )
+    if backend == "socket":
+        executor = SocketExecutor(
+            parse_address(address),
+            get_authkey(),
+            context,
+            processes,
+            agent_connect_timeout=agent_connect_timeout,
+        )
+        print(f"Waiting for simulation agents to connect to {address}")
+        return executor
+    raise ValueError(f"Unknown simulation executor '{backend}'. Must be 'local' or 'socket'.")
+
+
+def _send(conn: Connection, message) -> None:
+    # Pickled with dill, like the arguments sent to pool workers
+    conn.send_bytes(dill.dumps(message))
+
+
+def _recv(conn: Connection):
+    # Only authenticated peers can send messages
+    return dill.loads(conn.recv_bytes())  # noqa: S301
+
+
+class SocketExecutor:
+    """Sends evaluations to simulation agents that connect over TCP.
+
+    Agents (``run_agent``, or the ``simulation-agent`` command) may run on other machines.
+    Each agent connection evaluates one genome at a time: it modifies and simulates the
+    HPXML file locally, then returns the evaluation result and the modified HPXML file,
+    which is written to the temp output directory the task was given on this machine.
+    Tasks of an agent that disconnects are given to another agent. If no agent is connected
+    for ``agent_connect_timeout`` seconds, waiting tasks fail with a ``RuntimeError`` rather
+    than waiting forever.
+
+    Connections are authenticated with a shared key, and messages are pickled, so agents
+    should only be run on a trusted network.
+
+    :param address: Host and port to listen on. Port 0 picks a free port.
+    :type address: tuple[str, int]
+    :param authkey: Key shared with the agents.
+    :type authkey: bytes
+    :param context: Evaluation context of the search. Agents get a copy of it and of the
+        HPXML file being calibrated when they connect.
+    :type context: EvaluationContext
+    :param processes: Evaluations submitted at once by schedulers that keep a fixed
+        number in flight, usually the total number of agent connections.
+    :type processes: int
+    :param agent_connect_timeout: Seconds tasks may wait while no agent is connected before
+        they fail, defaults to waiting forever.
+    :type agent_connect_timeout: float | None, optional
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        authkey: bytes,
+        context: EvaluationContext,
+        processes: int = 1,
+        agent_connect_timeout: float | None = None,
+    ):
+        self.processes = processes
+        self.agent_connect_timeout = agent_connect_timeout
+        self._context = context
+        self._hpxml = Path(context.hpxml_filepath).read_text(encoding="utf-8")
+        self._tasks = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._agents = 0
+        self._no_agents_since = time.monotonic()
+        self._listener = Listener(address, authkey=authkey)
+        self._acceptor = threading.Thread(
+            target=self._accept, name="socket-executor-acceptor", daemon=True
+        )
+        self._acceptor.start()
+        if agent_connect_timeout is not None:
+            threading.Thread(
+                target=self._watch_agents, name="socket-executor-watchdog", daemon=True
+            ).start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._listener.address
+
+    def apipe(self, func: Callable, *args) -> TaskResult:
+        """Submit the evaluation of a genome.
+
+        :param func: ``evaluation.evaluate``; agents only evaluate genomes.
+        :type func: Callable
+        :param args: Arguments of ``evaluate``.
+        :raises TypeError: If func isn't ``evaluate``.
+        :return: The pending evaluation result.
+        :rtype: TaskResult
+        """
+        if getattr(func, "func", func) is not evaluate:
+            raise TypeError("The socket executor can only run evaluation.evaluate")
+        genome, temp_output_dir, timeout, screening, soft_timeout = (*args, *[None] * 4)[:5]
+        result = TaskResult()
+        self._tasks.put((tuple(genome), temp_output_dir, timeout, screening, soft_timeout, result))
+        return result
+
+    def map(self, func: Callable, *iterables) -> list:
+        results = [self.apipe(func, *args) for args in zip(*iterables)]
+        return [result.get() for result in results]
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            except Exception as e:
+                # e.g. a client with the wrong key
+                logger.warning(f"Rejected simulation agent connection: {e}")
+                continue
+            threading.Thread(
+                target=self._serve, args=(conn,), name="socket-executor-agent", daemon=True
+            ).start()
+
+    def _watch_agents(self) -> None:
+        while not self._closed:
+            time.sleep(min(self.agent_connect_timeout / 4, 1.0))
+            with self._lock:
+                if (
+                    self._agents
+                    or time.monotonic() - self._no_agents_since < self.agent_connect_timeout
+                ):
+                    continue
+                tasks = []
+                while True:
+                    try:
+                        tasks.append(self._tasks.get_nowait())
+                    except queue.Empty:
+                        break
+            if None in tasks:
+                # Closed while checking
+                self._tasks.put(None)
+            tasks = [task for task in tasks if task is not None]
+            if not tasks:
+                continue
+            host, port = self.address[:2]
+            message = (
+                f"No simulation agent has been connected to {host}:{port} for "
+                f"{self.agent_connect_timeout:.0f} s. Start agents with "
+                "'oshc simulation-agent', or use the local executor."
+            )
+            logger.error(message)
+            for task in tasks:
+                task[-1]._set(error=RuntimeError(message))
+
+    def _serve(self, conn: Connection) -> None:
+        with self._lock:
+            self._agents += 1
+        try:
+            _send(conn, ("init", self._context, self._hpxml))
+            while True:
+                task = self._tasks.get()
+                if task is None:
+                    # Leave the signal for the other connections
+                    self._tasks.put(None)
+                    _send(conn, None)
+                    return
+                genome, temp_output_dir, timeout, screening, soft_timeout, result = task
+                try:
+                    _send(conn, (genome, timeout, screening, soft_timeout))
+                    reply = _recv(conn)
+                except (OSError, EOFError):
+                    logger.warning(
+                        f"Lost connection to a simulation agent, resubmitting individual {list(genome)}"
+                    )
+                    self._tasks.put(task)
+                    return
+                status, value, hpxml = reply
+                if status != "ok":
+                    result._set(error=RuntimeError(f"Simulation agent failed: {value}"))
+                    continue
+                try:
+                    result._set(self._receive_result(value, temp_output_dir, hpxml))
+                except OSError as e:
+                    result._set(error=e)
+        except (OSError, EOFError) as e:
+            logger.warning(f"Lost connection to a simulation agent: {e}")
+        finally:
+            conn.close()
+            with self._lock:
+                self._agents -= 1
+                if not self._agents:
+                    self._no_agents_since = time.monotonic()
+
+    def _receive_result(self, result, temp_output_dir, hpxml):
+        if result.timing is not None and result.timing.stages:
+            # Agents may be on machines with other clocks; their results arrive just after
+            # their last stage ends
+            result = replace(
+                result, timing=result.timing.shifted(time.monotonic() - result.timing.end)
+            )
+        if temp_output_dir is None:
+            temp_output_dir = make_temp_output_dir(self._context.scratch_dir)
+        temp_output_dir = Path(temp_output_dir)
+        if hpxml is not None:
+            temp_output_dir.mkdir(parents=True, exist_ok=True)
+            (temp_output_dir / "modified.xml").write_text(hpxml, encoding="utf-8")
+        return replace(result, temp_output_dir=temp_output_dir)
+
+    def close(self) -> None:
+        """Stop accepting agents, and tell connected agents the calibration is over once
+        they finish their current simulation."""
+        if self._closed:
+            return
+        self._closed = True
+        self._tasks.put(None)
+        self._listener.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def run_agent_session(
+    address: tuple[str, int], authkey: bytes, cache_dir: os.PathLike | None = None
+) -> int:
+    """Connect to a calibration and evaluate genomes for it until it's over.
+
+    :param address: Host and port of the calibration's socket executor.
+    :type address: tuple[str, int]
+    :param authkey: Key shared with the calibration.
+    :type authkey: bytes
+    :param cache_dir: Simulation cache directory on this machine, if the calibration uses
+        the cache, defaults to the usual cache directory.
+    :type cache_dir: os.PathLike | None, optional
+    :return: Number of genomes evaluated.
+    :rtype: int
+    """
+    evaluated = 0
+    with (
+        Client(address, authkey=authkey) as conn,
+        tempfile.TemporaryDirectory(prefix="oshc_agent_") as agent_dir,
+    ):
+        _, context, hpxml = _recv(conn)
+        # Paths in the context are on the calibration's machine
+        hpxml_filepath = Path(agent_dir) / Path(context.hpxml_filepath).name
+        hpxml_filepath.write_text(hpxml, encoding="utf-8")
+        set_evaluation_context(
+            replace(
+                context,
+                hpxml_filepath=hpxml_filepath,
+                scratch_dir=None,
+                simulation_cache=(
+                    None if context.simulation_cache is None else SimulationCache(cache_dir)
+                ),
+            )
+        )
+        try:
+            while True:
+                try:
+                    task = _recv(conn)
+                except EOFError:
+                    break
+                if task is None:
+                    break
+                genome, timeout, screening, soft_timeout = task
+                temp_output_dir = make_temp_output_dir(Path(agent_dir))
+                try:
+                    result = evaluate(genome, temp_output_dir, timeout, screening, soft_timeout)
+                    modified_hpxml = temp_output_dir / "modified.xml"
+                    reply = (
+                        "ok",
+                        replace(result, temp_output_dir=None),
+                        modified_hpxml.read_text(encoding="utf-8")
+                        if modified_hpxml.exists()
+                        else None,
+                    )
+                except Exception as e:
+                    reply = ("error", str(e), None)
+                finally:
+                    shutil.rmtree(temp_output_dir, ignore_errors=True)
+                _send(conn, reply)
+                evaluated += 1
+        finally:
+            set_evaluation_context(None)
+    return evaluated
+
+
+def _agent_process(address: tuple[str, int], authkey: bytes, cache_dir: os.PathLike | None):
+    while True:
+        try:
+            evaluated = run_agent_session(address, authkey, cache_dir)
+            logger.info(f"Calibration finished after this agent evaluated {evaluated} genomes")
+        except AuthenticationError:
+            logger.error(f"The calibration at {address[0]}:{address[1]} rejected this agent's key")
+            return
+        except (ConnectionError, EOFError, OSError):
+            time.sleep(AGENT_RECONNECT_INTERVAL)
+
+
+def run_agent(
+    address: tuple[str, int],
+    authkey: bytes,
+    processes: int,
+    cache_dir: os.PathLike | None = None,
+) -> None:
+    """Evaluate genomes for calibrations using the socket executor, until interrupted.
+
+    Each process connects to the calibration at the address, and connects again once it's
+    over, so the agent serves one calibration after another.
+
+    :param address: Host and port of the calibrations' socket executor.
+    :type address: tuple[str, int]
+    :param authkey: Key shared with the calibrations.
+    :type authkey: bytes
+    :param processes: Number of genomes to evaluate at once.
+    :type processes: int
+    :param cache_dir: Simulation cache directory on this machine.
+    :type cache_dir: os.PathLike | None, optional
+    """
+    workers = [
+        multiprocessing.Process(
+            target=partial(_agent_process, address, authkey, cache_dir), daemon=True
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            worker.terminate()
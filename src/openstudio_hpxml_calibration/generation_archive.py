@@ -0,0 +1,201 @@
+import json
+import os
+import zipfile
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+from loguru import logger
+
+GENERATION_ARCHIVE_FILENAME = "generations.zip"
+INDEX_FILENAME = "index.json"
+
+
+def _member_prefix(gen: int) -> str:
+    return f"gen_{gen}/"
+
+
+def append_generation(
+    archive_path: os.PathLike,
+    gen: int,
+    individuals: Sequence[Mapping],
+    hpxml_members: dict[str, str] | None = None,
+) -> int:
+    """Append the HPXML files of one generation to a calibration run's generation archive.
+
+    The archive is a zip file with a ``gen_<N>/`` folder per generation, holding
+    ``ind_<i>.xml`` (and ``ind_<i>.json`` annual results, if given) for each individual and
+    an ``index.json`` of their parameter values and fitness. Members are compressed as
+    they're written, and the archive is closed after each generation, so it's readable
+    while the run continues.
+
+    The temp dir of an individual may be deleted once it leaves the population, and it may
+    come back later from the evaluation archive. If ``hpxml_members`` is given, the HPXML
+    file of such an individual is copied from the member it was archived as the first time.
+
+    :param archive_path: Path of the archive, created if it doesn't exist.
+    :type archive_path: os.PathLike
+    :param gen: Generation number.
+    :type gen: int
+    :param individuals: For each individual, ``hpxml_filepath`` (the modified HPXML file),
+        ``parameters`` (parameter values by name), ``fitness``, and optionally
+        ``sim_results`` (annual model results to save with it).
+    :type individuals: Sequence[Mapping]
+    :param hpxml_members: Archive member of each HPXML file already archived, by the file's
+        path, updated with the files archived now.
+    :type hpxml_members: dict[str, str] | None, optional
+    :return: Number of individuals archived. Individuals whose HPXML file no longer exists
+        and wasn't archived before are skipped.
+    :rtype: int
+    """
+    archive_path = Path(archive_path)
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    if hpxml_members is None:
+        hpxml_members = {}
+    prefix = _member_prefix(gen)
+    index = []
+    with zipfile.ZipFile(archive_path, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+        for individual in individuals:
+            hpxml_filepath = Path(individual["hpxml_filepath"])
+            name = f"ind_{len(index)}"
+            member = f"{prefix}{name}.xml"
+            if hpxml_filepath.exists():
+                zf.write(hpxml_filepath, member)
+            elif str(hpxml_filepath) in hpxml_members:
+                zf.writestr(member, zf.read(hpxml_members[str(hpxml_filepath)]))
+            else:
+                logger.warning(
+                    f"Unable to archive {hpxml_filepath} in generation {gen}: it no longer exists"
+                )
+                continue
+            hpxml_members.setdefault(str(hpxml_filepath), member)
+            entry = {
+                "individual": name,
+                "parameters": dict(individual["parameters"]),
+                "fitness": individual["fitness"],
+            }
+            if individual.get("sim_results") is not None:
+                zf.writestr(f"{prefix}{name}.json", json.dumps(individual["sim_results"]))
+                entry["results"] = True
+            index.append(entry)
+        if index:
+            zf.writestr(f"{prefix}{INDEX_FILENAME}", json.dumps(index, indent=2))
+    return len(index)
+
+
+def discard_generations_after(archive_path: os.PathLike, gen: int) -> None:
+    """Remove generations after ``gen`` from a generation archive, e.g. those written after
+    the checkpoint a run is resumed from.
+
+    Zip files can't delete members in place, so the archive is rewritten without them. An
+    archive that can't be read (e.g. the run was killed while writing it) is started over.
+
+    :param archive_path: Path of the archive.
+    :type archive_path: os.PathLike
+    :param gen: Last generation to keep.
+    :type gen: int
+    """
+    archive_path = Path(archive_path)
+    if not archive_path.exists():
+        return
+    tmp_path = archive_path.with_name(f".{archive_path.name}.tmp")
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            kept = [info for info in zf.infolist() if _member_generation(info.filename) <= gen]
+            if len(kept) == len(zf.infolist()):
+                return
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as out:
+                for info in kept:
+                    out.writestr(info, zf.read(info))
+    except zipfile.BadZipFile as e:
+        logger.warning(f"Unable to read generation archive {archive_path}, starting it over: {e}")
+        tmp_path.unlink(missing_ok=True)
+        archive_path.unlink()
+        return
+    os.replace(tmp_path, archive_path)
+
+
+def _member_generation(filename: str) -> int:
+    return int(filename.split("/", 1)[0].removeprefix("gen_"))
+
+
+class GenerationArchive:
+    """Reads the HPXML files of a calibration run from its generation archive.
+
+    :param archive_path: Path of the archive, usually ``generations.zip`` in the calibration
+        output directory.
+    :type archive_path: os.PathLike
+    """
+
+    def __init__(self, archive_path: os.PathLike):
+        self.archive_path = Path(archive_path)
+        self._zipfile = zipfile.ZipFile(self.archive_path)
+
+    @property
+    def generations(self) -> list[int]:
+        """Generation numbers in the archive, in order."""
+        return sorted({_member_generation(name) for name in self._zipfile.namelist()})
+
+    def individuals(self, gen: int) -> list[dict]:
+        """Get the index of the individuals archived for a generation.
+
+        :param gen: Generation number.
+        :type gen: int
+        :raises KeyError: If the generation isn't in the archive.
+        :return: ``individual`` name, ``parameters``, and ``fitness`` of each individual.
+        :rtype: list[dict]
+        """
+        return json.loads(self._zipfile.read(f"{_member_prefix(gen)}{INDEX_FILENAME}"))
+
+    def read_hpxml(self, gen: int, individual: str) -> str:
+        """Get the modified HPXML file of an individual.
+
+        :param gen: Generation number.
+        :type gen: int
+        :param individual: Individual name from the generation's index, e.g. ``ind_0``.
+        :type individual: str
+        :raises KeyError: If the individual isn't in the archive.
+        :return: Contents of the HPXML file.
+        :rtype: str
+        """
+        return self._zipfile.read(f"{_member_prefix(gen)}{individual}.xml").decode("utf-8")
+
+    def read_results(self, gen: int, individual: str) -> dict | None:
+        """Get the annual model results of an individual, if they were archived.
+
+        :param gen: Generation number.
+        :type gen: int
+        :param individual: Individual name from the generation's index, e.g. ``ind_0``.
+        :type individual: str
+        :return: Model results by fuel type and end use (MBtu), or None.
+        :rtype: dict | None
+        """
+        try:
+            return json.loads(self._zipfile.read(f"{_member_prefix(gen)}{individual}.json"))
+        except KeyError:
+            return None
+
+    def extract_hpxml(self, gen: int, individual: str, output_filepath: os.PathLike) -> Path:
+        """Write the modified HPXML file of an individual to a file.
+
+        :param gen: Generation number.
+        :type gen: int
+        :param individual: Individual name from the generation's index, e.g. ``ind_0``.
+        :type individual: str
+        :param output_filepath: Path to write the HPXML file to.
+        :type output_filepath: os.PathLike
+        :return: The path written to.
+        :rtype: Path
+        """
+        output_filepath = Path(output_filepath)
+        output_filepath.parent.mkdir(parents=True, exist_ok=True)
+        output_filepath.write_text(self.read_hpxml(gen, individual), encoding="utf-8")
+        return output_filepath
+
+    def close(self) -> None:
+        self._zipfile.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,519 @@
+import random
+import time
+from collections.abc import Callable, Sequence
+from operator import attrgetter
+
+from deap import tools
+from loguru import logger
+
+from openstudio_hpxml_calibration.archive import EvaluationArchive, EvaluationResult
+from openstudio_hpxml_calibration.population import split_islands
+
+
+def apply_result(individual, result: EvaluationResult) -> None:
+    """Give an individual the fitness and results of its evaluation.
+
+    :param individual: A DEAP individual.
+    :param result: Result of evaluating the individual's genome.
+    :type result: EvaluationResult
+    """
+    individual.fitness.values = result.fitness
+    individual.comparison = result.comparison
+    individual.temp_output_dir = result.temp_output_dir
+    individual.sim_results = result.sim_results
+
+
+def sel_tournament(
+    individuals: Sequence, k: int, tournsize: int, rng: random.Random = random
+) -> list:
+    """Choose individuals by tournament, like ``deap.tools.selTournament``, with a given
+    random number generator.
+
+    :param individuals: Individuals to choose from.
+    :type individuals: Sequence
+    :param k: Number of individuals to choose.
+    :type k: int
+    :param tournsize: Number of individuals in each tournament.
+    :type tournsize: int
+    :param rng: Random number generator, defaults to the ``random`` module.
+    :type rng: random.Random, optional
+    :return: The fittest individual of each tournament.
+    :rtype: list
+    """
+    return [
+        max((rng.choice(individuals) for _ in range(tournsize)), key=attrgetter("fitness"))
+        for _ in range(k)
+    ]
+
+
+def cx_uniform(ind1, ind2, indpb: float, rng: random.Random = random) -> tuple:
+    """Swap each value of two individuals with a probability, like
+    ``deap.tools.cxUniform``, with a given random number generator.
+
+    :param ind1: First individual, changed in place.
+    :param ind2: Second individual, changed in place.
+    :param indpb: Probability of swapping each value.
+    :type indpb: float
+    :param rng: Random number generator, defaults to the ``random`` module.
+    :type rng: random.Random, optional
+    :return: The two individuals.
+    :rtype: tuple
+    """
+    for i in range(min(len(ind1), len(ind2))):
+        if rng.random() < indpb:
+            ind1[i], ind2[i] = ind2[i], ind1[i]
+    return ind1, ind2
+
+
+def var_and(
+    population: Sequence, toolbox, cxpb: float, mutpb: float, rng: random.Random = random
+) -> list:
+    """Breed offspring by crossover and mutation, like ``deap.algorithms.varAnd``, with a
+    given random number generator, which is passed on to the toolbox's ``mate`` and
+    ``mutate``.
+
+    :param population: Parents of the offspring.
+    :type population: Sequence
+    :param toolbox: DEAP toolbox with ``clone``, ``mate``, and ``mutate``.
+    :param cxpb: Crossover probability of each pair of parents.
+    :type cxpb: float
+    :param mutpb: Mutation probability of each offspring.
+    :type mutpb: float
+    :param rng: Random number generator, defaults to the ``random`` module.
+    :type rng: random.Random, optional
+    :return: The offspring, one per parent. Those that changed have an invalid fitness.
+    :rtype: list
+    """
+    offspring = [toolbox.clone(ind) for ind in population]
+    for i in range(1, len(offspring), 2):
+        if rng.random() < cxpb:
+            offspring[i - 1], offspring[i] = toolbox.mate(offspring[i - 1], offspring[i], rng=rng)
+            del offspring[i - 1].fitness.values, offspring[i].fitness.values
+    for i in range(len(offspring)):
+        if rng.random() < mutpb:
+            (offspring[i],) = toolbox.mutate(offspring[i], rng=rng)
+            del offspring[i].fitness.values
+    return offspring
+
+
+def breed(pop: Sequence, toolbox, cxpb: float, mutpb: float, rng: random.Random = random):
+    """Breed one offspring from two parents chosen with the toolbox's ``select``.
+
+    An unchanged copy of a parent would add nothing to the population, so the offspring is
+    always mutated if it wasn't crossed over.
+
+    :param pop: The population.
+    :type pop: Sequence
+    :param toolbox: DEAP toolbox with ``clone``, ``select``, ``mate``, and ``mutate``.
+    :param cxpb: Crossover probability.
+    :type cxpb: float
+    :param mutpb: Mutation probability.
+    :type mutpb: float
+    :param rng: Random number generator, which is passed on to the toolbox's operators,
+        defaults to the ``random`` module.
+    :type rng: random.Random, optional
+    :return: The offspring, with an invalid fitness.
+    """
+    child, other_parent = (toolbox.clone(ind) for ind in toolbox.select(pop, 2, rng=rng))
+    if rng.random() < cxpb:
+        toolbox.mate(child, other_parent, rng=rng)
+        del child.fitness.values
+    if rng.random() < mutpb or child.fitness.valid:
+        toolbox.mutate(child, rng=rng)
+        del child.fitness.values
+    return child
+
+
+def replace_worst(pop: list, child) -> bool:
+    """Replace the worst individual in the population with an offspring, unless the
+    offspring is worse. The best individual is never replaced, so elitism is preserved.
+
+    :param pop: The population, changed in place.
+    :type pop: list
+    :param child: An evaluated offspring.
+    :return: Whether the offspring joined the population.
+    :rtype: bool
+    """
+    worst_index = min(range(len(pop)), key=lambda i: pop[i].fitness)
+    if child.fitness >= pop[worst_index].fitness:
+        pop[worst_index] = child
+        return True
+    return False
+
+
+def migrate(islands: list[list], migration_size: int, clone: Callable) -> None:
+    """Send copies of each island's best individuals to the next island in the ring,
+    replacing its worst individuals.
+
+    :param islands: Individuals of each island, changed in place.
+    :type islands: list[list]
+    :param migration_size: Number of individuals each island sends.
+    :type migration_size: int
+    :param clone: Copies an individual.
+    :type clone: Callable
+    """
+    tools.migRing(
+        islands,
+        migration_size,
+        lambda island, k: [clone(ind) for ind in tools.selBest(island, k)],
+        replacement=tools.selWorst,
+    )
+
+
+def island_random_generators(num_islands: int, rng: random.Random) -> list[random.Random]:
+    """Get a random number generator for each island, so each island breeds with its own
+    stream.
+
+    :param num_islands: Number of islands.
+    :type num_islands: int
+    :param rng: Random number generator of the search, which seeds the islands'.
+    :type rng: random.Random
+    :return: Generator of each island. A single island breeds with the search's own.
+    :rtype: list[random.Random]
+    """
+    if num_islands < 2:
+        return [rng]
+    return [random.Random(rng.getrandbits(64)) for _ in range(num_islands)]
+
+
+def island_records(
+    islands: list[list], stats: tools.Statistics, encoding, parameter_names: Sequence[str]
+) -> list[dict]:
+    """Get the statistics of each island for the logbook file.
+
+    :param islands: Individuals of each island.
+    :type islands: list[list]
+    :param stats: Fitness statistics of the search.
+    :type stats: tools.Statistics
+    :param encoding: ``ChoiceEncoding`` of the parameters, for the diversity.
+    :param parameter_names: Names of the parameters, in genome order.
+    :type parameter_names: Sequence[str]
+    :return: Fitness statistics, diversity, and best individual of each island.
+    :rtype: list[dict]
+    """
+    return [
+        {
+            **stats.compile(island),
+            "diversity": encoding.diversity(island),
+            "best_individual": dict(zip(parameter_names, tools.selBest(island, 1)[0])),
+        }
+        for island in islands
+    ]
+
+
+class GenerationalScheduler:
+    """Evolves a population a generation at a time, on one or more islands.
+
+    Each generation, every island breeds as many offspring as it has individuals, and the
+    offspring of all islands are evaluated together by ``evaluate``. Each island then
+    selects its next individuals from its offspring and keeps a copy of its best
+    individual (elitism). Every ``migration_interval`` generations, the best individuals
+    of each island are copied to the next island in the ring. The generation is then
+    handed to ``on_generation`` to be logged and checked for termination.
+
+    The population is kept island by island, so it splits back into the same islands
+    each generation, and after resuming from a checkpoint.
+
+    :param pop: The population, island by island.
+    :type pop: list
+    :param toolbox: DEAP toolbox with ``clone``, ``select``, ``mate``, and ``mutate``.
+    :param cxpb: Crossover probability.
+    :type cxpb: float
+    :param mutpb: Mutation probability.
+    :type mutpb: float
+    :param evaluate: Called with the generation number and the offspring that need to be
+        evaluated, which it evaluates in place. Returns the offspring it evaluated; those it
+        skipped take no part in selection.
+    :type evaluate: Callable
+    :param on_generation: Called with the generation number, the population, its islands,
+        and the evaluated offspring, when a generation is done. Returns whether the search
+        met the acceptance criteria, which stops it.
+    :type on_generation: Callable
+    :param island_rngs: Random number generator of each island, from
+        ``island_random_generators``. Their number is the number of islands.
+    :type island_rngs: Sequence[random.Random]
+    :param migration_interval: Number of generations between migrations, defaults to 1.
+    :type migration_interval: int, optional
+    :param migration_size: Number of individuals each island sends, defaults to 1.
+    :type migration_size: int, optional
+    :param before_generation: Called with the generation number and the population before
+        the generation is bred, defaults to nothing.
+    :type before_generation: Callable | None, optional
+    :param start_gen: Number of the last generation already done.
+    :type start_gen: int, optional
+    """
+
+    def __init__(
+        self,
+        pop: list,
+        toolbox,
+        cxpb: float,
+        mutpb: float,
+        evaluate: Callable,
+        on_generation: Callable,
+        island_rngs: Sequence[random.Random],
+        migration_interval: int = 1,
+        migration_size: int = 1,
+        before_generation: Callable | None = None,
+        start_gen: int = 0,
+    ):
+        self.pop = pop
+        self.toolbox = toolbox
+        self.cxpb = cxpb
+        self.mutpb = mutpb
+        self.evaluate = evaluate
+        self.on_generation = on_generation
+        self.island_rngs = island_rngs
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.before_generation = before_generation
+        self.gen = start_gen
+        self.success = False
+
+    def run(self, generations: int) -> tuple[list, bool]:
+        """Evolve the population until generation ``generations`` is done, or until
+        ``on_generation`` reports success.
+
+        :param generations: Number of the last generation.
+        :type generations: int
+        :return: The final population and whether calibration succeeded.
+        :rtype: tuple[list, bool]
+        """
+        while self.gen < generations and not self.success:
+            self.gen += 1
+            self.run_generation()
+        return self.pop, self.success
+
+    def run_generation(self) -> None:
+        """Breed, evaluate, and select the next generation of each island."""
+        if self.before_generation is not None:
+            self.before_generation(self.gen, self.pop)
+
+        # Each island breeds from its own individuals; the offspring of all islands are
+        # evaluated together
+        islands = split_islands(self.pop, len(self.island_rngs))
+        elites = []
+        island_offspring = []
+        for island, island_rng in zip(islands, self.island_rngs):
+            # Elitism: Copy the best individuals
+            elites.append([self.toolbox.clone(ind) for ind in tools.selBest(island, k=1)])
+            island_offspring.append(
+                var_and(island, self.toolbox, self.cxpb, self.mutpb, island_rng)
+            )
+
+        invalid_ind = [
+            ind for offspring in island_offspring for ind in offspring if not ind.fitness.valid
+        ]
+        evaluated = self.evaluate(self.gen, invalid_ind)
+        if len(evaluated) < len(invalid_ind):
+            evaluated_ids = {id(ind) for ind in evaluated}
+            skipped_ids = {id(ind) for ind in invalid_ind} - evaluated_ids
+            island_offspring = [
+                [ind for ind in offspring if id(ind) not in skipped_ids]
+                for offspring in island_offspring
+            ]
+
+        # Select the next generation (excluding elites), then add elites
+        for i, (offspring, elite, island_rng) in enumerate(
+            zip(island_offspring, elites, self.island_rngs)
+        ):
+            # An island whose offspring were all skipped keeps its parents
+            islands[i] = self.toolbox.select(
+                offspring or islands[i], len(islands[i]) - len(elite), rng=island_rng
+            )
+            islands[i].extend(elite)
+        if len(islands) > 1 and self.gen % self.migration_interval == 0:
+            migrate(islands, self.migration_size, self.toolbox.clone)
+        self.pop = [ind for island in islands for ind in island]
+
+        self.success = self.on_generation(self.gen, self.pop, islands, evaluated)
+
+
+class SteadyStateScheduler:
+    """Evolves a population without waiting for a whole generation to be simulated.
+
+    Whenever a worker finishes a simulation, its offspring replaces the worst individual in
+    the population (if it is no worse) and another offspring is bred and submitted. An
+    offspring already in the archive isn't submitted; it replaces the worst individual before
+    the next offspring is bred, so breeding never runs ahead of the population. Every
+    ``population_size`` simulations, with the archived offspring bred meanwhile, are a
+    "virtual generation", which is handed to ``on_generation`` to be logged and checked for
+    termination. Once ``max_duplicates`` offspring in a row were already in the archive, the
+    population has converged and no more offspring are bred.
+
+    :param pop: The population, changed in place.
+    :type pop: list
+    :param toolbox: DEAP toolbox with ``clone``, ``select``, ``mate``, and ``mutate``.
+    :param archive: Every genome evaluated in the run, with its result.
+    :type archive: EvaluationArchive
+    :param population_size: Number of offspring in a virtual generation.
+    :type population_size: int
+    :param max_evaluations: Number of offspring to simulate at most. Offspring already in the
+        archive don't count.
+    :type max_evaluations: int
+    :param cxpb: Crossover probability.
+    :type cxpb: float
+    :param mutpb: Mutation probability.
+    :type mutpb: float
+    :param submit: Submits the evaluation of an offspring and returns its pending result,
+        which has ``ready`` and ``get``.
+    :type submit: Callable
+    :param on_result: Called with an offspring, its evaluation result, and when it was
+        submitted (``time.monotonic``), when its evaluation finishes.
+    :type on_result: Callable
+    :param on_generation: Called with the generation number, the population, the offspring of
+        the virtual generation, how many of them came from a cache, and the temp dirs still
+        in use by evaluations, when a virtual generation is done. Returns whether the search
+        met the acceptance criteria, which stops it.
+    :type on_generation: Callable
+    :param concurrency_limit: Gets the number of evaluations to keep in flight, given the
+        number in flight.
+    :type concurrency_limit: Callable
+    :param start_gen: Number of the last generation already done.
+    :type start_gen: int, optional
+    :param rng: Random number generator of the search, defaults to the ``random`` module.
+    :type rng: random.Random, optional
+    :param max_duplicates: Number of offspring in a row already in the archive after which
+        the search stops, defaults to 10 times ``population_size``.
+    :type max_duplicates: int | None, optional
+    """
+
+    def __init__(
+        self,
+        pop: list,
+        toolbox,
+        archive: EvaluationArchive,
+        population_size: int,
+        max_evaluations: int,
+        cxpb: float,
+        mutpb: float,
+        submit: Callable,
+        on_result: Callable,
+        on_generation: Callable,
+        concurrency_limit: Callable,
+        start_gen: int = 0,
+        rng: random.Random = random,
+        max_duplicates: int | None = None,
+    ):
+        self.pop = pop
+        self.toolbox = toolbox
+        self.archive = archive
+        self.population_size = population_size
+        self.max_evaluations = max_evaluations
+        self.cxpb = cxpb
+        self.mutpb = mutpb
+        self.submit = submit
+        self.on_result = on_result
+        self.on_generation = on_generation
+        self.concurrency_limit = concurrency_limit
+        self.max_duplicates = max_duplicates if max_duplicates is not None else 10 * population_size
+        self.rng = rng
+        self.gen = start_gen
+        self.success = False
+        self.converged = False
+        self.num_submitted = 0
+        self.num_duplicates = 0
+        self.in_flight = {}
+        self.submitted = {}
+        # Evaluated offspring not yet in the population, whether their result was cached, and
+        # whether they were simulated in this search (rather than found in the archive)
+        self.completed = []
+        self.gen_offspring = []
+        self.gen_cache_hits = 0
+        self.gen_evaluations = 0
+
+    def run(self) -> tuple[list, bool]:
+        """Evolve the population until ``max_evaluations`` offspring were simulated, the
+        population converged, or ``on_generation`` reports success.
+
+        :return: The final population and whether calibration succeeded.
+        :rtype: tuple[list, bool]
+        """
+        while True:
+            if not self.success and not self.converged:
+                self.submit_offspring()
+            self.collect_results()
+
+            if self.success:
+                # Let simulations already running finish before their temp dirs are removed
+                self.completed.clear()
+                if not self.in_flight:
+                    break
+                time.sleep(0.1)
+                continue
+            if not self.completed:
+                if not self.in_flight:
+                    break
+                time.sleep(0.1)
+                continue
+            self.process_completed()
+
+        if self.gen_offspring and not self.success:
+            # The population converged part way through a virtual generation
+            self.finish_generation()
+        return self.pop, self.success
+
+    def submit_offspring(self) -> None:
+        """Breed and submit offspring until every worker is busy, or until an offspring is
+        already in the archive, so it joins the population before the next one is bred."""
+        while len(self.in_flight) < self.concurrency_limit(
+            len(self.in_flight)
+        ) and self.num_submitted < (self.max_evaluations):
+            child = breed(self.pop, self.toolbox, self.cxpb, self.mutpb, self.rng)
+            result = self.archive.get(child)
+            if result is not None:
+                apply_result(child, result)
+                self.completed.append((child, True, False))
+                self.num_duplicates += 1
+                if self.num_duplicates >= self.max_duplicates:
+                    logger.info(
+                        f"The last {self.num_duplicates} offspring were all evaluated before, "
+                        "so the population has converged. No more offspring will be bred."
+                    )
+                    self.converged = True
+                return
+            self.num_duplicates = 0
+            self.num_submitted += 1
+            async_result = self.submit(child)
+            self.in_flight[async_result] = child
+            self.submitted[async_result] = time.monotonic()
+
+    def collect_results(self) -> None:
+        """Archive the results of the evaluations that finished."""
+        for async_result in [r for r in self.in_flight if r.ready()]:
+            child = self.in_flight.pop(async_result)
+            result = async_result.get()
+            self.on_result(child, result, self.submitted.pop(async_result))
+            self.archive.add(child, result)
+            apply_result(child, result)
+            self.completed.append((child, result.from_cache, True))
+
+    def process_completed(self) -> None:
+        """Add the evaluated offspring to the population, finishing virtual generations."""
+        for child, from_cache, simulated in self.completed:
+            replace_worst(self.pop, child)
+            self.gen_offspring.append(child)
+            self.gen_cache_hits += int(from_cache)
+            self.gen_evaluations += int(simulated)
+            if self.gen_evaluations < self.population_size:
+                continue
+
+            self.finish_generation()
+            if self.success:
+                break
+        self.completed.clear()
+
+    def finish_generation(self) -> None:
+        """Hand the virtual generation to ``on_generation`` and start the next one."""
+        self.gen += 1
+        self.success = self.on_generation(
+            self.gen,
+            self.pop,
+            self.gen_offspring,
+            self.gen_cache_hits,
+            [ind.temp_output_dir for ind in self.in_flight.values()]
+            + [ind.temp_output_dir for ind, *_ in self.completed],
+        )
+        self.gen_offspring = []
+        self.gen_cache_hits = 0
+        self.gen_evaluations = 0
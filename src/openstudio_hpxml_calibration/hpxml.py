@@ -1,11 +1,15 @@
 import functools
 import os
 import re
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime as dt
 from datetime import timedelta
 from enum import Enum
 from pathlib import Path
+from types import MappingProxyType
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 from lxml import etree, isoschematron, objectify
@@ -63,6 +67,100 @@ class EnergyUnitType(Enum):
     TON_HOURS = "ton hours"
 
 
+@functools.cache
+def compiled_xpath(xpath_expr: str, namespace: str, smart_strings: bool = True) -> etree.XPath:
+    """Compile an xpath expression with the h: prefix bound to an HPXML namespace.
+
+    Compiled expressions are cached per process, so repeated queries skip parsing the
+    expression. They aren't picklable, so they are kept here rather than on HpxmlDoc.
+
+    :param xpath_expr: Xpath expression to compile
+    :type xpath_expr: str
+    :param namespace: HPXML namespace to bind to the h: prefix
+    :type namespace: str
+    :param smart_strings: Return smart strings for text results, defaults to True
+    :type smart_strings: bool, optional
+    :return: Compiled xpath expression
+    :rtype: etree.XPath
+    """
+    return etree.XPath(xpath_expr, namespaces={"h": namespace}, smart_strings=smart_strings)
+
+
+@dataclass(frozen=True, slots=True)
+class FuelBills:
+    """Utility bills for one fuel type, parsed from a ConsumptionInfo element.
+
+    :param fuel_type: HPXML fuel type of the bills
+    :param unit: HPXML unit of measure of the consumption values
+    :param start_dates: Start of each bill period, NaT where missing
+    :param end_dates: End of each bill period, NaT where missing
+    :param consumption: Consumption for each bill period, in ``unit``
+    """
+
+    fuel_type: str
+    unit: str
+    start_dates: np.ndarray
+    end_dates: np.ndarray
+    consumption: np.ndarray
+
+    @classmethod
+    def from_consumption_info(cls, consumption_info: objectify.ObjectifiedElement) -> "FuelBills":
+        """Parse the bills in a ConsumptionInfo element
+
+        :param consumption_info: ConsumptionInfo element
+        :type consumption_info: objectify.ObjectifiedElement
+        :return: Parsed bills
+        :rtype: FuelBills
+        """
+        details = getattr(consumption_info, "ConsumptionDetail", [])
+
+        def dates(name):
+            return np.array(
+                [str(getattr(detail, name, "NaT")) for detail in details], dtype="datetime64[s]"
+            )
+
+        arrays = (
+            dates("StartDateTime"),
+            dates("EndDateTime"),
+            np.array([float(detail.Consumption) for detail in details], dtype=float),
+        )
+        for array in arrays:
+            array.flags.writeable = False
+        return cls(
+            str(consumption_info.ConsumptionType.Energy.FuelType),
+            str(consumption_info.ConsumptionType.Energy.UnitofMeasure),
+            *arrays,
+        )
+
+    @property
+    def num_days(self) -> int:
+        """Number of days from the start of the first bill to the end of the last one."""
+        return int((self.end_dates[-1] - self.start_dates[0]) // np.timedelta64(1, "D")) + 1
+
+
+@dataclass(frozen=True, slots=True)
+class BuildingProfile:
+    """Facts about a building that are looked up repeatedly during calibration.
+
+    Built once from the HPXML tree by ``HpxmlDoc.profile`` so hot paths don't walk the tree.
+
+    :param building_id: The id of the Building
+    :param fuel_types: Fuel types by component, as returned by ``HpxmlDoc.get_fuel_types``
+    :param consumptions: Consumption elements for the building
+    :param bills: Parsed bills by fuel type, in the order they appear in the file
+    """
+
+    building_id: str
+    fuel_types: Mapping[str, frozenset[str]]
+    consumptions: tuple[objectify.ObjectifiedElement, ...]
+    bills: Mapping[str, FuelBills]
+
+    @property
+    def heats_with_electricity(self) -> bool:
+        """Whether electricity is the fuel for any heating system."""
+        return FuelType.ELECTRICITY.value in self.fuel_types["heating"]
+
+
 class HpxmlDoc:
     """
     A class representing an HPXML document.
@@ -140,9 +238,43 @@ class HpxmlDoc:
         ns = re.match(r"\{(.+)\}", el.tag).group(1)
         return el.xpath(xpath_expr, namespaces={"h": ns}, **kw)
 
+    def _compiled_xpath(self, xpath_expr: str, smart_strings: bool = True, **variables) -> list:
+        namespace = etree.QName(self.root).namespace
+        return compiled_xpath(xpath_expr, namespace, smart_strings)(self.root, **variables)
+
+    @functools.cached_property
+    def profile(self) -> BuildingProfile:
+        """Profile of the first building, built on first access.
+
+        Call ``invalidate_profile`` after modifying the parts of the tree it summarizes.
+        """
+        building_id = self.get_first_building_id()
+        consumptions = self.get_consumptions(building_id)
+        bills = {}
+        for consumption in consumptions:
+            for consumption_info in consumption.ConsumptionDetails.ConsumptionInfo:
+                if hasattr(consumption_info.ConsumptionType, "Energy"):
+                    fuel_bills = FuelBills.from_consumption_info(consumption_info)
+                    bills[fuel_bills.fuel_type] = fuel_bills
+        return BuildingProfile(
+            building_id=building_id,
+            fuel_types=MappingProxyType(
+                {
+                    component: frozenset(fuels)
+                    for component, fuels in self.get_fuel_types(building_id).items()
+                }
+            ),
+            consumptions=consumptions,
+            bills=MappingProxyType(bills),
+        )
+
+    def invalidate_profile(self) -> None:
+        """Discard the building profile so it is rebuilt from the tree on next access."""
+        self.__dict__.pop("profile", None)
+
     def get_first_building_id(self) -> str:
         """Get the id of the first Building element in the file."""
-        return self.xpath("h:Building[1]/h:BuildingID/@id", smart_strings=False)[0]
+        return self._compiled_xpath("h:Building[1]/h:BuildingID/@id", smart_strings=False)[0]
 
     def get_building(self, building_id: str | None = None) -> objectify.ObjectifiedElement:
         """Get a building element
@@ -153,11 +285,11 @@ class HpxmlDoc:
         :rtype: objectify.ObjectifiedElement
         """
         if building_id is None:
-            return self.xpath("h:Building[1]")[0]
+            return self._compiled_xpath("h:Building[1]")[0]
         else:
-            return self.xpath("h:Building[h:BuildingID/@id=$building_id]", building_id=building_id)[
-                0
-            ]
+            return self._compiled_xpath(
+                "h:Building[h:BuildingID/@id=$building_id]", building_id=building_id
+            )[0]
 
     def get_fuel_types(self, building_id: str | None = None) -> tuple[str, set[str]]:
         """Get fuel types providing heating, cooling, water heating, clothes drying, and cooking
@@ -247,9 +379,11 @@ class HpxmlDoc:
         :rtype: tuple
         """
         if building_id is None:
-            return tuple(self.xpath("h:Consumption"))
+            return tuple(self._compiled_xpath("h:Consumption"))
         return tuple(
-            self.xpath("h:Consumption[h:BuildingID/@idref=$building_id]", building_id=building_id)
+            self._compiled_xpath(
+                "h:Consumption[h:BuildingID/@idref=$building_id]", building_id=building_id
+            )
         )
 
     @functools.cache
@@ -0,0 +1,96 @@
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+LOGBOOK_FILENAME = "logbook.jsonl"
+LOGBOOK_JSON_FILENAME = "logbook.json"
+
+
+def append_logbook_record(logbook_path: os.PathLike, record: dict) -> None:
+    """Append the record of one generation to a calibration run's logbook.
+
+    The logbook has one JSON object per line. Nested results (the best individual, its
+    simulation results, and parameter and result statistics) are stored as JSON objects,
+    and the error of the best individual for each end use and fuel type has its own
+    ``bias_error_<end use>_<fuel type>`` and ``abs_error_<end use>_<fuel type>`` number.
+    Each record is written and flushed as soon as its generation is done, so nothing is
+    kept in memory and the logbook survives a crash.
+
+    :param logbook_path: Path of the logbook, created if it doesn't exist.
+    :type logbook_path: os.PathLike
+    :param record: Values recorded for the generation.
+    :type record: dict
+    """
+    line = json.dumps(record) + "\n"
+    with open(logbook_path, "a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_logbook(logbook_path: os.PathLike) -> Iterator[dict]:
+    """Read the records of a calibration run's logbook, one generation at a time.
+
+    :param logbook_path: Path of the logbook.
+    :type logbook_path: os.PathLike
+    :return: Record of each generation, in order. A last line left incomplete by a crash
+        is skipped.
+    :rtype: Iterator[dict]
+    """
+    logbook_path = Path(logbook_path)
+    if not logbook_path.exists():
+        return
+    with open(logbook_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                return
+            yield json.loads(line)
+
+
+def discard_records_after(logbook_path: os.PathLike, gen: int) -> None:
+    """Remove the records of generations after ``gen`` from a logbook, e.g. those written
+    after the checkpoint a run is resumed from.
+
+    :param logbook_path: Path of the logbook.
+    :type logbook_path: os.PathLike
+    :param gen: Last generation to keep.
+    :type gen: int
+    """
+    logbook_path = Path(logbook_path)
+    if not logbook_path.exists():
+        return
+    tmp_path = logbook_path.with_name(f".{logbook_path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in read_logbook(logbook_path):
+            if record["gen"] <= gen:
+                f.write(json.dumps(record) + "\n")
+    os.replace(tmp_path, logbook_path)
+
+
+def write_logbook_json(logbook_path: os.PathLike, output_path: os.PathLike, summary: dict) -> None:
+    """Write the JSON summary of a calibration run, with the records of its logbook as
+    ``calibration_results``.
+
+    Records are copied from the logbook one at a time, so the whole logbook is never held
+    in memory.
+
+    :param logbook_path: Path of the logbook.
+    :type logbook_path: os.PathLike
+    :param output_path: Path of the JSON file to write.
+    :type output_path: os.PathLike
+    :param summary: Other values to write before ``calibration_results``.
+    :type summary: dict
+    """
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        for key, value in summary.items():
+            f.write(f"  {json.dumps(key)}: {_indent(json.dumps(value, indent=2))},\n")
+        f.write('  "calibration_results": [')
+        for i, record in enumerate(read_logbook(logbook_path)):
+            f.write(("," if i else "") + "\n    " + _indent(json.dumps(record, indent=2), 4))
+        f.write("\n  ]\n}\n")
+
+
+def _indent(text: str, spaces: int = 2) -> str:
+    return text.replace("\n", "\n" + " " * spaces)
@@ -64,4 +64,5 @@ def set_consumption_on_hpxml(hpxml_object: HpxmlDoc, csv_bills_filepath: Path) -
         consumption_details.append(new_obj)
 
     hpxml_object.root.append(consumption_section)
+    hpxml_object.invalidate_profile()
     return hpxml_object
@@ -0,0 +1,272 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from openstudio_hpxml_calibration.hpxml import FuelBills, FuelType
+from openstudio_hpxml_calibration.units import convert_units
+
+DELIVERED_FUELS = (
+    FuelType.FUEL_OIL.value,
+    FuelType.PROPANE.value,
+    FuelType.WOOD.value,
+    FuelType.WOOD_PELLETS.value,
+)
+
+END_USES = ("heating", "cooling", "baseload")
+
+
+@dataclass(frozen=True)
+class DeliveredFuelTarget:
+    """Measured consumption of a delivered fuel and the weather over its bill periods.
+
+    :param measured_consumption: Total measured consumption over the bill periods, in MBtu.
+    :param num_days: Number of days from the first bill start to the last bill end.
+    :param tmy_degree_days: TMY HDD65F and CDD65F summed over the bill periods.
+    :param actual_degree_days: Actual HDD65F and CDD65F over the bill periods.
+    """
+
+    measured_consumption: float
+    num_days: int
+    tmy_degree_days: Mapping[str, float]
+    actual_degree_days: Mapping[str, float]
+
+
+@dataclass(frozen=True)
+class NormalizationTargets:
+    """Everything about the utility bills that an individual's simulation results are compared to.
+
+    None of this depends on the genome, so it is built once per calibration run and the
+    comparison for each individual is arithmetic on its simulation results.
+
+    :param fuels: Fuel types with bills, in the order they appear in the HPXML file.
+    :param detailed: Annual weather-normalized consumption (MBtu) by end use for fuels
+        calibrated with the detailed (inverse model) technique.
+    :param delivered: Targets for fuels calibrated with the simplified technique.
+    """
+
+    fuels: tuple[str, ...]
+    detailed: Mapping[str, Mapping[str, float]]
+    delivered: Mapping[str, DeliveredFuelTarget]
+
+
+def get_delivered_fuel_target(
+    bills: FuelBills, total_period_tmy_dd: dict, total_period_actual_dd: dict
+) -> DeliveredFuelTarget:
+    """Summarize the bills of a delivered fuel.
+
+    :param bills: Bills for the delivered fuel.
+    :type bills: FuelBills
+    :param total_period_tmy_dd: TMY degree days by fuel type, from ``calculate_annual_degree_days``.
+    :type total_period_tmy_dd: dict
+    :param total_period_actual_dd: Actual degree days by fuel type, from ``calculate_annual_degree_days``.
+    :type total_period_actual_dd: dict
+    :return: The measured consumption and degree days of the fuel's bill periods.
+    :rtype: DeliveredFuelTarget
+    """
+    fuel_type = bills.fuel_type
+    fuel_unit_type = bills.unit
+    if fuel_unit_type == "gal" and fuel_type == FuelType.FUEL_OIL.value:
+        fuel_unit_type = f"{fuel_unit_type}_fuel_oil"
+    elif fuel_unit_type == "gal" and fuel_type == FuelType.PROPANE.value:
+        fuel_unit_type = f"{fuel_unit_type}_propane"
+    elif fuel_unit_type == "therms":
+        fuel_unit_type = "therm"
+    measured_consumption = convert_units(float(bills.consumption.sum()), fuel_unit_type, "mBtu")
+
+    return DeliveredFuelTarget(
+        measured_consumption=measured_consumption,
+        num_days=bills.num_days,
+        tmy_degree_days=MappingProxyType(dict(total_period_tmy_dd[fuel_type])),
+        actual_degree_days=MappingProxyType(dict(total_period_actual_dd[fuel_type])),
+    )
+
+
+def get_annual_normalized_consumption(
+    normalized_consumption_per_bill: dict[str, pd.DataFrame],
+) -> dict[str, dict[str, float]]:
+    """Sum weather-normalized bill consumption to annual totals by end use.
+
+    :param normalized_consumption_per_bill: Weather-normalized consumption per bill (MBtu).
+    :type normalized_consumption_per_bill: dict[str, pd.DataFrame]
+    :return: Annual consumption (MBtu) by fuel type and end use.
+    :rtype: dict[str, dict[str, float]]
+    """
+    return {
+        fuel_type: {
+            end_use: consumption[end_use].sum() for end_use in END_USES if end_use in consumption
+        }
+        for fuel_type, consumption in normalized_consumption_per_bill.items()
+    }
+
+
+def compare_annual_consumption(
+    annual_normalized_consumption: Mapping[str, Mapping[str, float]], annual_model_results: dict
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Compare annual weather-normalized consumption with the model results.
+
+    :param annual_normalized_consumption: Annual normalized consumption (MBtu) by fuel type and
+        end use, from ``get_annual_normalized_consumption``.
+    :type annual_normalized_consumption: Mapping[str, Mapping[str, float]]
+    :param annual_model_results: Model results data (MBtu).
+    :type annual_model_results: dict
+    :return: Comparison results containing bias and absolute errors for each fuel type and end use.
+    :rtype: dict[str, dict[str, dict[str, float]]]
+    """
+    # Only compare end uses the model has consumption for
+    annual_normalized_bill_consumption = {}
+    for fuel_type, consumption in annual_normalized_consumption.items():
+        annual_normalized_bill_consumption[fuel_type] = {}
+        for end_use in END_USES:
+            if (
+                end_use not in consumption
+                or end_use not in annual_model_results[fuel_type]
+                or annual_model_results[fuel_type][end_use] == 0.0
+            ):
+                continue
+            annual_normalized_bill_consumption[fuel_type][end_use] = np.round(
+                consumption[end_use], 1
+            )
+
+    comparison_results = {}
+
+    # combine the annual normalized bill consumption with the model results
+    for model_fuel_type, disagg_results in annual_model_results.items():
+        if model_fuel_type in annual_normalized_bill_consumption:
+            comparison_results[model_fuel_type] = {"Bias Error": {}, "Absolute Error": {}}
+            for load_type in disagg_results:
+                if load_type not in annual_normalized_bill_consumption[model_fuel_type]:
+                    continue
+
+                bill_consumption = annual_normalized_bill_consumption[model_fuel_type][load_type]
+                disagg_result = disagg_results[load_type]
+                if model_fuel_type == "electricity":
+                    # All results from simulation and normalized bills are in MBtu.
+                    # convert electric loads from MBtu to kWh for bpi2400
+                    bill_consumption = convert_units(bill_consumption, from_="mbtu", to_="kwh")
+                    disagg_result = convert_units(disagg_result, from_="mbtu", to_="kwh")
+
+                # Calculate error levels
+                if bill_consumption == 0:
+                    comparison_results[model_fuel_type]["Bias Error"][load_type] = float("nan")
+                else:
+                    comparison_results[model_fuel_type]["Bias Error"][load_type] = round(
+                        ((bill_consumption - disagg_result) / bill_consumption) * 100,
+                        1,
+                    )
+                comparison_results[model_fuel_type]["Absolute Error"][load_type] = round(
+                    abs(bill_consumption - disagg_result),
+                    1,
+                )
+
+    return comparison_results
+
+
+def compare_delivered_fuel(
+    model_results: dict, target: DeliveredFuelTarget, fuel_type: str
+) -> tuple[dict, dict]:
+    """Perform simplified annual usage calibration for a delivered fuel.
+
+    Estimates annual fuel usage and compares measured consumption with modeled results
+    for fuels that cannot be weather-normalized (e.g., fuel oil, propane, wood).
+    Calculates bias and absolute errors for baseload, heating, and cooling end uses.
+
+    :param model_results: Annual model results by fuel type and end use.
+    :type model_results: dict
+    :param target: Measured consumption and degree days of the fuel's bill periods.
+    :type target: DeliveredFuelTarget
+    :param fuel_type: The fuel type being calibrated.
+    :type fuel_type: str
+    :return: Tuple containing bias and absolute error metrics for each end use, and weather-normalized annual consumption by end use.
+    :rtype: tuple[dict, dict]
+    """
+    modeled_baseload = model_results[fuel_type].get("baseload", 0)
+    modeled_heating = model_results[fuel_type].get("heating", 0)
+    modeled_cooling = model_results[fuel_type].get("cooling", 0)
+    total_modeled_usage = modeled_baseload + modeled_heating + modeled_cooling
+
+    baseload_fraction = modeled_baseload / total_modeled_usage
+    heating_fraction = modeled_heating / total_modeled_usage
+    cooling_fraction = modeled_cooling / total_modeled_usage
+
+    baseload = baseload_fraction * (target.num_days / 365)
+    heating = heating_fraction * (
+        target.actual_degree_days["HDD65F"] / target.tmy_degree_days["HDD65F"]
+    )
+    cooling = cooling_fraction * (
+        target.actual_degree_days["CDD65F"] / target.tmy_degree_days["CDD65F"]
+    )
+
+    annual_delivered_fuel_usage = target.measured_consumption / (baseload + heating + cooling)
+
+    normalized_annual_baseload = annual_delivered_fuel_usage * baseload_fraction
+    normalized_annual_heating = annual_delivered_fuel_usage * heating_fraction
+    normalized_annual_cooling = annual_delivered_fuel_usage * cooling_fraction
+
+    baseload_bias_error = (
+        ((normalized_annual_baseload - modeled_baseload) / normalized_annual_baseload) * 100
+        if normalized_annual_baseload
+        else 0
+    )
+    heating_bias_error = (
+        ((normalized_annual_heating - modeled_heating) / normalized_annual_heating) * 100
+        if normalized_annual_heating
+        else 0
+    )
+    cooling_bias_error = (
+        ((normalized_annual_cooling - modeled_cooling) / normalized_annual_cooling) * 100
+        if normalized_annual_cooling
+        else 0
+    )
+
+    baseload_absolute_error = abs(normalized_annual_baseload - modeled_baseload)
+    heating_absolute_error = abs(normalized_annual_heating - modeled_heating)
+    cooling_absolute_error = abs(normalized_annual_cooling - modeled_cooling)
+
+    comparison_results = {
+        fuel_type: {
+            "Bias Error": {
+                "baseload": round(baseload_bias_error, 2),
+                "heating": round(heating_bias_error, 2),
+                "cooling": round(cooling_bias_error, 2),
+            },
+            "Absolute Error": {
+                "baseload": round(baseload_absolute_error, 2),
+                "heating": round(heating_absolute_error, 2),
+                "cooling": round(cooling_absolute_error, 2),
+            },
+        }
+    }
+    normalized_annual_end_uses = {
+        "baseload": round(normalized_annual_baseload, 2),
+        "heating": round(normalized_annual_heating, 2),
+        "cooling": round(normalized_annual_cooling, 2),
+    }
+    return comparison_results, normalized_annual_end_uses
+
+
+def compare_to_targets(targets: NormalizationTargets, simulation_results: dict) -> dict:
+    """Compare an individual's simulation results with the utility bills.
+
+    :param targets: Normalization targets for the home.
+    :type targets: NormalizationTargets
+    :param simulation_results: Annual model results by fuel type and end use (MBtu).
+    :type simulation_results: dict
+    :return: Bias and absolute errors for each fuel type and end use.
+    :rtype: dict
+    """
+    detailed_comparison = (
+        compare_annual_consumption(targets.detailed, simulation_results) if targets.detailed else {}
+    )
+    comparison = {}
+    for fuel in targets.fuels:
+        if fuel in targets.delivered:
+            delivered_results, _ = compare_delivered_fuel(
+                simulation_results, targets.delivered[fuel], fuel
+            )
+            comparison[fuel] = delivered_results[fuel]
+        elif fuel in detailed_comparison:
+            comparison[fuel] = detailed_comparison[fuel]
+    return comparison
@@ -0,0 +1,277 @@
+import copy
+import json
+import math
+import os
+import random
+from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from scipy.stats import qmc
+
+from openstudio_hpxml_calibration.checkpoint import load_checkpoint
+from openstudio_hpxml_calibration.logbook import read_logbook
+
+INITIAL_POPULATION_DESIGNS = ("random", "latin_hypercube", "sobol")
+
+
+class ChoiceEncoding:
+    """Encodes a population as a matrix of indices into each parameter's value choices.
+
+    Genomes only ever hold values from a fixed set of choices per parameter, so a
+    population of any size fits in one int8 matrix, with a row per individual and a
+    column per parameter. Population statistics are computed on the matrix with NumPy
+    instead of looping over individuals in Python.
+
+    :param value_choices: Possible values of each parameter, in genome order.
+    :type value_choices: Mapping[str, Sequence[float]]
+    :raises ValueError: If a parameter has more choices than an int8 can index.
+    """
+
+    def __init__(self, value_choices: Mapping[str, Sequence[float]]):
+        self.parameter_names = tuple(value_choices)
+        self.values = [
+            np.array(sorted(set(choices)), dtype=float) for choices in value_choices.values()
+        ]
+        too_many = [
+            name
+            for name, values in zip(self.parameter_names, self.values)
+            if len(values) - 1 > np.iinfo(np.int8).max
+        ]
+        if too_many:
+            raise ValueError(f"Too many value choices for parameters {too_many}")
+
+    def encode(self, population: Sequence[Sequence[float]]) -> np.ndarray:
+        """Get the choice index of each parameter of each individual.
+
+        :param population: Genomes, in the parameter order of the encoding.
+        :type population: Sequence[Sequence[float]]
+        :raises ValueError: If a genome holds a value that isn't one of the choices.
+        :return: int8 matrix of shape (individuals, parameters).
+        :rtype: np.ndarray
+        """
+        genomes = np.asarray(population, dtype=float).reshape(len(population), len(self.values))
+        indices = np.empty(genomes.shape, dtype=np.int8)
+        for j, values in enumerate(self.values):
+            column = np.searchsorted(values, genomes[:, j]).clip(max=len(values) - 1)
+            if not np.array_equal(values[column], genomes[:, j]):
+                raise ValueError(
+                    f"Invalid value for {self.parameter_names[j]}. Must be one of {values.tolist()}."
+                )
+            indices[:, j] = column
+        return indices
+
+    def decode(self, indices: np.ndarray) -> np.ndarray:
+        """Get the parameter values of encoded genomes.
+
+        :param indices: Matrix from ``encode``.
+        :type indices: np.ndarray
+        :return: Float matrix of parameter values, of the same shape.
+        :rtype: np.ndarray
+        """
+        return np.column_stack(
+            [values[indices[:, j]] for j, values in enumerate(self.values)]
+        ).reshape(indices.shape)
+
+    def diversity(self, population: Sequence[Sequence[float]]) -> float:
+        """Get the fraction of individuals in a population with a distinct genome.
+
+        :param population: Genomes.
+        :type population: Sequence[Sequence[float]]
+        :return: Number of distinct genomes divided by the population size.
+        :rtype: float
+        """
+        indices = self.encode(population)
+        return len(np.unique(indices, axis=0)) / len(indices)
+
+    def parameter_stats(self, population: Sequence[Sequence[float]]) -> dict[str, dict]:
+        """Get the min, max, median, and population standard deviation of each parameter.
+
+        :param population: Genomes.
+        :type population: Sequence[Sequence[float]]
+        :return: Statistics by parameter name.
+        :rtype: dict[str, dict]
+        """
+        values = self.decode(self.encode(population))
+        mins, maxes = values.min(axis=0), values.max(axis=0)
+        medians, stds = np.median(values, axis=0), values.std(axis=0)
+        return {
+            name: {
+                "min": float(mins[j]),
+                "max": float(maxes[j]),
+                "median": float(medians[j]),
+                "std": float(stds[j]),
+            }
+            for j, name in enumerate(self.parameter_names)
+        }
+
+
+def clone_individual(individual):
+    """Copy an individual for breeding, sharing its evaluation results.
+
+    DEAP's default clone deep-copies every attribute, including the comparison and
+    simulation results, each time an individual is bred or kept as an elite. Only the
+    genome and fitness are changed by the genetic operators, so only they're copied.
+
+    :param individual: A DEAP individual.
+    :return: The copy.
+    """
+    clone = copy.copy(individual)
+    clone.fitness = copy.copy(individual.fitness)
+    return clone
+
+
+def design_population(
+    value_choices: Sequence[Sequence[float]],
+    size: int,
+    design: str,
+    exclude: Iterable[Sequence[float]] = (),
+    rng: random.Random = random,
+) -> list[list[float]]:
+    """Choose genomes that spread evenly over the value choices, for an initial population.
+
+    A Latin hypercube or scrambled Sobol sample of the unit hypercube is drawn. Along each
+    dimension, the points are ranked and the ranks are split evenly between the value
+    choices of the parameter, so every choice of every parameter is used by the same
+    number of genomes (give or take one). Duplicate genomes are replaced with random ones,
+    so no two genomes are the same unless there are fewer possible genomes than ``size``.
+
+    The sample is seeded from ``rng``, so it's reproducible like the rest of the search.
+
+    :param value_choices: Possible values of each parameter, in genome order.
+    :type value_choices: Sequence[Sequence[float]]
+    :param size: Number of genomes.
+    :type size: int
+    :param design: "latin_hypercube" or "sobol".
+    :type design: str
+    :param exclude: Genomes that are already in the population, e.g. the existing home.
+    :type exclude: Iterable[Sequence[float]], optional
+    :param rng: Random number generator of the search, defaults to the ``random`` module.
+    :type rng: random.Random, optional
+    :raises ValueError: If the design is unknown.
+    :return: The genomes.
+    :rtype: list[list[float]]
+    """
+    sample_rng = np.random.default_rng(rng.getrandbits(64))
+    dimensions = len(value_choices)
+    if design == "latin_hypercube":
+        sample = qmc.LatinHypercube(dimensions, rng=sample_rng).random(size)
+    elif design == "sobol":
+        # Sobol points are balanced in blocks of powers of two
+        sample = qmc.Sobol(dimensions, rng=sample_rng).random_base2(
+            max(math.ceil(math.log2(size)), 0)
+        )
+        sample = sample[:size]
+    else:
+        raise ValueError(
+            f"Unknown initial population design '{design}'. "
+            f"Must be one of {', '.join(INITIAL_POPULATION_DESIGNS)}."
+        )
+
+    # Rank the points along each dimension and split the ranks evenly between the choices,
+    # so each choice gets the same number of genomes however the points fall
+    ranks = sample.argsort(axis=0).argsort(axis=0)
+    num_genomes = math.prod(len(choices) for choices in value_choices)
+    seen = {tuple(genome) for genome in exclude}
+    genomes = []
+    duplicates = 0
+    for point_ranks in ranks:
+        genome = [
+            choices[rank * len(choices) // size]
+            for rank, choices in zip(point_ranks, value_choices)
+        ]
+        while tuple(genome) in seen and len(seen) < num_genomes:
+            genome = [rng.choice(choices) for choices in value_choices]
+        duplicates += tuple(genome) in seen
+        seen.add(tuple(genome))
+        genomes.append(genome)
+    if duplicates:
+        logger.warning(
+            f"Only {num_genomes} genomes are possible, so the initial population has "
+            f"{duplicates} duplicates"
+        )
+    return genomes
+
+
+def split_islands(population: Sequence, num_islands: int) -> list[list]:
+    """Split a population into islands of near-equal size, keeping its order.
+
+    The first ``len(population) % num_islands`` islands get one extra individual, so a
+    population that's stored island by island splits back into the same islands.
+
+    :param population: Individuals, island by island.
+    :type population: Sequence
+    :param num_islands: Number of islands.
+    :type num_islands: int
+    :return: Individuals of each island.
+    :rtype: list[list]
+    """
+    size, extra = divmod(len(population), num_islands)
+    islands = []
+    start = 0
+    for i in range(num_islands):
+        end = start + size + (i < extra)
+        islands.append(list(population[start:end]))
+        start = end
+    return islands
+
+
+def warm_start_genomes(
+    filepath: os.PathLike,
+    value_choices: Mapping[str, Sequence[float]],
+    default_values: Sequence[float],
+) -> list[list[float]]:
+    """Get the best distinct genomes of a previous calibration run, best first.
+
+    From a logbook (``logbook.json`` or ``logbook.jsonl``), these are the best individual
+    of each generation, and of each island, ranked by its fitness. From a checkpoint
+    (``checkpoint.pkl``), they are the population and hall of fame it saved.
+
+    The value choices may have changed since the previous run, so each value is replaced
+    with the nearest of the parameter's current choices or its default value, and
+    parameters the previous run didn't have get their default value.
+
+    :param filepath: Logbook or checkpoint of the previous run.
+    :type filepath: os.PathLike
+    :param value_choices: Possible values of each parameter, in genome order.
+    :type value_choices: Mapping[str, Sequence[float]]
+    :param default_values: Value of each parameter for the existing home, in genome order.
+    :type default_values: Sequence[float]
+    :raises ValueError: If the file can't be read.
+    :return: The genomes.
+    :rtype: list[list[float]]
+    """
+    filepath = Path(filepath)
+    candidates = []
+    if filepath.suffix == ".pkl":
+        state = load_checkpoint(filepath)
+        if state is None:
+            raise ValueError(f"Unable to read the checkpoint {filepath}")
+        # Checkpoints hold genomes in the same order as this version
+        for ind in [*state["hall_of_fame"], *state["pop"]]:
+            if ind.fitness.valid:
+                candidates.append((ind.fitness.values[0], dict(zip(value_choices, ind))))
+    else:
+        try:
+            if filepath.suffix == ".jsonl":
+                records = list(read_logbook(filepath))
+            else:
+                records = json.loads(filepath.read_text(encoding="utf-8"))["calibration_results"]
+        except (OSError, ValueError, KeyError) as e:
+            raise ValueError(f"Unable to read the logbook {filepath}: {e}") from e
+        for record in records:
+            for entry in [record, *record.get("islands", [])]:
+                candidates.append((entry["min"], entry["best_individual"]))
+
+    genomes = []
+    seen = set()
+    for _, parameters in sorted(candidates, key=lambda candidate: candidate[0]):
+        genome = []
+        for (name, choices), default in zip(value_choices.items(), default_values):
+            value = parameters.get(name, default)
+            genome.append(min([*choices, default], key=lambda choice: abs(choice - value)))
+        if tuple(genome) not in seen:
+            seen.add(tuple(genome))
+            genomes.append(genome)
+    return genomes
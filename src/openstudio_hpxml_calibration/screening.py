@@ -0,0 +1,119 @@
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+RUN_PERIOD_ARGUMENTS = ("sim_begin_month", "sim_begin_day", "sim_end_month", "sim_end_day")
+
+
+@dataclass(frozen=True)
+class ScreeningFidelity:
+    """Cheaper, approximate simulation settings used to rank individuals in early generations.
+
+    :param timestep: Simulation timestep (minutes), or None to keep the HPXML file's own.
+    :param run_periods: (begin month, begin day, end month, end day) of each period to
+        simulate instead of the whole year, or empty to simulate the whole year.
+    :param period_scaling: Factor by fuel type and end use that scales the total results of
+        the run periods to annual results, from ``fit_period_scaling``. End uses without a
+        factor are scaled by the fraction of the year simulated. None leaves the totals
+        unscaled.
+    """
+
+    timestep: int | None = None
+    run_periods: tuple[tuple[int, int, int, int], ...] = ()
+    period_scaling: Mapping[str, Mapping[str, float]] | None = None
+
+    @property
+    def simulated_days(self) -> int:
+        return sum(end_day - begin_day + 1 for _, begin_day, _, end_day in self.run_periods)
+
+    @staticmethod
+    def run_period_arguments(run_period: tuple[int, int, int, int]) -> dict:
+        """Get the ModifyXML arguments that restrict the simulation to a run period.
+
+        :param run_period: Begin month, begin day, end month, and end day.
+        :type run_period: tuple[int, int, int, int]
+        :return: ModifyXML argument values by name.
+        :rtype: dict
+        """
+        return dict(zip(RUN_PERIOD_ARGUMENTS, run_period))
+
+    def scale_to_annual(self, period_results: Sequence[dict]) -> dict[str, dict[str, float]]:
+        """Estimate annual results from the results of each run period.
+
+        :param period_results: Model results by fuel type and end use of each run period (MBtu).
+        :type period_results: Sequence[dict]
+        :return: Estimated annual model results by fuel type and end use (MBtu).
+        :rtype: dict[str, dict[str, float]]
+        """
+        totals = {}
+        for results in period_results:
+            for fuel_type, end_uses in results.items():
+                fuel_totals = totals.setdefault(fuel_type, {})
+                for end_use, consumption in end_uses.items():
+                    fuel_totals[end_use] = fuel_totals.get(end_use, 0) + consumption
+        if self.period_scaling is None:
+            return totals
+
+        default_scaling = 365 / self.simulated_days
+        return {
+            fuel_type: {
+                end_use: round(
+                    consumption
+                    * self.period_scaling.get(fuel_type, {}).get(end_use, default_scaling),
+                    3,
+                )
+                for end_use, consumption in end_uses.items()
+            }
+            for fuel_type, end_uses in totals.items()
+        }
+
+
+def get_run_periods(months: Sequence[int], weeks: int) -> tuple[tuple[int, int, int, int], ...]:
+    """Get run periods of several weeks at the start of each of the given months.
+
+    :param months: Months (1-12) with a representative period, e.g. one per season.
+    :type months: Sequence[int]
+    :param weeks: Number of weeks (1-4) in each period.
+    :type weeks: int
+    :return: Begin month, begin day, end month, and end day of each period.
+    :rtype: tuple[tuple[int, int, int, int], ...]
+    """
+    if not 1 <= weeks <= 4:
+        raise ValueError(f"Invalid number of weeks per run period {weeks}. Must be 1 to 4.")
+    if not months or any(not 1 <= month <= 12 for month in months):
+        raise ValueError(f"Invalid run period months {list(months)}. Must be 1 to 12.")
+    return tuple((month, 1, month, 7 * weeks) for month in sorted(set(months)))
+
+
+def fit_period_scaling(
+    annual_results: Sequence[dict], period_totals: Sequence[dict]
+) -> dict[str, dict[str, float]]:
+    """Fit the factors that scale run period totals to annual results.
+
+    Each factor is the ratio of the annual consumption of an end use to its total over
+    the run periods, pooled over individuals that were simulated both ways.
+
+    :param annual_results: Whole-year model results by fuel type and end use of each individual.
+    :type annual_results: Sequence[dict]
+    :param period_totals: Unscaled run period totals by fuel type and end use of the same
+        individuals, from ``ScreeningFidelity.scale_to_annual``.
+    :type period_totals: Sequence[dict]
+    :return: Scaling factor by fuel type and end use.
+    :rtype: dict[str, dict[str, float]]
+    """
+    annual_sums = {}
+    period_sums = {}
+    for annual, periods in zip(annual_results, period_totals):
+        for fuel_type, end_uses in annual.items():
+            for end_use, consumption in end_uses.items():
+                period_consumption = periods.get(fuel_type, {}).get(end_use, 0)
+                key = (fuel_type, end_use)
+                annual_sums[key] = annual_sums.get(key, 0) + consumption
+                period_sums[key] = period_sums.get(key, 0) + period_consumption
+
+    scaling = {}
+    for (fuel_type, end_use), period_sum in period_sums.items():
+        if period_sum > 0:
+            scaling.setdefault(fuel_type, {})[end_use] = (
+                annual_sums[(fuel_type, end_use)] / period_sum
+            )
+    return scaling
@@ -0,0 +1,170 @@
+import atexit
+import contextlib
+import functools
+import json
+import os
+import subprocess
+import threading
+from pathlib import Path
+
+from loguru import logger
+
+from openstudio_hpxml_calibration.utils import kill_process_group, subprocess_options
+
+WORKER_SCRIPT_PATH = Path(__file__).resolve().parent.parent / "workflow" / "simulation_worker.rb"
+
+
+class SimulationWorkerError(RuntimeError):
+    """Raised when the simulation worker fails to complete a job."""
+
+
+class SimulationWorker:
+    """Client for a long-lived OpenStudio process that modifies and simulates HPXML files.
+
+    The worker process loads the ModifyXML and OpenStudio-HPXML measures once and then
+    accepts jobs over a JSON-lines protocol on stdin/stdout, so only EnergyPlus itself is
+    launched for each simulation. If the worker process dies it is restarted and the job
+    is retried.
+    """
+
+    def __init__(self, command: list[str] | None = None, max_restarts: int = 1):
+        """Create a SimulationWorker. The worker process is started on first use.
+
+        :param command: Command that starts the worker process, defaults to running
+            ``simulation_worker.rb`` with the ``openstudio`` CLI.
+        :type command: list[str] | None, optional
+        :param max_restarts: Number of times to restart a crashed worker and retry a job.
+        :type max_restarts: int, optional
+        """
+        if command is None:
+            command = ["openstudio", str(WORKER_SCRIPT_PATH)]
+        self.command = command
+        self.max_restarts = max_restarts
+        self._proc: subprocess.Popen | None = None
+        self._next_id = 0
+        self._timed_out = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        """Start the worker process and wait for it to finish loading."""
+        self.close()
+        logger.debug(f"Starting simulation worker: {' '.join(self.command)}")
+        self._proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            **subprocess_options(),
+        )
+        # Skip anything OpenStudio prints before the worker script takes over stdout
+        while True:
+            with contextlib.suppress(json.JSONDecodeError):
+                if self._read_message().get("ready"):
+                    return
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        finally:
+            proc.stdout.close()
+
+    def _kill(self) -> None:
+        self._timed_out = True
+        proc = self._proc
+        if proc is not None:
+            kill_process_group(proc)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _read_message(self) -> dict:
+        line = self._proc.stdout.readline()
+        if not line:
+            raise BrokenPipeError("Simulation worker exited")
+        return json.loads(line)
+
+    def _send(self, job: dict) -> dict:
+        if not self.is_running:
+            self.start()
+        self._proc.stdin.write(json.dumps(job) + "\n")
+        self._proc.stdin.flush()
+        response = self._read_message()
+        if response.get("id") != job["id"]:
+            raise SimulationWorkerError(f"Unexpected response from simulation worker: {response}")
+        return response
+
+    def run(
+        self,
+        modify_arguments: dict,
+        output_dir: os.PathLike | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """Modify an HPXML file and optionally simulate it.
+
+        :param modify_arguments: Arguments for the ModifyXML measure.
+        :type modify_arguments: dict
+        :param output_dir: Directory to simulate the modified HPXML file in. Annual results
+            are written to ``results_annual.json`` in this directory. If not provided, the
+            HPXML file is only modified.
+        :type output_dir: os.PathLike | None, optional
+        :param timeout: Seconds to wait for the job before killing the worker, and any
+            processes it started, defaults to no limit. The worker is restarted for the next job.
+        :type timeout: float | None, optional
+        :raises SimulationWorkerError: If the job fails or the worker keeps crashing.
+        :raises subprocess.TimeoutExpired: If the job was killed for running too long.
+        """
+        self._next_id += 1
+        job = {
+            "id": self._next_id,
+            "modify_arguments": modify_arguments,
+            "output_dir": str(output_dir) if output_dir is not None else None,
+        }
+        self._timed_out = False
+        timer = threading.Timer(timeout, self._kill) if timeout is not None else None
+        if timer is not None:
+            timer.start()
+        try:
+            for attempt in range(self.max_restarts + 1):
+                try:
+                    response = self._send(job)
+                    break
+                except (BrokenPipeError, json.JSONDecodeError) as e:
+                    self.close()
+                    if self._timed_out:
+                        raise subprocess.TimeoutExpired(self.command, timeout) from e
+                    logger.warning(f"Simulation worker crashed ({e}), restarting")
+                    if attempt == self.max_restarts:
+                        raise SimulationWorkerError("Simulation worker crashed") from e
+        finally:
+            if timer is not None:
+                timer.cancel()
+        if not response["success"]:
+            raise SimulationWorkerError(response["error"])
+
+
+@functools.cache
+def get_worker() -> SimulationWorker:
+    """Get the simulation worker for this process, creating it if needed.
+
+    :return: Simulation worker that lives as long as the current process.
+    :rtype: SimulationWorker
+    """
+    worker = SimulationWorker()
+    atexit.register(worker.close)
+    return worker
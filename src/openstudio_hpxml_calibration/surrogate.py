@@ -0,0 +1,136 @@
+import math
+from collections.abc import Sequence
+
+import numpy as np
+from scipy.stats import spearmanr
+
+from openstudio_hpxml_calibration.evaluation import score_comparison
+from openstudio_hpxml_calibration.normalization_targets import (
+    NormalizationTargets,
+    compare_to_targets,
+)
+
+
+class SurrogateModel:
+    """Cheap stand-in for the simulation, used to screen out offspring that are unlikely to
+    improve on the population.
+
+    The log of each annual end use result is modeled as a sum of one effect per parameter
+    value (ridge regression on a one-hot encoding of the genome), which fits the
+    multiplicative way the parameters act on energy use. Predicted results are scored
+    against the bills exactly like simulated ones.
+
+    :param parameter_choices: Value choices of each parameter, in genome order.
+    :type parameter_choices: Sequence[Sequence[float]]
+    :param alpha: Ridge regularization strength.
+    :type alpha: float
+    """
+
+    def __init__(self, parameter_choices: Sequence[Sequence[float]], alpha: float = 1.0):
+        self.alpha = alpha
+        self._columns = []
+        offset = 0
+        for choices in parameter_choices:
+            self._columns.append({value: offset + i for i, value in enumerate(choices)})
+            offset += len(choices)
+        self._num_features = offset
+        self._outputs = []
+        self._coefficients = None
+        self._intercept = None
+
+    def _encode(self, genomes: Sequence[Sequence[float]]) -> np.ndarray:
+        features = np.zeros((len(genomes), self._num_features))
+        for row, genome in enumerate(genomes):
+            for columns, value in zip(self._columns, genome):
+                # Values that aren't among the choices (e.g. the seed individual's) get no effect
+                if value in columns:
+                    features[row, columns[value]] = 1.0
+        return features
+
+    def fit(self, genomes: Sequence[Sequence[float]], sim_results: Sequence[dict]) -> None:
+        """Fit the model to simulated individuals.
+
+        :param genomes: Parameter values of each simulated individual.
+        :type genomes: Sequence[Sequence[float]]
+        :param sim_results: Annual model results by fuel type and end use of each individual.
+        :type sim_results: Sequence[dict]
+        """
+        self._outputs = sorted(
+            {
+                (fuel_type, end_use)
+                for r in sim_results
+                for fuel_type in r
+                for end_use in r[fuel_type]
+            }
+        )
+        targets = np.log1p(
+            np.array(
+                [
+                    [
+                        max(r.get(fuel_type, {}).get(end_use, 0.0), 0.0)
+                        for fuel_type, end_use in self._outputs
+                    ]
+                    for r in sim_results
+                ]
+            )
+        )
+        features = self._encode(genomes)
+        self._intercept = targets.mean(axis=0)
+        gram = features.T @ features + self.alpha * np.eye(self._num_features)
+        self._coefficients = np.linalg.solve(gram, features.T @ (targets - self._intercept))
+
+    def predict(self, genomes: Sequence[Sequence[float]]) -> list[dict]:
+        """Predict the annual model results of individuals.
+
+        :param genomes: Parameter values of each individual.
+        :type genomes: Sequence[Sequence[float]]
+        :return: Predicted annual model results by fuel type and end use (MBtu).
+        :rtype: list[dict]
+        """
+        predicted = np.expm1(self._encode(genomes) @ self._coefficients + self._intercept)
+        results = []
+        for row in np.clip(predicted, 0.0, None):
+            result = {}
+            for (fuel_type, end_use), value in zip(self._outputs, row):
+                result.setdefault(fuel_type, {})[end_use] = float(value)
+            results.append(result)
+        return results
+
+    def predict_fitness(
+        self, genomes: Sequence[Sequence[float]], targets: NormalizationTargets
+    ) -> list[float]:
+        """Predict the fitness of individuals.
+
+        :param genomes: Parameter values of each individual.
+        :type genomes: Sequence[Sequence[float]]
+        :param targets: Normalization targets the simulation results are compared to.
+        :type targets: NormalizationTargets
+        :return: Predicted fitness of each individual, lower is better.
+        :rtype: list[float]
+        """
+        fitnesses = []
+        for result in self.predict(genomes):
+            try:
+                fitnesses.append(score_comparison(compare_to_targets(targets, result)))
+            except (KeyError, ZeroDivisionError):
+                fitnesses.append(math.inf)
+        return fitnesses
+
+
+def rank_correlation(predicted: Sequence[float], actual: Sequence[float]) -> float | None:
+    """Spearman rank correlation between predicted and simulated fitness.
+
+    Individuals whose simulation failed are left out.
+
+    :param predicted: Predicted fitness of each individual.
+    :type predicted: Sequence[float]
+    :param actual: Simulated fitness of each individual.
+    :type actual: Sequence[float]
+    :return: The rank correlation, or None if there are too few individuals to rank.
+    :rtype: float | None
+    """
+    pairs = [(p, a) for p, a in zip(predicted, actual) if math.isfinite(p) and math.isfinite(a)]
+    if len(pairs) < 3:
+        return None
+    correlation = spearmanr(*zip(*pairs)).statistic
+    return None if math.isnan(correlation) else round(float(correlation), 3)
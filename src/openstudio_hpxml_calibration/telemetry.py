@@ -0,0 +1,286 @@
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import numpy as np
+
+from openstudio_hpxml_calibration.logbook import read_logbook
+
+TIMINGS_FILENAME = "timings.jsonl"
+TRACE_FILENAME = "trace.json"
+
+
+def worker_label() -> str:
+    """Get the label of this process in timing records.
+
+    :return: ``<host>:<pid>``.
+    :rtype: str
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def genome_hash(genome: Sequence[float]) -> str:
+    """Get a short hash that identifies a genome in timing records.
+
+    :param genome: Parameter values.
+    :type genome: Sequence[float]
+    :return: First 12 hex digits of the SHA-256 of the values.
+    :rtype: str
+    """
+    return hashlib.sha256(json.dumps([float(v) for v in genome]).encode()).hexdigest()[:12]
+
+
+@dataclass
+class EvaluationTiming:
+    """Start and end times of each stage of one evaluation, or of a batch of HPXML
+    modifications, from ``time.monotonic``.
+
+    Stages are e.g. ``cache`` (looking up and storing cached results), ``modify``
+    (ModifyXML), ``simulate`` (OpenStudio-HPXML translation and EnergyPlus),
+    ``modify_and_simulate`` (both in one OpenStudio call), ``parse_results``, ``cleanup``,
+    and ``score`` (comparing the results to the bills). ``submitted`` is when the
+    calibration submitted the evaluation to the executor, so the time it waited for a
+    worker is known.
+
+    :param worker: Label of the process that did the work, from ``worker_label``.
+    :param genome_hash: Hash of the genome evaluated, from ``genome_hash``.
+    :param stages: Name, start, and end of each stage, in order.
+    :param submitted: When the evaluation was submitted, if known.
+    """
+
+    worker: str
+    genome_hash: str | None = None
+    stages: list[tuple[str, float, float]] = field(default_factory=list)
+    submitted: float | None = None
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time a stage.
+
+        :param name: Name of the stage.
+        :type name: str
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages.append((name, start, time.monotonic()))
+
+    @property
+    def start(self) -> float:
+        return self.stages[0][1]
+
+    @property
+    def end(self) -> float:
+        return self.stages[-1][2]
+
+    def shifted(self, offset: float) -> "EvaluationTiming":
+        """Get the timing with every time moved by an offset, e.g. to the clock of another
+        machine.
+
+        :param offset: Seconds to add.
+        :type offset: float
+        :return: The shifted timing.
+        :rtype: EvaluationTiming
+        """
+        return replace(
+            self,
+            stages=[(name, start + offset, end + offset) for name, start, end in self.stages],
+            submitted=None if self.submitted is None else self.submitted + offset,
+        )
+
+    def durations(self) -> dict[str, float]:
+        """Get the seconds spent in each stage. For an evaluation, the seconds it waited
+        for a worker are included as ``queue``, and the seconds from its first stage to its
+        last as ``total``.
+
+        :return: Seconds by stage name. A stage run more than once is summed.
+        :rtype: dict[str, float]
+        """
+        durations = {}
+        for name, start, end in self.stages:
+            durations[name] = durations.get(name, 0.0) + end - start
+        if self.stages and self.genome_hash is not None:
+            if self.submitted is not None:
+                durations["queue"] = max(self.start - self.submitted, 0.0)
+            durations["total"] = self.end - self.start
+        return durations
+
+
+def summarize_timings(
+    timings: Iterable[EvaluationTiming], processes: int, start: float, end: float
+) -> dict:
+    """Get the median and 95th percentile of each stage's duration, and the fraction of
+    the time the workers were busy.
+
+    :param timings: Timings of the evaluations and batches of a generation.
+    :type timings: Iterable[EvaluationTiming]
+    :param processes: Number of worker processes.
+    :type processes: int
+    :param start: When the generation started, from ``time.monotonic``.
+    :type start: float
+    :param end: When the generation ended.
+    :type end: float
+    :return: ``stages``, with the ``p50`` and ``p95`` seconds of each stage, and
+        ``pool_utilization``, the seconds workers spent on the generation's evaluations
+        between ``start`` and ``end``, divided by ``processes`` times the seconds between
+        them.
+    :rtype: dict
+    """
+    durations = {}
+    busy_time = 0.0
+    for timing in timings:
+        for name, seconds in timing.durations().items():
+            durations.setdefault(name, []).append(seconds)
+        if timing.stages:
+            # With the steady-state scheduler, evaluations may start in an earlier generation
+            busy_time += max(min(timing.end, end) - max(timing.start, start), 0.0)
+    stages = {}
+    for name, values in durations.items():
+        p50, p95 = np.percentile(values, [50, 95])
+        stages[name] = {"p50": float(p50), "p95": float(p95)}
+    utilization = busy_time / (processes * (end - start)) if processes and end > start else None
+    return {"stages": stages, "pool_utilization": utilization}
+
+
+class GenerationTimings:
+    """Collects the evaluation timings of each generation of a calibration run, and
+    appends them to the run's timings file when the generation is done.
+
+    :param timings_path: Path of the timings file, with one JSON object per line.
+    :type timings_path: os.PathLike
+    :param processes: Number of worker processes.
+    :type processes: int
+    """
+
+    def __init__(self, timings_path: os.PathLike, processes: int):
+        self.timings_path = Path(timings_path)
+        self.processes = processes
+        self._timings: list[EvaluationTiming] = []
+        self._started = time.monotonic()
+
+    def add(self, timing: EvaluationTiming | None, submitted: float | None = None) -> None:
+        """Add the timing of an evaluation or batch of the current generation.
+
+        :param timing: The timing, or None if there is none, e.g. for a cached result.
+        :type timing: EvaluationTiming | None
+        :param submitted: When the work was submitted to the executor.
+        :type submitted: float | None, optional
+        """
+        if timing is None or not timing.stages:
+            return
+        if submitted is not None:
+            timing = replace(timing, submitted=submitted)
+        self._timings.append(timing)
+
+    def finish(self, gen: int) -> dict:
+        """Write the timings of a generation to the timings file and summarize them.
+
+        :param gen: The generation.
+        :type gen: int
+        :return: Summary from ``summarize_timings``, with the generation starting when
+            the previous generation finished.
+        :rtype: dict
+        """
+        now = time.monotonic()
+        summary = summarize_timings(self._timings, self.processes, self._started, now)
+        with open(self.timings_path, "a", encoding="utf-8") as f:
+            for timing in self._timings:
+                f.write(
+                    json.dumps(
+                        {
+                            "gen": gen,
+                            "worker": timing.worker,
+                            "genome_hash": timing.genome_hash,
+                            "submitted": timing.submitted,
+                            "stages": timing.stages,
+                        }
+                    )
+                    + "\n"
+                )
+            f.flush()
+            os.fsync(f.fileno())
+        self._timings = []
+        self._started = now
+        return summary
+
+
+def write_chrome_trace(timings_path: os.PathLike, output_path: os.PathLike) -> None:
+    """Write the timings of a calibration run as a Chrome trace-event JSON file.
+
+    The file can be opened in https://ui.perfetto.dev or chrome://tracing. Each worker
+    process has a row with a span for each evaluation, holding a span for each of its
+    stages, so stragglers and idle workers stand out. A row for the calibration has a
+    span for each generation, from its first evaluation to its last.
+
+    :param timings_path: Path of the run's timings file.
+    :type timings_path: os.PathLike
+    :param output_path: Path of the trace file to write.
+    :type output_path: os.PathLike
+    """
+    records = list(read_logbook(timings_path))
+    origin = min((record["stages"][0][1] for record in records), default=0.0)
+
+    def microseconds(seconds):
+        return round((seconds - origin) * 1e6)
+
+    events = [
+        {"name": "process_name", "ph": "M", "pid": 0, "args": {"name": "Calibration"}},
+        {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "Workers"}},
+    ]
+    worker_ids = {}
+    generations = {}
+    for record in records:
+        stages = record["stages"]
+        start, end = stages[0][1], stages[-1][2]
+        tid = worker_ids.setdefault(record["worker"], len(worker_ids) + 1)
+        gen_start, gen_end = generations.get(record["gen"], (start, end))
+        generations[record["gen"]] = (min(gen_start, start), max(gen_end, end))
+        args = {"gen": record["gen"], "genome": record["genome_hash"]}
+        if record["submitted"] is not None:
+            args["queue_seconds"] = max(start - record["submitted"], 0.0)
+        events.append(
+            {
+                "name": "evaluate" if record["genome_hash"] is not None else "batch",
+                "ph": "X",
+                "pid": 1,
+                "tid": tid,
+                "ts": microseconds(start),
+                "dur": microseconds(end) - microseconds(start),
+                "args": args,
+            }
+        )
+        events.extend(
+            {
+                "name": name,
+                "ph": "X",
+                "pid": 1,
+                "tid": tid,
+                "ts": microseconds(stage_start),
+                "dur": microseconds(stage_end) - microseconds(stage_start),
+            }
+            for name, stage_start, stage_end in stages
+        )
+    events.extend(
+        {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": worker}}
+        for worker, tid in worker_ids.items()
+    )
+    events.extend(
+        {
+            "name": f"Generation {gen}",
+            "ph": "X",
+            "pid": 0,
+            "tid": 0,
+            "ts": microseconds(start),
+            "dur": microseconds(end) - microseconds(start),
+        }
+        for gen, (start, end) in generations.items()
+    )
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
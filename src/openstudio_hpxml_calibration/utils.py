@@ -1,5 +1,9 @@
+import contextlib
+import functools
 import hashlib
 import os
+import signal
+import subprocess
 import zipfile
 from pathlib import Path
 
@@ -30,6 +34,117 @@ def calculate_sha256(filepath: os.PathLike, block_size: int = 65536):
     return sha256_hash.hexdigest()
 
 
+@functools.cache
+def get_openstudio_version() -> str:
+    """Get the OpenStudio-HPXML, HPXML, OpenStudio, and EnergyPlus versions.
+
+    :return: Version output of the OpenStudio-HPXML run_simulation.rb script.
+    :rtype: str
+    """
+    resp = subprocess.run(
+        [
+            "openstudio",
+            str(OS_HPXML_PATH / "workflow" / "run_simulation.rb"),
+            "--version",
+        ],
+        capture_output=True,
+        check=True,
+    )
+    return resp.stdout.decode()
+
+
+# Start subprocesses in their own process group so they can be killed along with any
+# processes they start (e.g. EnergyPlus)
+if os.name == "nt":
+    NEW_PROCESS_GROUP = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    import resource
+
+    NEW_PROCESS_GROUP = {"start_new_session": True}
+
+# Address space limit of the subprocesses started by this process, set by
+# set_child_memory_limit
+_child_memory_limit: dict[str, int] = {}
+
+
+def set_child_memory_limit(limit: int | None) -> None:
+    """Limit the address space of each subprocess this process starts with ``run_command``
+    or a simulation worker, so a runaway simulation fails instead of exhausting the
+    machine's memory. Processes those subprocesses start (e.g. EnergyPlus) inherit the
+    limit. Not supported on Windows.
+
+    :param limit: Limit in bytes, or None for no limit.
+    :type limit: int | None
+    """
+    if limit is None:
+        _child_memory_limit.pop("current", None)
+    elif os.name == "nt":
+        logger.warning("Memory limits of simulation processes aren't supported on Windows")
+    else:
+        _child_memory_limit["current"] = limit
+
+
+def _limit_memory(limit: int) -> None:
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def subprocess_options() -> dict:
+    """Get the ``subprocess.Popen`` arguments that start a subprocess in its own process
+    group, with the memory limit set by ``set_child_memory_limit``.
+
+    :return: Keyword arguments for ``subprocess.Popen``.
+    :rtype: dict
+    """
+    if "current" in _child_memory_limit:
+        limit = _child_memory_limit["current"]
+        return {**NEW_PROCESS_GROUP, "preexec_fn": functools.partial(_limit_memory, limit)}
+    return NEW_PROCESS_GROUP
+
+
+def kill_process_group(proc: subprocess.Popen) -> None:
+    """Kill a process started with ``NEW_PROCESS_GROUP`` and all of its descendants.
+
+    :param proc: The process to kill.
+    :type proc: subprocess.Popen
+    """
+    if os.name == "nt":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(proc.pid)], check=False, capture_output=True
+        )
+    else:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+
+
+def run_command(command: list[str], timeout: float | None = None) -> subprocess.CompletedProcess:
+    """Run a command, capturing its output, and kill it if it runs too long.
+
+    Like ``subprocess.run(command, capture_output=True, check=True, timeout=timeout)``, except
+    that on timeout the processes the command started are killed too.
+
+    :param command: The command to run.
+    :type command: list[str]
+    :param timeout: Seconds to wait for the command before killing it, defaults to no limit.
+    :type timeout: float | None, optional
+    :raises subprocess.TimeoutExpired: If the command was killed for running too long.
+    :raises subprocess.CalledProcessError: If the command exited with a nonzero status.
+    :return: The completed process.
+    :rtype: subprocess.CompletedProcess
+    """
+    with subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **subprocess_options()
+    ) as proc:
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_process_group(proc)
+            proc.communicate()
+            raise
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, command, stdout, stderr)
+    return subprocess.CompletedProcess(command, proc.returncode, stdout, stderr)
+
+
 def _merge_with_defaults(user_config, default_config: dict) -> dict:
     """Merge default values into user's config"""
     if not isinstance(user_config, dict):
@@ -43,10 +158,14 @@ def _merge_with_defaults(user_config, default_config: dict) -> dict:
     return merged
 
 
-def _load_config(config_filepath: Path | None = None) -> dict:
+def _load_default_config() -> dict:
     default_config_filepath = Path(__file__).resolve().parent / "default_calibration_config.yaml"
     with open(default_config_filepath) as f:
-        default_config = yaml.safe_load(f)
+        return yaml.safe_load(f)
+
+
+def _load_config(config_filepath: Path | None = None) -> dict:
+    default_config = _load_default_config()
     if not config_filepath or not Path(config_filepath).exists():
         raise FileNotFoundError(f"Config file {config_filepath} not found.")
     else:
@@ -57,7 +57,7 @@ class InverseModel:
             return self.regression_models[fuel_type]
         except KeyError:
             bills_weather = self.bills_weather_by_fuel_type_in_btu[fuel_type]
-            fuel_types = self.hpxml.get_fuel_types()
+            fuel_types = self.hpxml.profile.fuel_types
             conditioning_fuels = fuel_types["heating"] | fuel_types["cooling"]
             model = fit_model(
                 bills_weather,
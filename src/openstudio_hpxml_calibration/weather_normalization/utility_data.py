@@ -1,4 +1,5 @@
 import datetime as dt
+import threading
 import warnings
 
 import eeweather
@@ -10,6 +11,11 @@ from lxml import objectify
 from openstudio_hpxml_calibration.hpxml import EnergyUnitType, FuelType, HpxmlDoc
 from openstudio_hpxml_calibration.units import convert_units
 
+# eeweather shares one FTP connection and opens its cache database lazily, and
+# warnings.catch_warnings changes the warning filters of the whole process, so homes
+# calibrated in threads by calibrate-batch take turns getting weather data
+_eeweather_lock = threading.Lock()
+
 
 def read_yaml_file(config_path: str):
     with open(config_path) as file:
@@ -113,7 +119,7 @@ def join_bills_weather(bills_orig: pd.DataFrame, lat: float, lon: float, **kw) -
     end_date = bills_orig["end_date"].max().tz_convert("UTC")
     rank_stations_kw = {"minimum_quality": "medium"}
     rank_stations_kw.update(kw)
-    with warnings.catch_warnings():
+    with _eeweather_lock, warnings.catch_warnings():
         ranked_stations = eeweather.rank_stations(lat, lon, **rank_stations_kw)
         isd_station, _ = eeweather.select_station(
             ranked_stations, coverage_range=(start_date, end_date)
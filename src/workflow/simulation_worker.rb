@@ -0,0 +1,87 @@
+# frozen_string_literal: true
+
+# Long-lived worker that modifies and simulates HPXML files without paying the
+# OpenStudio/Ruby startup cost (and the cost of loading every HPXMLtoOpenStudio
+# resource) for each one.
+#
+# Jobs are read from stdin and responses written to stdout, one JSON object per line:
+#
+#   {"id": 1, "modify_arguments": {...}, "output_dir": "/path/to/run"}
+#   {"id": 1, "success": true, "error": null}
+#
+# "modify_arguments" are the ModifyXML measure arguments. If "output_dir" is given, the
+# modified HPXML file is then simulated with the OpenStudio-HPXML workflow and annual
+# results are written to that directory in json format. The worker exits when stdin is closed.
+
+require 'json'
+
+# Keep the original stdout for the protocol and send everything else (measure logging,
+# workflow prints) to stderr.
+protocol_out = $stdout.dup
+protocol_out.sync = true
+$stdout.reopen($stderr)
+
+basedir = File.expand_path(File.dirname(__FILE__))
+modify_measures_dir = File.join(basedir, '..', 'measures')
+hpxml_measures_dir = File.join(basedir, '..', 'OpenStudio-HPXML')
+
+require File.join(hpxml_measures_dir, 'HPXMLtoOpenStudio', 'resources', 'meta_measure')
+
+# Load the measures (and with them every HPXMLtoOpenStudio resource) once up front
+get_measure_instance(File.join(modify_measures_dir, 'ModifyXML', 'measure.rb'))
+get_measure_instance(File.join(hpxml_measures_dir, 'HPXMLtoOpenStudio', 'measure.rb'))
+get_measure_instance(File.join(hpxml_measures_dir, 'ReportSimulationOutput', 'measure.rb'))
+
+# Apply the ModifyXML measure.
+#
+# @param measures_dir [String] Parent directory of the ModifyXML measure
+# @param arguments [Hash] Map of ModifyXML argument names to values
+# @return [String, nil] Error message, or nil if the measure was applied successfully
+def modify_xml(measures_dir, arguments)
+  model = OpenStudio::Model::Model.new
+  runner = OpenStudio::Measure::OSRunner.new(OpenStudio::WorkflowJSON.new)
+  return if apply_measures(measures_dir, { 'ModifyXML' => [arguments] }, runner, model, false)
+
+  errors = runner.result.stepErrors.map(&:to_s)
+  return "ModifyXML failed: #{errors.join('; ')}"
+end
+
+# Simulate an HPXML file, mirroring OpenStudio-HPXML's run_simulation.rb for annual json results.
+#
+# @param measures_dir [String] Parent directory of the OpenStudio-HPXML measures
+# @param hpxml_path [String] Path to the HPXML file
+# @param rundir [String] Directory to run the simulation in and write results to
+# @return [String, nil] Error message, or nil if the simulation was successful
+def run_sim(measures_dir, hpxml_path, rundir)
+  measures = {
+    'HPXMLtoOpenStudio' => [{ 'hpxml_path' => hpxml_path,
+                              'output_dir' => rundir,
+                              'output_format' => 'json',
+                              'skip_validation' => true,
+                              'debug' => false }],
+    'ReportSimulationOutput' => [{ 'output_format' => 'json',
+                                   'timeseries_frequency' => 'none' }]
+  }
+  results = run_hpxml_workflow(rundir, measures, measures_dir, suppress_print: true)
+  return if results[:success]
+
+  return "Simulation failed. See #{File.join(rundir, 'run.log')} for details."
+end
+
+protocol_out.puts({ ready: true }.to_json)
+
+$stdin.each_line do |line|
+  next if line.strip.empty?
+
+  job = JSON.parse(line)
+  begin
+    arguments = job['modify_arguments']
+    error = modify_xml(modify_measures_dir, arguments)
+    if error.nil? && job['output_dir']
+      error = run_sim(hpxml_measures_dir, arguments['save_file_path'], File.absolute_path(job['output_dir']))
+    end
+  rescue StandardError => e
+    error = "#{e.class}: #{e.message}"
+  end
+  protocol_out.puts({ id: job['id'], success: error.nil?, error: error }.to_json)
+end
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from openstudio_hpxml_calibration.archive import EvaluationArchive, EvaluationResult
+from openstudio_hpxml_calibration.utils import calculate_sha256
+
+
+def test_archive_looks_up_by_genome_and_xml_hash():
+    archive = EvaluationArchive()
+    result = EvaluationResult(
+        fitness=(1.5,),
+        comparison={"electricity": {"Bias Error": {}, "Absolute Error": {}}},
+        temp_output_dir=Path("calib_test_abc123"),
+        sim_results={"electricity": {"baseload": 20.0}},
+        xml_hash="abc",
+    )
+    archive.add([1, 0, 0, 1.5], result)
+
+    assert len(archive) == 1
+    assert [1, 0, 0, 1.5] in archive
+    assert archive.get((1, 0, 0, 1.5)) is result
+    assert archive.get([1, 0, 0, 2]) is None
+    assert archive.get_by_xml_hash("abc") is result
+    assert archive.results_by_xml_hash["abc"] is result
+
+
+def test_archive_skips_failed_evaluations():
+    archive = EvaluationArchive()
+    archive.add([1, 0, 0, 1], EvaluationResult(fitness=(float("inf"),)))
+    assert len(archive) == 0
+    assert archive.get([1, 0, 0, 1]) is None
+
+
+def test_xml_hash_matches_identical_contents(tmp_path):
+    first = tmp_path / "first.xml"
+    second = tmp_path / "second.xml"
+    first.write_text("<HPXML/>")
+    second.write_text("<HPXML/>")
+    assert calculate_sha256(first) == calculate_sha256(second)
+    second.write_text("<HPXML></HPXML>")
+    assert calculate_sha256(first) != calculate_sha256(second)
@@ -0,0 +1,88 @@
+import operator
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import openstudio_hpxml_calibration.weather_normalization.utility_data as ud
+from openstudio_hpxml_calibration.batch import SharedPool, load_batch_homes
+
+
+def test_load_batch_homes(tmp_path):
+    for name in ("house1", "house2"):
+        (tmp_path / f"{name}.xml").write_text("<HPXML/>")
+    (tmp_path / "house2.yaml").write_text("genetic_algorithm: {}")
+    (tmp_path / "house2.csv").write_text("")
+
+    homes = load_batch_homes(tmp_path, tmp_path / "default.yaml")
+    assert [home.name for home in homes] == ["house1", "house2"]
+    assert homes[0].config_filepath == tmp_path / "default.yaml"
+    assert homes[0].csv_bills_filepath is None
+    assert homes[1].config_filepath == tmp_path / "house2.yaml"
+    assert homes[1].csv_bills_filepath == tmp_path / "house2.csv"
+
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(
+        "homes:\n"
+        "  - hpxml_filepath: house1.xml\n"
+        "  - hpxml_filepath: other/house1.xml\n"
+        "    config_filepath: house2.yaml\n"
+    )
+    with pytest.raises(ValueError, match="duplicates"):
+        load_batch_homes(manifest)
+    manifest.write_text("homes:\n  - config_filepath: house2.yaml\n")
+    with pytest.raises(ValueError, match="missing hpxml_filepath"):
+        load_batch_homes(manifest)
+
+
+def test_shared_pool_takes_turns_between_searches():
+    with SharedPool(1) as pool:
+        first = pool.client()
+        second = pool.client()
+        assert first.map(operator.mul, [1, 2, 3], [4, 5, 6]) == [4, 10, 18]
+
+        # The second search's task runs as soon as the first search's running task is done,
+        # ahead of the rest of the first search's queued tasks
+        first_results = [first.apipe(time.sleep, 0.2) for _ in range(5)]
+        second_result = second.apipe(operator.add, 1, 2)
+        assert second_result.get(timeout=10) == 3
+        assert not first_results[-1].ready()
+        for result in first_results:
+            result.get(timeout=10)
+
+        with pytest.raises(ZeroDivisionError):
+            second.apipe(operator.truediv, 1, 0).get(timeout=10)
+
+
+def test_homes_take_turns_getting_weather_data(monkeypatch):
+    running = []
+    overlapped = threading.Event()
+
+    class Station:
+        def load_isd_hourly_temp_data(self, start_date, end_date):
+            if running:
+                overlapped.set()
+            running.append(self)
+            time.sleep(0.05)
+            running.remove(self)
+            index = pd.date_range(start_date, end_date, freq="h")
+            return pd.Series(10.0, index=index), None
+
+    monkeypatch.setattr(ud.eeweather, "rank_stations", lambda *_, **__: None)
+    monkeypatch.setattr(ud.eeweather, "select_station", lambda *_, **__: (Station(), None))
+    bills = pd.DataFrame(
+        {
+            "start_date": pd.to_datetime(["2023-01-01", "2023-02-01"]).tz_localize("Etc/GMT+7"),
+            "end_date": pd.to_datetime(["2023-02-01", "2023-03-01"]).tz_localize("Etc/GMT+7"),
+            "consumption": [310.0, 280.0],
+        }
+    )
+
+    # calibrate-batch calibrates homes in threads, and eeweather isn't thread safe
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda _: ud.join_bills_weather(bills, 40, -105), range(4)))
+    assert not overlapped.is_set()
+    for bills_weather, _ in results:
+        assert bills_weather["avg_temp"].tolist() == pytest.approx([50.0, 50.0])
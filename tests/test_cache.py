@@ -0,0 +1,71 @@
+import os
+import time
+
+from openstudio_hpxml_calibration.cache import SimulationCache
+
+MODEL_RESULTS = {"electricity": {"baseload": 20.5, "cooling": 3.25}, "natural gas": {}}
+
+
+def test_cache_key_covers_simulation_inputs():
+    genome = {"misc_load_multiplier": 1, "heating_setpoint_offset": -2}
+    key = SimulationCache.make_key("abc", genome, "v1", {"output_format": "json"})
+    assert key == SimulationCache.make_key(
+        "abc", dict(reversed(genome.items())), "v1", {"output_format": "json"}
+    )
+    assert key == SimulationCache.make_key(
+        "abc",
+        {"misc_load_multiplier": 1.0, "heating_setpoint_offset": -2.0},
+        "v1",
+        {"output_format": "json"},
+    )
+    assert key != SimulationCache.make_key("abd", genome, "v1", {"output_format": "json"})
+    assert key != SimulationCache.make_key(
+        "abc", {**genome, "misc_load_multiplier": 2}, "v1", {"output_format": "json"}
+    )
+    assert key != SimulationCache.make_key("abc", genome, "v2", {"output_format": "json"})
+    assert key != SimulationCache.make_key("abc", genome, "v1", {"output_format": "csv"})
+
+
+def test_cache_round_trip(tmp_path):
+    cache = SimulationCache(tmp_path / "cache")
+    hpxml_path = tmp_path / "modified.xml"
+    hpxml_path.write_text("<HPXML/>")
+    key = SimulationCache.make_key("abc", {"misc_load_multiplier": 1}, "v1", {})
+
+    assert cache.get(key) is None
+    cache.put(key, MODEL_RESULTS, hpxml_path)
+    entry = cache.get(key)
+    assert entry["model_results"] == MODEL_RESULTS
+    assert entry["hpxml"] == "<HPXML/>"
+    assert cache.stats()["entries"] == 1
+
+
+def test_cache_prune_evicts_least_recently_used(tmp_path):
+    cache = SimulationCache(tmp_path / "cache")
+    hpxml_path = tmp_path / "modified.xml"
+    hpxml_path.write_text("<HPXML/>" * 1000)
+    keys = [
+        SimulationCache.make_key("abc", {"misc_load_multiplier": i}, "v1", {}) for i in range(3)
+    ]
+    for age_days, key in zip([3, 2, 1], keys):
+        cache.put(key, MODEL_RESULTS, hpxml_path)
+        mtime = time.time() - age_days * 86400
+        os.utime(cache._entry_path(key), (mtime, mtime))
+
+    # Reading an entry makes it the most recently used
+    assert cache.get(keys[0]) is not None
+
+    assert cache.prune(max_age_days=1.5) == 1
+    assert cache.get(keys[1]) is None
+
+    entry_size_mb = cache._entry_path(keys[0]).stat().st_size / 1e6
+    assert cache.prune(max_size_mb=entry_size_mb * 1.5) == 1
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is None
+
+    # Without limits, the cache is pruned to the default cache_max_size_mb
+    assert cache.prune() == 0
+    assert cache.get(keys[0]) is not None
+
+    assert cache.clear() == 1
+    assert cache.stats()["entries"] == 0
@@ -146,6 +146,36 @@ def test_add_bills(test_data):
     )
 
 
+def test_create_combined_measure_input_file(test_data, tmp_path):
+    cal = Calibrate(
+        original_hpxml_filepath=test_data["sample_xml_file"], config_filepath=TEST_CONFIG
+    )
+    arguments = {
+        "xml_file_path": test_data["sample_xml_file"],
+        "save_file_path": str(tmp_path / "modified.xml"),
+        "misc_load_multiplier": 1.5,
+    }
+    osw_path = tmp_path / "modify_hpxml.osw"
+    cal.create_measure_input_file(arguments, osw_path, simulation_output_dir=tmp_path / "run")
+    osw = json.loads(osw_path.read_text())
+
+    assert [step["measure_dir_name"] for step in osw["steps"]] == [
+        "ModifyXML",
+        "HPXMLtoOpenStudio",
+        "ReportSimulationOutput",
+    ]
+    # The simulation reads the HPXML file written by ModifyXML
+    assert osw["steps"][1]["arguments"]["hpxml_path"] == arguments["save_file_path"]
+    assert osw["steps"][1]["arguments"]["output_dir"] == str(tmp_path / "run")
+    assert osw["run_directory"] == str(tmp_path / "run")
+    assert osw["run_options"] == {
+        "fast": True,
+        "skip_expand_objects": True,
+        "skip_energyplus_preprocess": True,
+    }
+    assert all(Path(measure_path).is_dir() for measure_path in osw["measure_paths"])
+
+
 @pytest.mark.parametrize("filename", invalid_hpxmls, ids=lambda x: x.stem)
 def test_hpxml_invalid(filename):
     if filename.stem in ("invalid_hpxml_xsd", "invalid_oshpxml_sch"):
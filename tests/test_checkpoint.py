@@ -0,0 +1,84 @@
+import random
+import shutil
+from types import MappingProxyType
+
+import pytest
+
+from openstudio_hpxml_calibration.archive import EvaluationArchive, EvaluationResult
+from openstudio_hpxml_calibration.calibrate import creator
+from openstudio_hpxml_calibration.checkpoint import (
+    checkpoint_due,
+    load_checkpoint,
+    load_search_checkpoint,
+    save_checkpoint,
+    save_search_checkpoint,
+)
+
+
+def test_checkpoint_round_trip(tmp_path):
+    archive = EvaluationArchive()
+    archive.add([1, 0, 2], EvaluationResult(fitness=(3.0,), sim_results={}, xml_hash="abc"))
+    random_state = random.getstate()
+    checkpoint_path = tmp_path / "checkpoint.pkl"
+
+    save_checkpoint(
+        checkpoint_path,
+        {
+            "gen": 3,
+            "archive": archive,
+            "targets": MappingProxyType({"electricity": 1.0}),
+            "random_state": random_state,
+        },
+    )
+    state = load_checkpoint(checkpoint_path)
+    assert state["targets"]["electricity"] == 1.0
+    assert state["random_state"] == random_state
+
+    save_checkpoint(checkpoint_path, {"gen": 4, "archive": archive})
+
+    # The checkpoint is replaced in place, without leaving temporary files behind
+    assert [p.name for p in tmp_path.iterdir()] == ["checkpoint.pkl"]
+    state = load_checkpoint(checkpoint_path)
+    assert state["gen"] == 4
+    assert state["archive"].get((1, 0, 2)).fitness == (3.0,)
+
+
+def test_missing_or_corrupt_checkpoint(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.pkl"
+    assert load_checkpoint(checkpoint_path) is None
+
+    checkpoint_path.write_bytes(b"\x80\x05truncated")
+    assert load_checkpoint(checkpoint_path) is None
+
+
+def test_checkpoint_due():
+    assert not checkpoint_due(2, 0, 10, False)
+    assert [gen for gen in range(11) if checkpoint_due(gen, 3, 10, False)] == [0, 3, 6, 9, 10]
+    assert checkpoint_due(5, 3, 10, True)
+
+
+def test_search_checkpoint_restores_best_hpxml(tmp_path):
+    best = creator.Individual([1, 0])
+    best.temp_output_dir = tmp_path / "calib_test_best"
+    best.temp_output_dir.mkdir()
+    (best.temp_output_dir / "modified.xml").write_text("<HPXML/>")
+    checkpoint_path = tmp_path / "output" / "checkpoint.pkl"
+    fingerprint = {"hpxml": "abc", "population_size": 4}
+
+    save_search_checkpoint(
+        checkpoint_path, fingerprint, 2, False, {"hall_of_fame": [best], "all_temp_dirs": set()}
+    )
+    state = load_search_checkpoint(checkpoint_path, fingerprint, tmp_path)
+    assert state["gen"] == 2
+    assert state["hall_of_fame"][0].temp_output_dir == best.temp_output_dir
+
+    # The temp dir didn't survive whatever interrupted the run
+    shutil.rmtree(best.temp_output_dir)
+    state = load_search_checkpoint(checkpoint_path, fingerprint, tmp_path)
+    restored = state["hall_of_fame"][0].temp_output_dir
+    assert restored != best.temp_output_dir
+    assert state["all_temp_dirs"] == {restored}
+    assert (restored / "modified.xml").read_text() == "<HPXML/>"
+
+    with pytest.raises(ValueError, match="different home"):
+        load_search_checkpoint(checkpoint_path, {**fingerprint, "population_size": 8})
@@ -0,0 +1,130 @@
+import subprocess
+import sys
+import textwrap
+from types import SimpleNamespace
+
+import pytest
+
+from openstudio_hpxml_calibration import concurrency
+from openstudio_hpxml_calibration.concurrency import (
+    ConcurrencyController,
+    PeakMemorySampler,
+    map_with_limit,
+)
+from openstudio_hpxml_calibration.simulation_worker import SimulationWorker
+from openstudio_hpxml_calibration.utils import run_command, set_child_memory_limit
+
+GB = 1024**3
+
+
+def test_concurrency_follows_load_and_memory(monkeypatch):
+    machine = {"load": 2.0, "available": 16 * GB}
+    monkeypatch.setattr(concurrency, "load_average", lambda: machine["load"])
+    monkeypatch.setattr(concurrency, "available_memory", lambda: machine["available"])
+    controller = ConcurrencyController(1, 8, memory_reserve=2 * GB, max_load=8, update_interval=0)
+
+    # Grows one at a time while the load is low
+    assert [controller.limit(0) for _ in range(3)] == [2, 3, 4]
+
+    # Holds near the maximum load, then shrinks above it
+    machine["load"] = 7.5
+    assert controller.limit(4) == 4
+    machine["load"] = 9.0
+    assert controller.limit(4) == 3
+
+    # Room for as many more simulations as fit in the free memory at their peak RSS
+    machine["load"] = 2.0
+    controller.record(4 * GB)
+    controller.record(None)
+    assert controller.peak_rss == 4 * GB
+    machine["available"] = 10 * GB
+    assert controller.limit(1) == 3
+    machine["available"] = 1 * GB
+    assert controller.limit(3) == 2
+
+    # Never beyond the bounds
+    machine["available"] = 100 * GB
+    assert max(controller.limit(0) for _ in range(20)) == 8
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def apipe(self, func, *args):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        executor = self
+
+        class Result:
+            def ready(self):
+                return True
+
+            def get(self):
+                executor.in_flight -= 1
+                return func(*args)
+
+        return Result()
+
+
+def test_map_with_limit_keeps_order_and_records_peak_rss(monkeypatch):
+    monkeypatch.setattr(concurrency, "load_average", lambda: None)
+    monkeypatch.setattr(concurrency, "available_memory", lambda: None)
+    controller = ConcurrencyController(2, 4, memory_reserve=0, update_interval=60)
+    executor = FakeExecutor()
+
+    results = map_with_limit(
+        executor,
+        controller,
+        lambda x, y: SimpleNamespace(value=x + y, peak_rss=x),
+        [1, 2, 3],
+        [10, 20, 30],
+    )
+    assert [result.value for result in results] == [11, 22, 33]
+    assert executor.max_in_flight == 3
+    assert controller.peak_rss == 3
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Memory limits are only enforced on Linux")
+def test_child_memory_limit():
+    allocate = [sys.executable, "-c", "bytearray(512 * 1024**2)"]
+    set_child_memory_limit(256 * 1024**2)
+    try:
+        with pytest.raises(subprocess.CalledProcessError):
+            run_command(allocate)
+    finally:
+        set_child_memory_limit(None)
+    run_command(allocate)
+
+
+# Stands in for simulation_worker.rb: holds "size" MB of memory for a moment on each job
+FAKE_WORKER = textwrap.dedent(
+    """
+    import json, sys, time
+
+    print(json.dumps({"ready": True}), flush=True)
+    for line in sys.stdin:
+        job = json.loads(line)
+        memory = bytearray(job["modify_arguments"]["size"] * 1024**2)
+        time.sleep(1)
+        del memory
+        print(json.dumps({"id": job["id"], "success": True, "error": None}), flush=True)
+    """
+)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Memory is only sampled on Linux")
+def test_peak_memory_of_each_simulation_in_worker_mode(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    with SimulationWorker(command=[sys.executable, str(script)]) as worker:
+        worker.start()
+        with PeakMemorySampler(interval=0.05) as memory:
+            worker.run({"size": 300})
+        assert memory.peak >= 300 * 1024**2
+
+        # The long-lived worker's lifetime peak isn't mistaken for the next simulation's
+        with PeakMemorySampler(interval=0.05) as memory:
+            worker.run({"size": 0})
+        assert memory.peak < 300 * 1024**2
@@ -0,0 +1,165 @@
+import time
+from dataclasses import replace
+from pathlib import Path
+from types import MappingProxyType
+
+import dill
+import pytest
+
+from openstudio_hpxml_calibration import evaluation
+from openstudio_hpxml_calibration.cache import SimulationCache
+from openstudio_hpxml_calibration.enums import EvaluationStatus
+from openstudio_hpxml_calibration.evaluation import (
+    EvaluationContext,
+    evaluate,
+    get_evaluation_context,
+    get_simulation_timeout,
+    make_temp_output_dir,
+    remove_simulation_files,
+    score_comparison,
+    set_evaluation_context,
+)
+from openstudio_hpxml_calibration.hpxml import HpxmlDoc
+from openstudio_hpxml_calibration.normalization_targets import NormalizationTargets
+
+MODEL_RESULTS = {"electricity": {"cooling": 10.0, "baseload": 44.0}}
+TEST_HPXML = Path(__file__).resolve().parent.parent / "test_hpxmls" / "ihmh_homes" / "ihmh4.xml"
+
+
+@pytest.fixture
+def context(tmp_path):
+    (tmp_path / "home.xml").write_text("<HPXML/>")
+    context = EvaluationContext(
+        hpxml_filepath=tmp_path / "home.xml",
+        parameter_names=("misc_load_multiplier", "heating_setpoint_offset"),
+        normalization_targets=NormalizationTargets(
+            fuels=("electricity",),
+            detailed=MappingProxyType({"electricity": {"cooling": 10.0, "baseload": 40.0}}),
+            delivered=MappingProxyType({}),
+        ),
+        heats_with_electricity=False,
+        bias_error_threshold=5,
+        abs_error_elec_threshold=500,
+        abs_error_fuel_threshold=5,
+        simulation_cache=SimulationCache(tmp_path / "cache"),
+        cache_key_fields=("abc", "v1", {"output_format": "json"}),
+    )
+    set_evaluation_context(context)
+    yield context
+    set_evaluation_context(None)
+
+
+def test_evaluate_requires_context():
+    with pytest.raises(RuntimeError, match="No evaluation context"):
+        get_evaluation_context()
+
+
+def test_context_is_picklable(context):
+    # The pool sends the context to its workers with dill
+    restored = dill.loads(dill.dumps(context))  # noqa: S301
+    assert restored.cache_key((1, 0)) == context.cache_key((1, 0))
+
+
+def test_screening_timestep_is_a_modify_xml_argument(context):
+    assert context.genome_arguments((1.5, 2)) == {
+        "misc_load_multiplier": 1.5,
+        "heating_setpoint_offset": 2,
+    }
+    assert context.genome_arguments((1.5, 2), timestep=60)["timestep"] == 60
+    # Screening results are never mistaken for full-fidelity ones
+    assert context.cache_key((1.5, 2), timestep=60) != context.cache_key((1.5, 2))
+
+
+def test_evaluate_uses_installed_context(context, tmp_path):
+    modified_hpxml = tmp_path / "modified.xml"
+    modified_hpxml.write_text("<HPXML><!-- modified --></HPXML>")
+    context.simulation_cache.put(context.cache_key((1.1, 0)), MODEL_RESULTS, modified_hpxml)
+
+    temp_output_dir = tmp_path / "ind"
+    temp_output_dir.mkdir()
+    result = evaluate((1.1, 0), temp_output_dir)
+    assert result.from_cache
+    assert result.sim_results == MODEL_RESULTS
+    assert (temp_output_dir / "modified.xml").read_text() == modified_hpxml.read_text()
+    assert result.comparison["electricity"]["Bias Error"] == {"cooling": 0.0, "baseload": -10.0}
+    assert result.fitness == (pytest.approx(score_comparison(result.comparison)),)
+    assert result.fitness[0] > 0
+    assert [name for name, _, _ in result.timing.stages] == ["cache", "cleanup", "score"]
+
+
+def test_evaluate_marks_stragglers_without_killing_them(context, tmp_path, monkeypatch):
+    def slow_modify_and_simulate(context, arguments, temp_output_dir, remaining_time, timing):
+        time.sleep(0.3)
+        Path(arguments["save_file_path"]).write_text("<HPXML/>")
+        return MODEL_RESULTS
+
+    monkeypatch.setattr(evaluation, "_modify_and_simulate", slow_modify_and_simulate)
+    set_evaluation_context(replace(context, simulation_cache=None))
+
+    result = evaluate((1.1, 0), make_temp_output_dir(tmp_path), 10, soft_timeout=0.1)
+    assert result.status == EvaluationStatus.SUCCESS
+    assert result.straggler
+    assert result.sim_results == MODEL_RESULTS
+    assert not evaluate((1.1, 0), make_temp_output_dir(tmp_path), 10, soft_timeout=10).straggler
+
+
+def test_execution_modes_give_identical_results(context, tmp_path):
+    # Simulates the same genome with OpenStudio in each mode: ModifyXML and run_simulation.rb
+    # separately, one OSW with the combined fast run options, and the long-lived worker
+    context = replace(
+        context,
+        hpxml_filepath=TEST_HPXML,
+        heats_with_electricity=HpxmlDoc(TEST_HPXML).profile.heats_with_electricity,
+        simulation_cache=None,
+    )
+    genome = (1.1, 1)
+    results = {}
+    for execution_mode in ("separate", "combined", "worker"):
+        set_evaluation_context(replace(context, execution_mode=execution_mode))
+        result = evaluate(genome, make_temp_output_dir(tmp_path))
+        assert result.status == EvaluationStatus.SUCCESS, execution_mode
+        results[execution_mode] = result
+
+    assert results["combined"].sim_results == results["separate"].sim_results
+    assert results["worker"].sim_results == results["separate"].sim_results
+    assert results["combined"].xml_hash == results["separate"].xml_hash
+    assert results["worker"].xml_hash == results["separate"].xml_hash
+    assert len({result.fitness for result in results.values()}) == 1
+
+
+def test_remove_simulation_files_keeps_hpxml_and_annual_results(tmp_path):
+    temp_output_dir = make_temp_output_dir(tmp_path)
+    assert temp_output_dir.parent == tmp_path
+    (temp_output_dir / "modified.xml").write_text("<HPXML/>")
+    (temp_output_dir / "modify_hpxml.osw").write_text("{}")
+    (temp_output_dir / "period_0" / "run").mkdir(parents=True)
+    (temp_output_dir / "period_0" / "modified.xml").write_text("<HPXML/>")
+    (temp_output_dir / "period_0" / "run" / "eplusout.sql").write_text("")
+    run_dir = temp_output_dir / "run"
+    run_dir.mkdir()
+    (run_dir / "results_annual.json").write_text("{}")
+    (run_dir / "eplusout.sql").write_text("")
+    (run_dir / "run").mkdir()
+
+    remove_simulation_files(temp_output_dir)
+    assert sorted(
+        p.relative_to(temp_output_dir).as_posix() for p in temp_output_dir.rglob("*")
+    ) == [
+        "modified.xml",
+        "period_0",
+        "period_0/modified.xml",
+        "period_0/run",
+        "run",
+        "run/results_annual.json",
+    ]
+
+
+def test_simulation_timeout_adapts_to_median():
+    assert get_simulation_timeout([], 3600, 5) == 3600
+    assert get_simulation_timeout([100] * 4, 3600, 5) == 3600
+    assert get_simulation_timeout([100, 100, 120, 90, 5000], 3600, 5) == 500
+    assert get_simulation_timeout([100] * 5, 300, 5) == 300
+    assert get_simulation_timeout([100] * 5, None, 5) == 500
+    assert get_simulation_timeout([100] * 5, 3600, 0) == 3600
+    # Never shorter than a minute, however fast simulations have been
+    assert get_simulation_timeout([1] * 5, 3600, 5) == 60
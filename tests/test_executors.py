@@ -0,0 +1,89 @@
+import threading
+from types import MappingProxyType
+
+import pytest
+
+from openstudio_hpxml_calibration.cache import SimulationCache
+from openstudio_hpxml_calibration.evaluation import EvaluationContext, evaluate
+from openstudio_hpxml_calibration.executors import (
+    SocketExecutor,
+    parse_address,
+    run_agent_session,
+)
+from openstudio_hpxml_calibration.normalization_targets import NormalizationTargets
+
+AUTHKEY = b"test-key"
+
+
+@pytest.fixture
+def context(tmp_path):
+    (tmp_path / "home.xml").write_text("<HPXML/>")
+    return EvaluationContext(
+        hpxml_filepath=tmp_path / "home.xml",
+        parameter_names=("misc_load_multiplier",),
+        normalization_targets=NormalizationTargets(
+            fuels=("electricity",),
+            detailed=MappingProxyType({"electricity": {"baseload": 40.0}}),
+            delivered=MappingProxyType({}),
+        ),
+        heats_with_electricity=False,
+        bias_error_threshold=5,
+        abs_error_elec_threshold=500,
+        abs_error_fuel_threshold=5,
+        simulation_cache=SimulationCache(tmp_path / "cache"),
+        cache_key_fields=("abc", "v1", {"output_format": "json"}),
+    )
+
+
+def test_agents_evaluate_genomes(context, tmp_path):
+    # Simulations aren't available here, so the agents find every result in their cache
+    agent_cache = SimulationCache(tmp_path / "agent_cache")
+    for multiplier in (1, 2, 3, 4):
+        modified_hpxml = tmp_path / "modified.xml"
+        modified_hpxml.write_text(f"<HPXML><!-- {multiplier} --></HPXML>")
+        agent_cache.put(
+            context.cache_key((multiplier,)),
+            {"electricity": {"baseload": 10.0 * multiplier}},
+            modified_hpxml,
+        )
+
+    with SocketExecutor(("127.0.0.1", 0), AUTHKEY, context, processes=2) as executor:
+        agents = [
+            threading.Thread(
+                target=run_agent_session,
+                args=(executor.address, AUTHKEY, agent_cache.cache_dir),
+            )
+            for _ in range(2)
+        ]
+        for agent in agents:
+            agent.start()
+
+        temp_output_dirs = [tmp_path / f"ind_{i}" for i in range(4)]
+        results = executor.map(evaluate, [(1,), (2,), (3,), (4,)], temp_output_dirs)
+        assert [r.sim_results["electricity"]["baseload"] for r in results] == [10, 20, 30, 40]
+        assert all(r.from_cache for r in results)
+        # The modified HPXML files are copied back to this machine
+        assert [r.temp_output_dir for r in results] == temp_output_dirs
+        assert (temp_output_dirs[2] / "modified.xml").read_text() == "<HPXML><!-- 3 --></HPXML>"
+
+        with pytest.raises(TypeError):
+            executor.apipe(print, "not an evaluation")
+
+    for agent in agents:
+        agent.join(timeout=10)
+        assert not agent.is_alive()
+
+
+def test_tasks_fail_when_no_agent_connects(context):
+    with SocketExecutor(("127.0.0.1", 0), AUTHKEY, context, agent_connect_timeout=0.2) as executor:
+        result = executor.apipe(evaluate, (1,))
+        with pytest.raises(RuntimeError, match="No simulation agent"):
+            result.get(timeout=10)
+        with pytest.raises(RuntimeError, match="No simulation agent"):
+            executor.map(evaluate, [(2,), (3,)])
+
+
+def test_parse_address():
+    assert parse_address("sim-host.local:5757") == ("sim-host.local", 5757)
+    with pytest.raises(ValueError, match="host:port"):
+        parse_address("localhost")
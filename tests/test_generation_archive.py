@@ -0,0 +1,86 @@
+import zipfile
+
+import pytest
+
+from openstudio_hpxml_calibration.generation_archive import (
+    GenerationArchive,
+    append_generation,
+    discard_generations_after,
+)
+
+
+def write_individuals(tmp_path, gen, num):
+    individuals = []
+    for i in range(num):
+        hpxml_filepath = tmp_path / f"gen{gen}_ind{i}" / "modified.xml"
+        hpxml_filepath.parent.mkdir()
+        hpxml_filepath.write_text(f"<HPXML><!-- gen {gen} ind {i} --></HPXML>")
+        individuals.append(
+            {
+                "hpxml_filepath": hpxml_filepath,
+                "parameters": {"misc_load_multiplier": 1 + i / 10},
+                "fitness": 10.0 - i,
+                "sim_results": {"electricity": {"cooling": float(i)}} if i == 0 else None,
+            }
+        )
+    return individuals
+
+
+def test_generation_archive_round_trip(tmp_path):
+    archive_path = tmp_path / "out" / "generations.zip"
+    individuals = write_individuals(tmp_path, 0, 3)
+    # Individuals whose temp dir has already been removed are skipped
+    individuals.append({**individuals[0], "hpxml_filepath": tmp_path / "missing.xml"})
+    assert append_generation(archive_path, 0, individuals) == 3
+    assert append_generation(archive_path, 1, write_individuals(tmp_path, 1, 2)) == 2
+
+    with GenerationArchive(archive_path) as archive:
+        assert archive.generations == [0, 1]
+        index = archive.individuals(0)
+        assert [entry["individual"] for entry in index] == ["ind_0", "ind_1", "ind_2"]
+        assert index[1]["parameters"] == {"misc_load_multiplier": 1.1}
+        assert index[1]["fitness"] == 9.0
+        assert archive.read_hpxml(1, "ind_1") == "<HPXML><!-- gen 1 ind 1 --></HPXML>"
+        assert archive.read_results(0, "ind_0") == {"electricity": {"cooling": 0.0}}
+        assert archive.read_results(0, "ind_1") is None
+
+        extracted = archive.extract_hpxml(0, "ind_2", tmp_path / "extracted" / "ind.xml")
+        assert extracted.read_text() == "<HPXML><!-- gen 0 ind 2 --></HPXML>"
+        with pytest.raises(KeyError):
+            archive.read_hpxml(2, "ind_0")
+
+
+def test_individual_back_in_population_after_its_temp_dir_was_removed(tmp_path):
+    archive_path = tmp_path / "generations.zip"
+    archived_hpxml = {}
+    individuals = write_individuals(tmp_path, 0, 2)
+    assert append_generation(archive_path, 0, individuals, archived_hpxml) == 2
+
+    # The individual leaves the population and its temp dir is removed, then it's bred
+    # again and its results come from the archive, with the temp dir it had
+    individuals[1]["hpxml_filepath"].unlink()
+    assert append_generation(archive_path, 1, write_individuals(tmp_path, 1, 1), archived_hpxml)
+    assert append_generation(archive_path, 2, [individuals[1]], archived_hpxml) == 1
+
+    with GenerationArchive(archive_path) as archive:
+        assert archive.generations == [0, 1, 2]
+        assert archive.individuals(2)[0]["parameters"] == {"misc_load_multiplier": 1.1}
+        assert archive.read_hpxml(2, "ind_0") == "<HPXML><!-- gen 0 ind 1 --></HPXML>"
+
+
+def test_discard_generations_after(tmp_path):
+    archive_path = tmp_path / "generations.zip"
+    for gen in range(3):
+        append_generation(archive_path, gen, write_individuals(tmp_path, gen, 1))
+
+    discard_generations_after(archive_path, 1)
+    with GenerationArchive(archive_path) as archive:
+        assert archive.generations == [0, 1]
+        assert archive.read_hpxml(1, "ind_0") == "<HPXML><!-- gen 1 ind 0 --></HPXML>"
+    assert zipfile.ZipFile(archive_path).testzip() is None
+    assert [p.name for p in tmp_path.glob(".generations*")] == []
+
+    # An unreadable archive is started over
+    archive_path.write_bytes(b"PK\x03\x04truncated")
+    discard_generations_after(archive_path, 1)
+    assert not archive_path.exists()
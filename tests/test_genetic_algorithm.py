@@ -0,0 +1,353 @@
+import random
+
+from deap import algorithms, base, tools
+
+from openstudio_hpxml_calibration.archive import EvaluationArchive, EvaluationResult
+from openstudio_hpxml_calibration.calibrate import creator
+from openstudio_hpxml_calibration.genetic_algorithm import (
+    GenerationalScheduler,
+    SteadyStateScheduler,
+    breed,
+    cx_uniform,
+    island_random_generators,
+    migrate,
+    replace_worst,
+    sel_tournament,
+    var_and,
+)
+from openstudio_hpxml_calibration.population import clone_individual
+
+CHOICES = [0, 1, 2, 3]
+
+
+def mutate(individual, rng=random):
+    i = rng.randrange(len(individual))
+    individual[i] = rng.choice(CHOICES)
+    return (individual,)
+
+
+def make_toolbox():
+    toolbox = base.Toolbox()
+    toolbox.register("clone", clone_individual)
+    toolbox.register("select", sel_tournament, tournsize=2)
+    toolbox.register("mate", cx_uniform, indpb=0.5)
+    toolbox.register("mutate", mutate)
+    return toolbox
+
+
+def make_individual(genome, fitness=None):
+    ind = creator.Individual(genome)
+    if fitness is not None:
+        ind.fitness.values = (fitness,)
+    return ind
+
+
+def score(genome):
+    return EvaluationResult(fitness=(float(sum(genome)),), comparison={}, sim_results={})
+
+
+class ReadyResult:
+    def __init__(self, value):
+        self.value = value
+
+    def ready(self):
+        return True
+
+    def get(self):
+        return self.value
+
+
+def test_operators_match_deap_with_the_same_random_numbers():
+    pop = [make_individual([i % 4, (i + 1) % 4, (i * 3) % 4], fitness=i) for i in range(8)]
+    toolbox = make_toolbox()
+    deap_toolbox = base.Toolbox()
+    deap_toolbox.register("clone", clone_individual)
+    deap_toolbox.register("mate", tools.cxUniform, indpb=0.5)
+    deap_toolbox.register("mutate", mutate)
+
+    random.seed(6)
+    expected = (
+        tools.selTournament(pop, 5, tournsize=2),
+        tools.cxUniform(list(range(6)), list(range(6, 12)), indpb=0.5),
+        algorithms.varAnd(pop, deap_toolbox, cxpb=0.5, mutpb=0.5),
+    )
+    outer_state = random.getstate()
+    rng = random.Random(6)
+    actual = (
+        sel_tournament(pop, 5, tournsize=2, rng=rng),
+        cx_uniform(list(range(6)), list(range(6, 12)), indpb=0.5, rng=rng),
+        var_and(pop, toolbox, cxpb=0.5, mutpb=0.5, rng=rng),
+    )
+    assert actual[0] == expected[0]
+    assert actual[1] == expected[1]
+    assert actual[2] == expected[2]
+    assert [ind.fitness.valid for ind in actual[2]] == [ind.fitness.valid for ind in expected[2]]
+    # The random module's stream is untouched
+    assert random.getstate() == outer_state
+
+
+def test_breed_never_returns_an_unchanged_parent():
+    random.seed(1)
+    toolbox = make_toolbox()
+    pop = [make_individual([i % 4, (i + 1) % 4, 2], fitness=i) for i in range(6)]
+    for _ in range(20):
+        child = breed(pop, toolbox, cxpb=0.0, mutpb=0.0)
+        assert not child.fitness.valid
+    assert all(ind.fitness.valid for ind in pop)
+
+
+def test_replace_worst_keeps_the_best():
+    pop = [make_individual([i], fitness=i) for i in range(3)]
+    assert not replace_worst(pop, make_individual([9], fitness=5))
+    assert replace_worst(pop, make_individual([8], fitness=1))
+    assert [ind[0] for ind in pop] == [0, 1, 8]
+
+
+def test_migrate_copies_best_individuals_around_the_ring():
+    islands = [
+        [make_individual([0], fitness=0), make_individual([1], fitness=5)],
+        [make_individual([2], fitness=2), make_individual([3], fitness=9)],
+    ]
+    migrate(islands, 1, clone_individual)
+    assert sorted(ind[0] for ind in islands[0]) == [0, 2]
+    assert sorted(ind[0] for ind in islands[1]) == [0, 2]
+    assert islands[1][0] is not islands[0][0]
+
+
+def test_island_random_streams_are_independent():
+    rng = random.Random(2)
+    outer_state = random.getstate()
+    islands = island_random_generators(2, rng)
+    first, other = ([island_rng.random() for _ in range(3)] for island_rng in islands)
+    assert first != other
+
+    # The same seed gives the same streams, without touching the random module's
+    assert [
+        [island_rng.random() for _ in range(3)]
+        for island_rng in island_random_generators(2, random.Random(2))
+    ] == [first, other]
+    assert random.getstate() == outer_state
+
+    # A single island breeds with the search's own stream
+    assert island_random_generators(1, rng) == [rng]
+
+
+def evaluate_offspring(gen, offspring):
+    for ind in offspring:
+        ind.fitness.values = score(ind).fitness
+    return offspring
+
+
+def test_generational_scheduler():
+    pop = [make_individual([3, 3, 3], fitness=9.0) for _ in range(5)]
+    pop.append(make_individual([0, 1, 2], fitness=3.0))
+    evaluated = []
+    generations = []
+
+    def evaluate(gen, offspring):
+        assert not any(ind.fitness.valid for ind in offspring)
+        evaluated.append(gen)
+        return evaluate_offspring(gen, offspring)
+
+    def on_generation(gen, pop, islands, offspring):
+        generations.append(gen)
+        assert [ind for island in islands for ind in island] == pop
+        # Each island keeps its size, and its best individual
+        assert [len(island) for island in islands] == [3, 3]
+        assert min(ind.fitness.values[0] for ind in pop) <= 3.0
+        return False
+
+    scheduler = GenerationalScheduler(
+        pop,
+        make_toolbox(),
+        cxpb=0.5,
+        mutpb=0.5,
+        evaluate=evaluate,
+        on_generation=on_generation,
+        island_rngs=island_random_generators(2, random.Random(1)),
+        migration_interval=2,
+        before_generation=lambda gen, _: generations.append(-gen),
+        start_gen=1,
+    )
+    pop, success = scheduler.run(4)
+    assert not success
+    assert evaluated == [2, 3, 4]
+    assert generations == [-2, 2, -3, 3, -4, 4]
+    assert len(pop) == 6
+    assert all(ind.fitness.valid for ind in pop)
+
+    # The same seed breeds the same generations
+    again, _ = GenerationalScheduler(
+        [make_individual([3, 3, 3], fitness=9.0) for _ in range(5)]
+        + [make_individual([0, 1, 2], fitness=3.0)],
+        make_toolbox(),
+        cxpb=0.5,
+        mutpb=0.5,
+        evaluate=evaluate_offspring,
+        on_generation=lambda *_: False,
+        island_rngs=island_random_generators(2, random.Random(1)),
+        migration_interval=2,
+        start_gen=1,
+    ).run(4)
+    assert again == pop
+
+
+def test_generational_scheduler_without_evaluated_offspring():
+    pop = [make_individual([i, i], fitness=float(i)) for i in range(4)]
+    parents = {tuple(ind) for ind in pop}
+
+    # Offspring that weren't evaluated take no part in selection
+    pop, success = GenerationalScheduler(
+        pop,
+        make_toolbox(),
+        cxpb=1.0,
+        mutpb=1.0,
+        evaluate=lambda *_: [],
+        on_generation=lambda *_: False,
+        island_rngs=[random.Random(2)],
+    ).run(3)
+    assert not success
+    assert {tuple(ind) for ind in pop} <= parents
+    # The best individual is kept
+    assert (0, 0) in {tuple(ind) for ind in pop}
+
+
+def test_generational_scheduler_stops_on_success():
+    scheduler = GenerationalScheduler(
+        [make_individual([3, 3], fitness=6.0) for _ in range(4)],
+        make_toolbox(),
+        cxpb=0.5,
+        mutpb=0.5,
+        evaluate=evaluate_offspring,
+        on_generation=lambda gen, *_: gen == 2,
+        island_rngs=[random.Random(3)],
+    )
+    pop, success = scheduler.run(10)
+    assert success
+    assert scheduler.gen == 2
+    assert len(pop) == 4
+
+
+def test_steady_state_scheduler():
+    random.seed(3)
+    pop = [make_individual([3, 3, 3], fitness=9.0) for _ in range(4)]
+    pop.append(make_individual([0, 1, 2], fitness=3.0))
+    archive = EvaluationArchive()
+    submitted = []
+    generations = []
+
+    def submit(child):
+        submitted.append(tuple(child))
+        return ReadyResult(score(child))
+
+    def on_generation(gen, pop, offspring, cache_hits, in_use_dirs):
+        generations.append((gen, len(offspring), cache_hits))
+        assert min(ind.fitness.values[0] for ind in pop) <= 3.0
+        return False
+
+    pop, success = SteadyStateScheduler(
+        pop,
+        make_toolbox(),
+        archive,
+        population_size=5,
+        max_evaluations=15,
+        cxpb=0.5,
+        mutpb=0.5,
+        submit=submit,
+        on_result=lambda *_: None,
+        on_generation=on_generation,
+        concurrency_limit=lambda _: 2,
+        start_gen=1,
+    ).run()
+
+    assert not success
+    assert [gen for gen, _, _ in generations] == [2, 3, 4]
+    # Each virtual generation is population_size simulations, plus offspring from the archive
+    assert all(nevals - cache_hits == 5 for _, nevals, cache_hits in generations)
+    # Genomes are only simulated once
+    assert len(submitted) == len(set(submitted)) == len(archive) == 15
+    assert all(ind.fitness.valid for ind in pop)
+    assert len(pop) == 5
+
+
+def test_steady_state_scheduler_stops_on_success():
+    random.seed(4)
+    pop = [make_individual([3, 3], fitness=6.0) for _ in range(4)]
+
+    scheduler = SteadyStateScheduler(
+        pop,
+        make_toolbox(),
+        EvaluationArchive(),
+        population_size=4,
+        max_evaluations=40,
+        cxpb=0.5,
+        mutpb=0.5,
+        submit=lambda child: ReadyResult(score(child)),
+        on_result=lambda *_: None,
+        on_generation=lambda gen, *_: gen == 2,
+        concurrency_limit=lambda _: 1,
+    )
+    pop, success = scheduler.run()
+    assert success
+    assert scheduler.gen == 2
+    assert scheduler.num_submitted < 40
+
+
+class DuplicateArchive(EvaluationArchive):
+    """An archive that has already evaluated every genome."""
+
+    def __init__(self):
+        super().__init__()
+        self.children = []
+
+    def get(self, individual):
+        self.children.append(individual)
+        return score(individual)
+
+
+def test_steady_state_scheduler_updates_population_between_archive_hits():
+    random.seed(5)
+    pop = [make_individual([3, 3, 3], fitness=9.0) for _ in range(6)]
+    archive = DuplicateArchive()
+    toolbox = make_toolbox()
+    parents = []
+
+    def select(individuals, k, rng):
+        parents.append(list(individuals))
+        return sel_tournament(individuals, k, tournsize=2, rng=rng)
+
+    toolbox.register("select", select)
+    generations = []
+
+    def on_generation(gen, pop, offspring, cache_hits, in_use_dirs):
+        generations.append((gen, len(offspring), cache_hits))
+        return False
+
+    def submit(child):
+        raise AssertionError("Offspring in the archive are never simulated")
+
+    pop, success = SteadyStateScheduler(
+        pop,
+        toolbox,
+        archive,
+        population_size=6,
+        max_evaluations=12,
+        cxpb=0.5,
+        mutpb=0.5,
+        submit=submit,
+        on_result=lambda *_: None,
+        on_generation=on_generation,
+        concurrency_limit=lambda _: 4,
+        max_duplicates=20,
+    ).run()
+
+    # Hits don't use up the evaluation budget; the search stops once it has converged
+    assert not success
+    assert len(archive.children) == 20
+    assert generations == [(1, 20, 20)]
+
+    # Each offspring joined the population, if it was no worse, before the next was bred
+    for child, population, next_population in zip(archive.children, parents, parents[1:]):
+        joined = any(ind is child for ind in next_population)
+        assert joined == (child.fitness >= min(ind.fitness for ind in population))
+    assert min(ind.fitness.values[0] for ind in pop) < 9.0
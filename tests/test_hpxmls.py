@@ -3,6 +3,7 @@ import pathlib
 import pytest
 
 from openstudio_hpxml_calibration.hpxml import HpxmlDoc
+from openstudio_hpxml_calibration.modify_hpxml import set_consumption_on_hpxml
 
 repo_root = pathlib.Path(__file__).resolve().parent.parent
 ira_rebate_hpxmls = list((repo_root / "test_hpxmls" / "ira_rebates").glob("*.xml"))
@@ -15,3 +16,27 @@ ihmh_home_hpxmls = list((repo_root / "test_hpxmls" / "ihmh_homes").glob("*.xml")
 )
 def test_hpxml_valid(filename):
     HpxmlDoc(filename)
+
+
+def test_building_profile():
+    hpxml = HpxmlDoc(
+        repo_root / "src" / "OpenStudio-HPXML" / "workflow" / "sample_files" / "base.xml"
+    )
+    assert hpxml.profile.bills == {}
+    assert hpxml.profile.fuel_types == {
+        component: frozenset(fuels) for component, fuels in hpxml.get_fuel_types().items()
+    }
+    assert hpxml.profile is hpxml.profile
+
+    hpxml = set_consumption_on_hpxml(hpxml, repo_root / "tests" / "data" / "test_bills.csv")
+    profile = hpxml.profile
+    assert profile.building_id == hpxml.get_first_building_id()
+    assert profile.consumptions == hpxml.get_consumptions(profile.building_id)
+    assert list(profile.bills) == ["electricity", "natural gas"]
+    electricity = profile.bills["electricity"]
+    consumption_info = profile.consumptions[0].ConsumptionDetails.ConsumptionInfo[0]
+    assert electricity.unit == "kWh"
+    assert electricity.consumption.tolist() == [
+        float(detail.Consumption) for detail in consumption_info.ConsumptionDetail
+    ]
+    assert electricity.num_days == 366
@@ -0,0 +1,43 @@
+import json
+
+from openstudio_hpxml_calibration.logbook import (
+    append_logbook_record,
+    discard_records_after,
+    read_logbook,
+    write_logbook_json,
+)
+
+
+def test_logbook_round_trip(tmp_path):
+    logbook_path = tmp_path / "logbook.jsonl"
+    assert list(read_logbook(logbook_path)) == []
+    for gen in range(3):
+        append_logbook_record(
+            logbook_path,
+            {
+                "gen": gen,
+                "min": 10.0 - gen,
+                "bias_error_heating_natural gas": 5.0,
+                "best_individual": {"misc_load_multiplier": 1.1},
+            },
+        )
+    # A record left incomplete by a crash is skipped
+    with open(logbook_path, "a") as f:
+        f.write('{"gen": 3, "min"')
+
+    records = list(read_logbook(logbook_path))
+    assert [record["gen"] for record in records] == [0, 1, 2]
+    assert records[0]["best_individual"] == {"misc_load_multiplier": 1.1}
+
+    discard_records_after(logbook_path, 1)
+    assert [record["gen"] for record in read_logbook(logbook_path)] == [0, 1]
+
+    json_path = tmp_path / "logbook.json"
+    write_logbook_json(
+        logbook_path,
+        json_path,
+        {"existing_home_results": {"existing_home_sim_results": {"electricity": {}}}},
+    )
+    summary = json.loads(json_path.read_text())
+    assert summary["existing_home_results"] == {"existing_home_sim_results": {"electricity": {}}}
+    assert summary["calibration_results"] == records[:2]
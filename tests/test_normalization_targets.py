@@ -0,0 +1,76 @@
+from dataclasses import replace
+from types import MappingProxyType
+
+import pytest
+
+from openstudio_hpxml_calibration import normalization_targets
+from openstudio_hpxml_calibration.normalization_targets import (
+    DeliveredFuelTarget,
+    NormalizationTargets,
+    compare_annual_consumption,
+    compare_to_targets,
+)
+
+
+@pytest.fixture
+def targets():
+    return NormalizationTargets(
+        fuels=("electricity", "fuel oil"),
+        detailed=MappingProxyType(
+            {"electricity": {"heating": 0.0, "cooling": 10.0, "baseload": 40.0}}
+        ),
+        delivered=MappingProxyType(
+            {
+                "fuel oil": DeliveredFuelTarget(
+                    measured_consumption=60.0,
+                    num_days=365,
+                    tmy_degree_days={"HDD65F": 5000.0, "CDD65F": 1000.0},
+                    actual_degree_days={"HDD65F": 5000.0, "CDD65F": 1000.0},
+                )
+            }
+        ),
+    )
+
+
+def test_compare_annual_consumption_skips_end_uses_without_model_consumption():
+    comparison = compare_annual_consumption(
+        {"natural gas": {"heating": 100.0, "cooling": 0.0, "baseload": 20.0}},
+        {"natural gas": {"heating": 80.0, "cooling": 0.0, "baseload": 20.0}},
+    )
+    assert comparison["natural gas"]["Bias Error"] == {"heating": 20.0, "baseload": 0.0}
+    assert comparison["natural gas"]["Absolute Error"] == {"heating": 20.0, "baseload": 0.0}
+
+
+def test_compare_to_targets(targets):
+    comparison = compare_to_targets(
+        targets,
+        {
+            "electricity": {"cooling": 10.0, "baseload": 40.0},
+            "fuel oil": {"heating": 40.0, "baseload": 10.0},
+        },
+    )
+    assert list(comparison) == ["electricity", "fuel oil"]
+    assert comparison["electricity"]["Bias Error"] == {"cooling": 0.0, "baseload": 0.0}
+    # With TMY weather the measured total is split by the modeled end-use fractions
+    assert comparison["fuel oil"]["Absolute Error"]["heating"] == pytest.approx(8.0)
+    assert comparison["fuel oil"]["Absolute Error"]["baseload"] == pytest.approx(2.0)
+    assert comparison["fuel oil"]["Bias Error"]["heating"] == pytest.approx(16.67)
+
+
+def test_compare_to_targets_compares_detailed_fuels_once(targets, monkeypatch):
+    calls = []
+
+    def compare(detailed, simulation_results):
+        calls.append(detailed)
+        return {fuel: {"Bias Error": {}, "Absolute Error": {}} for fuel in detailed}
+
+    monkeypatch.setattr(normalization_targets, "compare_annual_consumption", compare)
+    targets = replace(
+        targets,
+        fuels=("electricity", "natural gas"),
+        detailed=MappingProxyType({"electricity": {}, "natural gas": {}}),
+        delivered=MappingProxyType({}),
+    )
+    comparison = compare_to_targets(targets, {"electricity": {}, "natural gas": {}})
+    assert list(comparison) == ["electricity", "natural gas"]
+    assert len(calls) == 1
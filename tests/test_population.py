@@ -0,0 +1,169 @@
+import json
+import random
+import statistics
+from collections import Counter
+
+import numpy as np
+import pytest
+from deap import tools
+
+from openstudio_hpxml_calibration.calibrate import creator
+from openstudio_hpxml_calibration.checkpoint import save_checkpoint
+from openstudio_hpxml_calibration.population import (
+    ChoiceEncoding,
+    clone_individual,
+    design_population,
+    split_islands,
+    warm_start_genomes,
+)
+
+VALUE_CHOICES = {
+    "misc_load_multiplier": [0.5, 1.5, 1],
+    "heating_setpoint_offset": [-2, 2, 0],
+}
+
+
+def test_encoding_matches_python_statistics():
+    encoding = ChoiceEncoding(VALUE_CHOICES)
+    pop = [[0.5, -2], [1.5, 2], [1, 2], [1.5, 2], [0.5, 0]]
+
+    indices = encoding.encode(pop)
+    assert indices.dtype == np.int8
+    assert indices.tolist() == [[0, 0], [2, 2], [1, 2], [2, 2], [0, 1]]
+    assert encoding.decode(indices).tolist() == pop
+    assert encoding.diversity(pop) == len({tuple(ind) for ind in pop}) / len(pop)
+
+    stats = encoding.parameter_stats(pop)
+    for i, name in enumerate(VALUE_CHOICES):
+        values = [ind[i] for ind in pop]
+        assert stats[name] == {
+            "min": min(values),
+            "max": max(values),
+            "median": statistics.median(values),
+            "std": pytest.approx(statistics.pstdev(values)),
+        }
+
+    with pytest.raises(ValueError, match="heating_setpoint_offset"):
+        encoding.encode([[1, 3]])
+
+
+def test_clone_shares_results_but_not_genome_or_fitness():
+    ind = creator.Individual([1, 0])
+    ind.fitness.values = (3.0,)
+    ind.comparison = {"electricity": {}}
+
+    clone = clone_individual(ind)
+    clone[0] = 1.5
+    del clone.fitness.values
+    assert ind == [1, 0]
+    assert ind.fitness.valid
+    assert not clone.fitness.valid
+    assert clone.comparison is ind.comparison
+
+
+@pytest.mark.parametrize("design", ["latin_hypercube", "sobol"])
+def test_initial_population_design_is_balanced_without_duplicates(design):
+    value_choices = [[0.5, 0.75, 1, 1.5, 2], [-2, 0, 2], *[[0.9, 1, 1.1]] * 16]
+    seed = [1, 0, *[1] * 16]
+    genomes = design_population(value_choices, 69, design, exclude=[seed], rng=random.Random(2025))
+
+    assert len(genomes) == 69
+    assert len({tuple(genome) for genome in genomes} | {tuple(seed)}) == 70
+    for i, choices in enumerate(value_choices):
+        counts = Counter(genome[i] for genome in genomes)
+        assert set(counts) == set(choices)
+        assert max(counts.values()) - min(counts.values()) <= 1
+
+    assert (
+        design_population(value_choices, 69, design, exclude=[seed], rng=random.Random(2025))
+        == genomes
+    )
+
+
+def test_initial_population_design_without_enough_genomes():
+    genomes = design_population([[1, 2], [3, 4]], 6, "latin_hypercube")
+    assert len(genomes) == 6
+    assert {tuple(genome) for genome in genomes} == {(1, 3), (1, 4), (2, 3), (2, 4)}
+
+    with pytest.raises(ValueError, match="Unknown initial population design"):
+        design_population([[1, 2]], 2, "grid")
+
+
+def test_islands_split_and_migrate_in_a_ring():
+    pop = []
+    for i in range(7):
+        ind = creator.Individual([i])
+        ind.fitness.values = (float(i),)
+        pop.append(ind)
+
+    islands = split_islands(pop, 3)
+    assert [[ind[0] for ind in island] for island in islands] == [[0, 1, 2], [3, 4], [5, 6]]
+    assert split_islands([ind for island in islands for ind in island], 3) == islands
+
+    # The best individual of each island replaces the worst of the next
+    tools.migRing(
+        islands,
+        1,
+        lambda island, k: [clone_individual(ind) for ind in tools.selBest(island, k)],
+        replacement=tools.selWorst,
+    )
+    assert [sorted(ind[0] for ind in island) for island in islands] == [[0, 1, 5], [0, 3], [3, 5]]
+
+
+def test_warm_start_genomes_from_logbook_and_checkpoint(tmp_path):
+    default_values = [1, 0]
+    logbook_path = tmp_path / "logbook.json"
+    logbook_path.write_text(
+        json.dumps(
+            {
+                "calibration_results": [
+                    {"min": 9.0, "best_individual": {"misc_load_multiplier": 1.5}},
+                    {
+                        "min": 5.0,
+                        "best_individual": {
+                            "misc_load_multiplier": 0.6,
+                            "heating_setpoint_offset": 2,
+                        },
+                        "islands": [
+                            {
+                                "min": 7.0,
+                                "best_individual": {
+                                    "misc_load_multiplier": 1.5,
+                                    "heating_setpoint_offset": -2,
+                                },
+                            },
+                        ],
+                    },
+                    {
+                        "min": 5.0,
+                        "best_individual": {
+                            "misc_load_multiplier": 0.5,
+                            "heating_setpoint_offset": 2,
+                        },
+                    },
+                ]
+            }
+        )
+    )
+    # Values are moved to the nearest choice, and missing parameters get their default
+    assert warm_start_genomes(logbook_path, VALUE_CHOICES, default_values) == [
+        [0.5, 2],
+        [1.5, -2],
+        [1.5, 0],
+    ]
+
+    pop = []
+    for genome, fitness in [([1.5, 2], 3.0), ([0.5, 0], 1.0), ([1, 2], float("inf"))]:
+        ind = creator.Individual(genome)
+        ind.fitness.values = (fitness,)
+        pop.append(ind)
+    checkpoint_path = tmp_path / "checkpoint.pkl"
+    save_checkpoint(checkpoint_path, {"pop": pop, "hall_of_fame": [pop[1]]})
+    assert warm_start_genomes(checkpoint_path, VALUE_CHOICES, default_values) == [
+        [0.5, 0],
+        [1.5, 2],
+        [1, 2],
+    ]
+
+    with pytest.raises(ValueError, match="Unable to read the logbook"):
+        warm_start_genomes(tmp_path / "missing.json", VALUE_CHOICES, default_values)
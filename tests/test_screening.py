@@ -0,0 +1,59 @@
+import pytest
+
+from openstudio_hpxml_calibration.screening import (
+    ScreeningFidelity,
+    fit_period_scaling,
+    get_run_periods,
+)
+
+PERIOD_RESULTS = [
+    {"electricity": {"cooling": 1.0, "baseload": 2.0}, "natural gas": {"heating": 6.0}},
+    {"electricity": {"cooling": 3.0, "baseload": 2.0}, "natural gas": {"heating": 0.0}},
+]
+
+
+def test_run_periods():
+    run_periods = get_run_periods([7, 1, 4, 10], 2)
+    assert run_periods == ((1, 1, 1, 14), (4, 1, 4, 14), (7, 1, 7, 14), (10, 1, 10, 14))
+    fidelity = ScreeningFidelity(run_periods=run_periods)
+    assert fidelity.simulated_days == 56
+    assert fidelity.run_period_arguments(run_periods[1]) == {
+        "sim_begin_month": 4,
+        "sim_begin_day": 1,
+        "sim_end_month": 4,
+        "sim_end_day": 14,
+    }
+    with pytest.raises(ValueError, match="weeks"):
+        get_run_periods([1], 5)
+    with pytest.raises(ValueError, match="months"):
+        get_run_periods([13], 1)
+
+
+def test_period_results_scale_to_annual():
+    run_periods = get_run_periods([1, 7], 1)
+    totals = ScreeningFidelity(run_periods=run_periods).scale_to_annual(PERIOD_RESULTS)
+    assert totals == {
+        "electricity": {"cooling": 4.0, "baseload": 4.0},
+        "natural gas": {"heating": 6.0},
+    }
+
+    scaling = fit_period_scaling(
+        [
+            {"electricity": {"cooling": 40.0, "baseload": 100.0}, "natural gas": {"heating": 30.0}},
+            {"electricity": {"cooling": 20.0, "baseload": 50.0}, "natural gas": {"heating": 0.0}},
+        ],
+        [totals, {"electricity": {"cooling": 2.0, "baseload": 2.0}}],
+    )
+    # Ratios are pooled over individuals, and end uses never seen in the run periods get none
+    assert scaling == {
+        "electricity": {"cooling": 10.0, "baseload": 25.0},
+        "natural gas": {"heating": 5.0},
+    }
+
+    fidelity = ScreeningFidelity(
+        run_periods=run_periods, period_scaling={"electricity": {"cooling": 10.0}}
+    )
+    assert fidelity.scale_to_annual(PERIOD_RESULTS) == {
+        "electricity": {"cooling": 40.0, "baseload": pytest.approx(4.0 * 365 / 14, abs=1e-3)},
+        "natural gas": {"heating": pytest.approx(6.0 * 365 / 14, abs=1e-3)},
+    }
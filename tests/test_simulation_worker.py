@@ -0,0 +1,115 @@
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from openstudio_hpxml_calibration.simulation_worker import SimulationWorker, SimulationWorkerError
+
+# Stands in for simulation_worker.rb: copies the HPXML file and writes placeholder results.
+# Exits without responding when asked to modify "crash.xml", hangs on "hang.xml", and counts
+# its own startups.
+FAKE_WORKER = textwrap.dedent(
+    """
+    import json, shutil, sys, time
+    from pathlib import Path
+
+    starts = Path(sys.argv[1])
+    starts.write_text(str(int(starts.read_text() or 0) + 1) if starts.exists() else "1")
+    print("OpenStudio startup noise")
+    print(json.dumps({"ready": True}), flush=True)
+    for line in sys.stdin:
+        job = json.loads(line)
+        args = job["modify_arguments"]
+        if args["xml_file_path"].endswith("crash.xml"):
+            sys.exit(1)
+        if args["xml_file_path"].endswith("hang.xml"):
+            time.sleep(60)
+        if not Path(args["xml_file_path"]).exists():
+            print(json.dumps({"id": job["id"], "success": False, "error": "missing"}), flush=True)
+            continue
+        shutil.copy(args["xml_file_path"], args["save_file_path"])
+        if job["output_dir"]:
+            Path(job["output_dir"]).mkdir(parents=True, exist_ok=True)
+            (Path(job["output_dir"]) / "results_annual.json").write_text("{}")
+        print(json.dumps({"id": job["id"], "success": True, "error": None}), flush=True)
+    """
+)
+
+
+@pytest.fixture
+def worker(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    with SimulationWorker(command=[sys.executable, str(script), str(tmp_path / "starts")]) as w:
+        yield w
+
+
+def test_worker_runs_jobs_in_one_process(worker, tmp_path):
+    (tmp_path / "in.xml").write_text("<HPXML/>")
+    for i in range(3):
+        worker.run(
+            {
+                "xml_file_path": str(tmp_path / "in.xml"),
+                "save_file_path": str(tmp_path / f"{i}.xml"),
+            },
+            output_dir=tmp_path / f"run{i}",
+        )
+        assert (tmp_path / f"{i}.xml").read_text() == "<HPXML/>"
+        assert (tmp_path / f"run{i}" / "results_annual.json").exists()
+    assert (tmp_path / "starts").read_text() == "1"
+
+
+def test_worker_reports_failed_jobs(worker, tmp_path):
+    with pytest.raises(SimulationWorkerError, match="missing"):
+        worker.run(
+            {
+                "xml_file_path": str(tmp_path / "missing.xml"),
+                "save_file_path": str(tmp_path / "out.xml"),
+            }
+        )
+    assert worker.is_running
+
+
+def test_worker_restarts_after_crash(worker, tmp_path):
+    (tmp_path / "crash.xml").write_text("<HPXML/>")
+    (tmp_path / "in.xml").write_text("<HPXML/>")
+    with pytest.raises(SimulationWorkerError, match="crashed"):
+        worker.run(
+            {
+                "xml_file_path": str(tmp_path / "crash.xml"),
+                "save_file_path": str(tmp_path / "out.xml"),
+            }
+        )
+    # The crashing job is retried once on a fresh worker
+    assert (tmp_path / "starts").read_text() == "2"
+
+    worker.run(
+        {"xml_file_path": str(tmp_path / "in.xml"), "save_file_path": str(tmp_path / "out.xml")}
+    )
+    assert (tmp_path / "out.xml").exists()
+    assert (tmp_path / "starts").read_text() == "3"
+
+
+def test_worker_killed_on_timeout(worker, tmp_path):
+    (tmp_path / "hang.xml").write_text("<HPXML/>")
+    (tmp_path / "in.xml").write_text("<HPXML/>")
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        worker.run(
+            {
+                "xml_file_path": str(tmp_path / "hang.xml"),
+                "save_file_path": str(tmp_path / "out.xml"),
+            },
+            timeout=1,
+        )
+    assert time.monotonic() - start < 30
+    assert not worker.is_running
+
+    # The next job gets a fresh worker
+    worker.run(
+        {"xml_file_path": str(tmp_path / "in.xml"), "save_file_path": str(tmp_path / "out.xml")},
+        timeout=30,
+    )
+    assert (tmp_path / "starts").read_text() == "2"
@@ -0,0 +1,36 @@
+import itertools
+import math
+
+from openstudio_hpxml_calibration.surrogate import SurrogateModel, rank_correlation
+
+
+def test_surrogate_predicts_simulation_results():
+    choices = [[0.5, 1, 2], [0.9, 1, 1.1], [-2, 0, 2]]
+    genomes = list(itertools.product(*choices))
+    sim_results = [
+        {
+            "electricity": {"heating": 10 * g[0] * g[1] + g[2], "baseload": 5 * g[0]},
+            "natural gas": {"heating": 20 * g[1]},
+        }
+        for g in genomes
+    ]
+    surrogate = SurrogateModel(choices, alpha=0.01)
+    surrogate.fit(genomes[::2], sim_results[::2])
+
+    predicted = surrogate.predict(genomes)
+    assert set(predicted[0]) == {"electricity", "natural gas"}
+    assert (
+        rank_correlation(
+            [p["electricity"]["heating"] for p in predicted],
+            [r["electricity"]["heating"] for r in sim_results],
+        )
+        > 0.9
+    )
+    for p, r in zip(predicted, sim_results):
+        assert math.isclose(p["natural gas"]["heating"], r["natural gas"]["heating"], rel_tol=0.05)
+
+
+def test_rank_correlation_skips_failed_simulations():
+    assert rank_correlation([1, 2, 3, 4], [10, 20, math.inf, 40]) == 1.0
+    assert rank_correlation([1, 2, 3], [3, 2, 1]) == -1.0
+    assert rank_correlation([1, 2], [1, 2]) is None
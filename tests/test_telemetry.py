@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from openstudio_hpxml_calibration.telemetry import (
+    EvaluationTiming,
+    GenerationTimings,
+    genome_hash,
+    summarize_timings,
+    write_chrome_trace,
+)
+
+
+def evaluation_timing(worker, submitted, simulate_start, simulate_end):
+    return EvaluationTiming(
+        worker=worker,
+        genome_hash=genome_hash([1, simulate_start]),
+        stages=[
+            ("modify", simulate_start - 1.0, simulate_start),
+            ("simulate", simulate_start, simulate_end),
+            ("score", simulate_end, simulate_end + 0.5),
+        ],
+        submitted=submitted,
+    )
+
+
+def test_timing_summary():
+    timings = [
+        evaluation_timing("host:1", 100.0, 101.0, 104.0),
+        evaluation_timing("host:2", 100.0, 103.0, 110.0),
+        EvaluationTiming(worker="host:1", stages=[("modify_batch", 99.0, 100.0)]),
+    ]
+    assert timings[0].durations() == {
+        "modify": 1.0,
+        "simulate": 3.0,
+        "score": 0.5,
+        "queue": 0.0,
+        "total": 4.5,
+    }
+    shifted = timings[0].shifted(-50.0)
+    assert (shifted.start, shifted.end, shifted.submitted) == (50.0, 54.5, 50.0)
+
+    summary = summarize_timings(timings, 2, 100.0, 110.0)
+    assert summary["stages"]["simulate"] == {"p50": 5.0, "p95": pytest.approx(6.8)}
+    assert summary["stages"]["queue"] == {"p50": 1.0, "p95": pytest.approx(1.9)}
+    assert summary["stages"]["modify_batch"] == {"p50": 1.0, "p95": 1.0}
+    # Busy time before the generation started doesn't count
+    assert summary["pool_utilization"] == pytest.approx((4.5 + 8.0) / 20)
+
+
+def test_timings_file_and_chrome_trace(tmp_path):
+    timings_path = tmp_path / "timings.jsonl"
+    generation_timings = GenerationTimings(timings_path, processes=2)
+    generation_timings.add(evaluation_timing("host:1", None, 1.0, 2.0), submitted=0.5)
+    generation_timings.add(None)
+    generation_timings.add(EvaluationTiming(worker="host:2"))
+    summary = generation_timings.finish(0)
+    assert set(summary["stages"]) == {"modify", "simulate", "score", "queue", "total"}
+    generation_timings.add(evaluation_timing("host:2", 3.0, 4.0, 6.0))
+    generation_timings.finish(1)
+
+    trace_path = tmp_path / "trace.json"
+    write_chrome_trace(timings_path, trace_path)
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    assert [event["name"] for event in spans if event["pid"] == 0] == [
+        "Generation 0",
+        "Generation 1",
+    ]
+    evaluations = [event for event in spans if event["name"] == "evaluate"]
+    assert [(event["tid"], event["ts"], event["dur"]) for event in evaluations] == [
+        (1, 0, 2_500_000),
+        (2, 3_000_000, 3_500_000),
+    ]
+    assert evaluations[0]["args"]["queue_seconds"] == 0.0
+    thread_names = {
+        event["tid"]: event["args"]["name"] for event in events if event["name"] == "thread_name"
+    }
+    assert thread_names == {1: "host:1", 2: "host:2"}
@@ -4,6 +4,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+import yaml
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         sys.exit("Usage: run_ci_simulations.py job_num")
@@ -53,26 +55,30 @@ if __name__ == "__main__":
     job_num = int(sys.argv[1])
     job_xmls = [all_xmls[i : i + num_files] for i in range(0, len(all_xmls), num_files)][job_num]
 
-    for xml in job_xmls:
-        print(f"CALIBRATING {xml}...")
-        output_dir = top_output_dir / Path(xml).stem
-
-        subprocess.run(
-            [
-                "uv",
-                "run",
-                "openstudio-hpxml-calibration",
-                "calibrate",
-                "--hpxml-filepath",
-                str(test_hpxmls_dir / xml),
-                "--output-dir",
-                str(output_dir),
-                "--config-filepath",
-                str(tests_dir / "data" / "test_config_for_ci_calibrations.yaml"),
-                "--num-proc",
-                "8",
-                "--verbose",
-                "--verbose",
-            ],
-            check=True,
+    # Calibrate the job's homes together, sharing one pool of simulation workers
+    top_output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = top_output_dir / "manifest.yaml"
+    manifest_path.write_text(
+        yaml.safe_dump(
+            {"homes": [{"hpxml_filepath": str(test_hpxmls_dir / xml)} for xml in job_xmls]}
         )
+    )
+    print(f"CALIBRATING {len(job_xmls)} HOMES...")
+
+    subprocess.run(
+        [
+            "uv",
+            "run",
+            "openstudio-hpxml-calibration",
+            "calibrate-batch",
+            str(manifest_path),
+            str(top_output_dir),
+            "--config-filepath",
+            str(tests_dir / "data" / "test_config_for_ci_calibrations.yaml"),
+            "--num-proc",
+            "8",
+            "--verbose",
+            "--verbose",
+        ],
+        check=True,
+    )